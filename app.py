@@ -2,8 +2,16 @@
 # Main application file for Beach Nourishment Design Tool
 
 import streamlit as st
+import plotly.graph_objects as go
 import profile_module as profile
+from beach_core import timing
+from beach_core.incremental import input_hash
+from beach_core.cost import CostInputs, compute_costs
+from beach_core.design import dean_a_from_d50
+from beach_core.erosion import DEFAULT_RETREAT_RATE
+from beach_core.uncertainty import UncertaintyInputs, simulate_costs
 import locale
+import time
 
 # Set locale to use dot (.) as decimal separator
 try:
@@ -16,10 +24,21 @@ st.set_page_config(
     layout="wide", 
 )
 
+# Time this rerun (shown in the sidebar when profiling is on)
+profile.begin_profiling()
+
 # Keep track of which page we're on (landing or project page)
 if 'page' not in st.session_state:
     st.session_state.page = 'landing'  # Start on landing page
 
+# Input widget keys saved in project files (see profile_module.project_file_data)
+PROJECT_INPUTS = (
+    'Hs', 'T', 'L_coast', 'd50', 'derive_A', 'A_param', 'h_toe',
+    'use_groin', 'gl', 'gw', 'gd', 'g_cost', 'use_sill', 'sl', 'sw', 'sd', 's_cost',
+    'sand_cost', 'transport_cost', 'run_monte_carlo', 'n_draws', 'unit_cost_cv', 'volume_cv',
+    'dimension_cv', 'retreat_rate', 'retreat_rate_cv', 'maintenance_years',
+)
+
 # Function to go to the project page
 def switch_to_project():
     st.session_state.page = 'project'
@@ -74,6 +93,17 @@ if st.session_state.page == 'landing':
                     st.rerun()
                 else:
                     st.error("Please enter a project name to continue.")
+        
+        # Or continue a saved project (profiles, designs and results are read back, not recomputed)
+        st.markdown("### Open Project")
+        project_file = st.file_uploader("Project file", type=["npz"], key="project_file", label_visibility="collapsed")
+        if st.button("Open Project", disabled=project_file is None, use_container_width=True):
+            error = profile.open_project(project_file)
+            if error:
+                st.error(error)
+            else:
+                switch_to_project()
+                st.rerun()
     
     # Footer at the bottom
     st.markdown("---")
@@ -83,7 +113,7 @@ if st.session_state.page == 'landing':
 elif st.session_state.page == 'project':
     
     # Top bar with back button and project title
-    col_back, col_title = st.columns([1, 4])
+    col_back, col_title, col_save = st.columns([1, 4, 1])
     with col_back:
         if st.button("← Home", use_container_width=True):
             reset_project()
@@ -102,19 +132,25 @@ elif st.session_state.page == 'project':
     # Split into two columns so it looks cleaner
     c1, c2 = st.columns(2)
     with c1:
-        Hs = st.number_input("Significant Wave Height (Hs) [m]", value=2.0, step=0.1, help="Design wave height for the project area")
-        T = st.number_input("Wave Period (T) [s]", value=7.0, step=0.1, help="Peak wave period")
-        L_coast = st.number_input("Total Coastline Length [m]", value=480.0, step=10.0, help="Total length of beach nourishment")
+        Hs = st.number_input("Significant Wave Height (Hs) [m]", value=2.0, step=0.1, key="Hs", help="Design wave height for the project area")
+        T = st.number_input("Wave Period (T) [s]", value=7.0, step=0.1, key="T", help="Peak wave period")
+        L_coast = st.number_input("Total Coastline Length [m]", value=480.0, step=10.0, key="L_coast", help="Total length of beach nourishment")
     with c2:
-        d50 = st.number_input("Median Grain Size (d₅₀) [mm]", value=0.25, step=0.01, help="Median sediment grain diameter")
-        A_param = st.number_input("Sediment Scale Parameter (A)", value=0.09, step=0.01, help="Dean's parameter based on grain size")
-        h_toe = st.number_input("Sill Depth (h) [m]", value=2.5, step=0.1, help="Target depth for sill placement")
+        d50 = st.number_input("Median Grain Size (d₅₀) [mm]", value=0.25, min_value=0.01, step=0.01, key="d50", help="Median sediment grain diameter")
+        derive_A = st.toggle("Derive A from d₅₀", value=True, key="derive_A", help="Moore (1982) relation between grain size and the profile scale parameter")
+        if derive_A:
+            A_param = float(dean_a_from_d50(d50))
+            st.number_input("Sediment Scale Parameter (A)", value=round(A_param, 4), format="%.4f", disabled=True,
+                            key=f"A_derived_{d50}", help="Derived from d₅₀")
+        else:
+            A_param = st.number_input("Sediment Scale Parameter (A)", value=0.09, min_value=0.01, step=0.01, key="A_param", help="Dean's parameter based on grain size")
+        h_toe = st.number_input("Sill Depth (h) [m]", value=2.5, min_value=0.1, step=0.1, key="h_toe", help="Target depth for sill placement")
     
     st.markdown("---")
     
     # Section 2: Cross-section analysis
     st.markdown("### 2. Cross-Section Analysis")
-    profile.render_profile_section()
+    profile.render_profile_section(A_param=A_param, h_toe=h_toe, d50=d50)
     st.markdown("---")
     
     # Section 3: Optional structural elements - groin and sill
@@ -122,7 +158,7 @@ elif st.session_state.page == 'project':
     
     # Groin properties in an expandable section 
     with st.expander("Groin Properties"):
-        use_groin = st.toggle("Include Groin in Project", value=False)
+        use_groin = st.toggle("Include Groin in Project", value=False, key="use_groin")
         if use_groin:  # Only show these inputs if they want a groin
             gc1, gc2 = st.columns(2)
             with gc1:
@@ -134,7 +170,7 @@ elif st.session_state.page == 'project':
     
     # Sill properties (also in an expandable section)
     with st.expander("Sill (Submerged Breakwater) Properties", expanded=True):
-        use_sill = st.toggle("Include Sill in Project", value=True)
+        use_sill = st.toggle("Include Sill in Project", value=True, key="use_sill")
         if use_sill:  # Only show these inputs if they want a sill
             sl1, sl2 = st.columns(2)
             with sl1:
@@ -150,47 +186,83 @@ elif st.session_state.page == 'project':
     st.markdown("### 4. Cost Estimation")
     cost1, cost2 = st.columns(2)
     with cost1:
-        sand_cost = st.number_input("Sand Unit Cost ($/m³)", value=20.0, step=1.0, help="Cost per cubic meter of fill material")
+        sand_cost = st.number_input("Sand Unit Cost ($/m³)", value=20.0, step=1.0, key="sand_cost", help="Cost per cubic meter of fill material")
     with cost2:
-        transport_cost = st.number_input("Transport & Placement Cost ($/m³)", value=25.0, step=1.0, help="Additional costs for material placement")
+        transport_cost = st.number_input("Transport & Placement Cost ($/m³)", value=25.0, step=1.0, key="transport_cost", help="Additional costs for material placement")
+    
+    # Uncertainty of the cost inputs (Monte Carlo simulation)
+    with st.expander("Cost Uncertainty (Monte Carlo)"):
+        run_monte_carlo = st.toggle("Run Monte Carlo Simulation", value=True, key="run_monte_carlo")
+        mc1, mc2, mc3 = st.columns(3)
+        with mc1:
+            n_draws = st.select_slider("Number of Draws", options=[10_000, 100_000, 1_000_000], value=1_000_000, key="n_draws")
+            unit_cost_cv = st.number_input("Unit Cost Spread (CV)", value=0.15, min_value=0.0, step=0.05, key="unit_cost_cv", help="Standard deviation / mean of all unit costs")
+        with mc2:
+            volume_cv = st.number_input("Fill Volume Spread (CV)", value=0.10, min_value=0.0, step=0.05, key="volume_cv", help="Bathymetry and survey error on the fill volume")
+            dimension_cv = st.number_input("Structure Dimension Spread (CV)", value=0.05, min_value=0.0, step=0.01, key="dimension_cv")
+        with mc3:
+            retreat_rate = st.number_input("Retreat Rate [m/year]", value=DEFAULT_RETREAT_RATE, min_value=0.0, step=0.1, key="retreat_rate")
+            retreat_rate_cv = st.number_input("Retreat Rate Spread (CV)", value=0.3, min_value=0.0, step=0.05, key="retreat_rate_cv")
+            maintenance_years = st.number_input("Erosion Allowance Period [years]", value=0, min_value=0, step=5, key="maintenance_years",
+                                                help="Eroded fill over this period (retreat × coastline length × sill depth) is added to the volume. 0 = not included")
+    
+    # Save button in the top bar, now that all inputs are read
+    with col_save:
+        st.download_button(
+            "Save Project",
+            data=profile.project_file_data({key: st.session_state[key] for key in PROJECT_INPUTS if key in st.session_state}),
+            file_name=profile.project_file_name(), mime="application/octet-stream", use_container_width=True,
+            help="Sections, profiles, designs, results and inputs in one file (open it from the home page)"
+        )
     
     st.markdown("---")
     
-    # The big calculate button
+    # The big calculate button (results stay shown, and follow the inputs, once started)
     if st.button("START CALCULATIONS", type="primary", use_container_width=True):
+        st.session_state.show_calculations = True
+    if st.session_state.get('show_calculations'):
         # Get volume results from profile module
         vol_results, error = profile.get_volume_results()
         
         if error:
             st.error(f"Cannot calculate costs: {error}")
-            st.warning("Please complete all cross-sections (A, B, C) first.")
+            st.warning("Please complete all cross-sections first.")
+        elif vol_results is None:
+            # Raster cut / fill still running in the background
+            profile.job_progress('cut_fill', "Calculating the raster cut / fill")
         else:
             st.success("✓ Calculations completed successfully!")
             
             # Calculate costs
-            total_fill_volume = vol_results['total']  # m³ (includes extra 8000 m³)
+            total_fill_volume = vol_results.total  # m³ (includes the raster fill outside the sections)
             
-            # Fill material costs
-            fill_material_cost = total_fill_volume * sand_cost
-            fill_transport_cost = total_fill_volume * transport_cost
-            total_fill_cost = fill_material_cost + fill_transport_cost
-            
-            # Groin costs (if applicable)
-            groin_volume = 0
-            groin_total_cost = 0
+            cost_inputs = CostInputs(sand_cost=sand_cost, transport_cost=transport_cost,
+                                     use_groin=use_groin, use_sill=use_sill)
             if use_groin:
-                groin_volume = groin_length * groin_width * groin_depth
-                groin_total_cost = groin_volume * groin_cost
-            
-            # Sill costs (if applicable)
-            sill_volume = 0
-            sill_total_cost = 0
+                cost_inputs.groin_length = groin_length
+                cost_inputs.groin_width = groin_width
+                cost_inputs.groin_depth = groin_depth
+                cost_inputs.groin_cost = groin_cost
             if use_sill:
-                sill_volume = sill_length * sill_width * sill_depth
-                sill_total_cost = sill_volume * sill_cost
+                cost_inputs.sill_length = sill_length
+                cost_inputs.sill_width = sill_width
+                cost_inputs.sill_height = sill_depth
+                cost_inputs.sill_cost = sill_cost
+            costs = compute_costs(total_fill_volume, cost_inputs)
+            
+            # Fill material costs
+            fill_material_cost = costs.fill_material_cost
+            fill_transport_cost = costs.fill_transport_cost
+            total_fill_cost = costs.total_fill_cost
+            
+            # Structure costs (zero when not included)
+            groin_volume = costs.groin_volume
+            groin_total_cost = costs.groin_total_cost
+            sill_volume = costs.sill_volume
+            sill_total_cost = costs.sill_total_cost
             
             # Grand total
-            project_total_cost = total_fill_cost + groin_total_cost + sill_total_cost
+            project_total_cost = costs.project_total_cost
             
             # Display results
             st.markdown("---")
@@ -246,3 +318,57 @@ elif st.session_state.page == 'project':
                     st.write(f"- Volume: **{sill_volume:,.2f} m³**")
                     st.write(f"- Unit Cost: **{sill_cost:.2f} $/m³**")
                     st.write(f"- **Subtotal: ${sill_total_cost:,.0f}**")
+            
+            # Cost uncertainty
+            if run_monte_carlo:
+                st.markdown("---")
+                st.markdown("### 🎲 Cost Uncertainty (Monte Carlo)")
+                
+                spread = UncertaintyInputs(
+                    n_draws=n_draws, unit_cost_cv=unit_cost_cv, volume_cv=volume_cv,
+                    retreat_rate=retreat_rate, retreat_rate_cv=retreat_rate_cv,
+                    maintenance_years=maintenance_years, coast_length=L_coast, active_height=h_toe,
+                    dimension_cv=dimension_cv
+                )
+                def run_simulation():
+                    start = time.perf_counter()
+                    with timing.stage('monte_carlo'):
+                        results = simulate_costs(total_fill_volume, cost_inputs, spread)
+                    return results, time.perf_counter() - start
+                
+                # Drawn again only when the volume or the cost inputs change
+                mc_results, elapsed = profile.project_cache().compute(
+                    'monte_carlo', input_hash(total_fill_volume, cost_inputs, spread), run_simulation
+                )
+                
+                total_stats = mc_results.percentiles['Total']
+                col_p50, col_p90, col_mean = st.columns(3)
+                with col_p50:
+                    st.metric("P50 Total Cost", f"${total_stats['P50']:,.0f}")
+                with col_p90:
+                    st.metric("P90 Total Cost", f"${total_stats['P90']:,.0f}",
+                              delta=f"{total_stats['P90'] - project_total_cost:+,.0f} vs deterministic", delta_color="off")
+                with col_mean:
+                    st.metric("Mean Total Cost", f"${total_stats['Mean']:,.0f}")
+                
+                # Histogram of the total cost (binned here, not in the browser)
+                counts, edges = mc_results.histogram
+                fig_mc = go.Figure()
+                fig_mc.add_trace(go.Bar(x=(edges[:-1] + edges[1:]) / 2, y=counts / counts.sum() * 100,
+                                        width=edges[1] - edges[0], name='Draws', marker_color='#1e40af'))
+                for label, value, color in [('P50', total_stats['P50'], '#059669'), ('P90', total_stats['P90'], '#DC2626')]:
+                    fig_mc.add_vline(x=value, line=dict(color=color, dash='dash'), annotation_text=label)
+                fig_mc.add_vline(x=project_total_cost, line=dict(color='#000000', dash='dot'), annotation_text='Deterministic')
+                fig_mc.update_layout(xaxis_title="Project Total Cost ($)", yaxis_title="Share of Draws (%)", height=350, showlegend=False)
+                st.plotly_chart(fig_mc)
+                
+                # Percentile table
+                st.dataframe(
+                    {'Component': list(mc_results.percentiles),
+                     **{stat: [f"${values[stat]:,.0f}" for values in mc_results.percentiles.values()]
+                        for stat in next(iter(mc_results.percentiles.values()))}},
+                    hide_index=True, use_container_width=True
+                )
+                st.caption(f"{spread.n_draws:,} draws in {elapsed * 1000:.0f} ms")
+
+profile.render_profiling_panel()
@@ -0,0 +1,119 @@
+# beach_core/__init__.py
+# Computational core of the Beach Nourishment Design Tool.
+# Pure NumPy (scipy/xarray are imported only when needed): no Streamlit, plotly
+# or folium, so batch jobs and worker processes can use it without a UI runtime.
+from .geometry import (
+    EARTH_RADIUS,
+    calculate_distance,
+    calculate_section_midpoint,
+    find_line_intersection,
+    haversine_distance,
+    to_geographic,
+    to_local,
+)
+from .bathymetry import (
+    DEFAULT_GRID_RESOLUTION,
+    PROFILE_CACHE,
+    SAMPLING_MODES,
+    AdaptiveProfile,
+    ProfileCache,
+    Soundings,
+    extract_adaptive_profile,
+    extract_adaptive_profiles,
+    extract_depth_profile,
+    extract_depth_profiles,
+    get_bathymetry_grid,
+    get_soundings,
+    load_soundings,
+    load_soundings_bbox,
+    open_soundings_store,
+    soundings_for_transects,
+    soundings_from_dataset,
+)
+from .design import (
+    NEW_SHORELINE_P1,
+    NEW_SHORELINE_P2,
+    DesignParams,
+    DesignProfile,
+    build_design_profile,
+    dean_a_from_d50,
+    design_depth_function,
+    dean_distance,
+    dean_profile,
+    fill_start_distance,
+    sill_offset,
+)
+from .erosion import (
+    DEFAULT_RETREAT_RATE,
+    EROSION_YEARS,
+    ErosionResult,
+    ErosionSimulation,
+    RenourishmentScenarios,
+    erode_profile,
+    renourishment_interval,
+    renourishment_scenarios,
+    simulate_erosion,
+)
+from .volume import (
+    VolumeResult,
+    calculate_fill_area,
+    calculate_fill_areas,
+    compute_total_volume,
+    sweep_fill_areas,
+    sweep_total_volume,
+    volume_from_areas,
+)
+from .cost import CostBreakdown, CostInputs, compute_costs
+from .surface import SurfaceVolumeResult, nourishment_polygon, tin_fill_volume
+from .cutfill import (
+    OUTSIDE_ZONE,
+    RASTER_RESOLUTION,
+    CutFillResult,
+    outside_fill_sweep,
+    project_footprint,
+    raster_cut_fill,
+)
+from .downsample import lttb, lttb_indices
+from .incremental import NodeCache, input_hash
+from .section import Section
+from .project import Project, load_project, save_project
+from .jobs import Cancelled, Job, JobPool, shared_pool
+
+__all__ = [
+    # geometry
+    'EARTH_RADIUS', 'calculate_distance', 'calculate_section_midpoint', 'find_line_intersection',
+    'haversine_distance', 'to_geographic', 'to_local',
+    # bathymetry
+    'DEFAULT_GRID_RESOLUTION', 'PROFILE_CACHE', 'SAMPLING_MODES', 'AdaptiveProfile', 'ProfileCache',
+    'Soundings', 'extract_adaptive_profile', 'extract_adaptive_profiles', 'extract_depth_profile',
+    'extract_depth_profiles', 'get_bathymetry_grid', 'get_soundings', 'load_soundings',
+    'load_soundings_bbox', 'open_soundings_store', 'soundings_for_transects',
+    'soundings_from_dataset',
+    # design
+    'NEW_SHORELINE_P1', 'NEW_SHORELINE_P2', 'DesignParams', 'DesignProfile', 'build_design_profile',
+    'dean_a_from_d50', 'design_depth_function', 'dean_distance', 'dean_profile',
+    'fill_start_distance', 'sill_offset',
+    # erosion
+    'DEFAULT_RETREAT_RATE', 'EROSION_YEARS', 'ErosionResult', 'ErosionSimulation',
+    'RenourishmentScenarios', 'erode_profile', 'renourishment_interval', 'renourishment_scenarios',
+    'simulate_erosion',
+    # volume
+    'VolumeResult', 'calculate_fill_area', 'calculate_fill_areas', 'compute_total_volume',
+    'sweep_fill_areas', 'sweep_total_volume', 'volume_from_areas',
+    # cost
+    'CostBreakdown', 'CostInputs', 'compute_costs',
+    # surface
+    'SurfaceVolumeResult', 'nourishment_polygon', 'tin_fill_volume',
+    # cutfill
+    'OUTSIDE_ZONE', 'RASTER_RESOLUTION', 'CutFillResult', 'outside_fill_sweep', 'project_footprint', 'raster_cut_fill',
+    # downsample
+    'lttb', 'lttb_indices',
+    # incremental
+    'NodeCache', 'input_hash',
+    # section
+    'Section',
+    # project
+    'Project', 'load_project', 'save_project',
+    # jobs
+    'Cancelled', 'Job', 'JobPool', 'shared_pool',
+]
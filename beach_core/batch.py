@@ -0,0 +1,245 @@
+# beach_core/batch.py
+# Command-line batch runner: evaluates many design scenarios on a process pool
+# and streams one CSV row per scenario as soon as it finishes.
+#
+# Usage:
+#   python -m beach_core.batch scenarios.json -o results.csv [--data data.nc] [--workers 8]
+#
+# Scenario file: JSON list of objects (or {"scenarios": [...]}) or CSV, one scenario per
+# row, with the fields of Scenario / CostInputs. In CSV files, 'transects' is written as
+# "lat1,lon1,lat2,lon2; lat1,lon1,lat2,lon2; ...". See examples/scenarios.json.
+# The design depends on d50 (or A) and the sill depth only; wave inputs (Hs, T), like
+# any other unknown key, are ignored.
+import argparse
+import csv
+import dataclasses
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .bathymetry import DEFAULT_GRID_RESOLUTION, soundings_for_transects
+from .cost import CostInputs, compute_costs
+from .design import NEW_SHORELINE_P1, NEW_SHORELINE_P2, DesignParams
+from .pipeline import evaluate_transects
+from .surface import tin_fill_volume
+
+RESULT_FIELDS = [
+    'scenario', 'status', 'error', 'n_transects', 'd50', 'A', 'sill_depth',
+    'fill_volume', 'between_section_volume', 'extra_volume', 'tin_volume', 'raster_fill_volume', 'raster_cut_volume',
+    'fill_cost', 'groin_cost', 'sill_cost', 'total_cost', 'elapsed_s',
+]
+
+
+@dataclass
+class Scenario:
+    """
+    One design alternative.
+
+    Attributes:
+        name: Scenario name (first CSV column of the results)
+        transects: Transect end points, shape (N, 2, 2) as [[lat1, lon1], [lat2, lon2]], alongshore order
+        d50: Median grain size (mm)
+        A: Profile scale parameter (None = derived from d50)
+        sill_depth: Target sill depth (m)
+        costs: Unit costs and structure dimensions
+    """
+    name: str
+    transects: np.ndarray
+    d50: float = 0.25
+    A: float = None
+    sill_depth: float = 2.5
+    costs: CostInputs = field(default_factory=CostInputs)
+    shoreline: tuple = (NEW_SHORELINE_P1, NEW_SHORELINE_P2)
+    sampling: str = 'nearest'
+    grid_resolution: float = DEFAULT_GRID_RESOLUTION
+    num_points: int = 100
+
+
+def parse_transects(value):
+    """Transects from a nested list or a "lat1,lon1,lat2,lon2; ..." string, as an (N, 2, 2) array"""
+    if isinstance(value, str):
+        value = [[float(v) for v in group.replace(',', ' ').split()] for group in value.split(';') if group.strip()]
+    transects = np.asarray(value, dtype=float)
+    if transects.size == 0 or transects.size % 4:
+        raise ValueError("transects must contain groups of 4 coordinates (lat1, lon1, lat2, lon2)")
+    return transects.reshape(-1, 2, 2)
+
+
+def _parse_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'y')
+    return bool(value)
+
+
+def scenario_from_dict(record, index=0):
+    """Build a Scenario from a JSON object / CSV row (unknown keys are ignored)"""
+    record = {k: v for k, v in record.items() if v not in (None, '')}
+    cost_kwargs = {}
+    for f in dataclasses.fields(CostInputs):
+        if f.name in record:
+            cost_kwargs[f.name] = _parse_bool(record[f.name]) if f.type is bool or f.type == 'bool' else float(record[f.name])
+
+    kwargs = {}
+    for name in ('d50', 'A', 'sill_depth', 'grid_resolution'):
+        if name in record:
+            kwargs[name] = float(record[name])
+    if 'num_points' in record:
+        kwargs['num_points'] = int(record['num_points'])
+    if 'sampling' in record:
+        kwargs['sampling'] = str(record['sampling'])
+    if 'shoreline' in record:
+        line = parse_transects(record['shoreline'])[0]
+        kwargs['shoreline'] = ({'lat': line[0, 0], 'lon': line[0, 1]}, {'lat': line[1, 0], 'lon': line[1, 1]})
+
+    return Scenario(
+        name=str(record.get('name', f"scenario_{index + 1}")),
+        transects=parse_transects(record['transects']),
+        costs=CostInputs(**cost_kwargs),
+        **kwargs
+    )
+
+
+def load_scenarios(path):
+    """Read scenarios from a JSON or CSV file"""
+    if path.lower().endswith('.csv'):
+        with open(path, newline='', encoding='utf-8') as f:
+            records = list(csv.DictReader(f))
+    else:
+        with open(path, encoding='utf-8') as f:
+            records = json.load(f)
+        if isinstance(records, dict):
+            records = records['scenarios']
+    scenarios = []
+    for i, record in enumerate(records):
+        try:
+            scenarios.append(scenario_from_dict(record, i))
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Scenario {i + 1} ({record.get('name', 'unnamed')}): {e!s}") from e
+    return scenarios
+
+
+def run_scenario(soundings, scenario):
+    """
+    Evaluate one scenario: profile extraction, fill volume (average end area, TIN and raster) and cost breakdown.
+
+    Returns:
+        Result row (dict with RESULT_FIELDS keys); errors are reported in the row
+    """
+    start = time.perf_counter()
+    row = {
+        'scenario': scenario.name, 'n_transects': len(scenario.transects),
+        'd50': scenario.d50,
+        'A': scenario.A, 'sill_depth': scenario.sill_depth,
+    }
+    try:
+        if scenario.A is not None:
+            params = DesignParams(a=scenario.A, sill_depth=scenario.sill_depth)
+        else:
+            params = DesignParams.from_d50(scenario.d50, sill_depth=scenario.sill_depth)
+        _, volumes = evaluate_transects(
+            soundings, scenario.transects, params=params, shoreline=scenario.shoreline,
+            num_points=scenario.num_points, method=scenario.sampling, grid_resolution=scenario.grid_resolution
+        )
+        costs = compute_costs(volumes.total, scenario.costs)
+        tin = tin_fill_volume(soundings, scenario.transects, params, scenario.shoreline)
+        row.update({
+            'status': 'ok',
+            'A': params.a,
+            'fill_volume': round(volumes.total, 2),
+            'between_section_volume': round(float(volumes.volumes.sum()), 2),
+            'extra_volume': round(volumes.extra, 2),
+            'tin_volume': round(tin.volume, 2),
+            'raster_fill_volume': round(volumes.cut_fill.fill, 2),
+            'raster_cut_volume': round(volumes.cut_fill.cut, 2),
+            'fill_cost': round(costs.total_fill_cost, 2),
+            'groin_cost': round(costs.groin_total_cost, 2),
+            'sill_cost': round(costs.sill_total_cost, 2),
+            'total_cost': round(costs.project_total_cost, 2),
+        })
+    except Exception as e:
+        row.update({'status': 'error', 'error': str(e)})
+    row['elapsed_s'] = round(time.perf_counter() - start, 4)
+    return row
+
+
+# ===== PROCESS POOL =====
+# The parent process writes the memory-mapped soundings store once; each worker
+# maps it and reuses it for all its scenarios. Tiled stores and surveys above
+# OUT_OF_CORE_BYTES are instead read per scenario, only around its transects.
+_WORKER_DATA_PATH = None
+
+
+def _init_worker(data_path):
+    global _WORKER_DATA_PATH
+    _WORKER_DATA_PATH = data_path
+
+
+def _run_in_worker(scenario):
+    return run_scenario(soundings_for_transects(_WORKER_DATA_PATH, scenario.transects), scenario)
+
+
+def run_batch(scenarios, data_path, output_path, workers=None, progress=None):
+    """
+    Run scenarios on a process pool and write results to CSV as they finish
+    (rows are in completion order).
+
+    Args:
+        scenarios: List of Scenario
+        data_path: Bathymetry NetCDF file
+        output_path: Results CSV path
+        workers: Number of worker processes (default: CPU count)
+        progress: Optional callback(done, total, row)
+
+    Returns:
+        Number of scenarios that failed
+    """
+    failed = 0
+    soundings_for_transects(data_path)  # Build the shared store of small surveys before the workers start
+    with open(output_path, 'w', newline='', encoding='utf-8') as out, \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data_path,)) as pool:
+        writer = csv.DictWriter(out, fieldnames=RESULT_FIELDS)
+        writer.writeheader()
+        futures = [pool.submit(_run_in_worker, scenario) for scenario in scenarios]
+        for done, future in enumerate(as_completed(futures), start=1):
+            row = future.result()
+            writer.writerow(row)
+            out.flush()
+            failed += row['status'] != 'ok'
+            if progress:
+                progress(done, len(futures), row)
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate beach nourishment design scenarios in parallel")
+    parser.add_argument('scenarios', help="Scenario file (.json or .csv)")
+    parser.add_argument('-o', '--output', default='results.csv', help="Results CSV (default: results.csv)")
+    parser.add_argument('--data', default=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data.nc'),
+                        help="Bathymetry NetCDF file or tiled store (default: data.nc next to the app)")
+    parser.add_argument('-w', '--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    try:
+        scenarios = load_scenarios(args.scenarios)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    start = time.perf_counter()
+
+    def report(done, total, row):
+        status = row['status'] if row['status'] == 'ok' else f"error: {row['error']}"
+        print(f"[{done}/{total}] {row['scenario']}: {status}", file=sys.stderr)
+
+    failed = run_batch(scenarios, args.data, args.output, args.workers, progress=report)
+    elapsed = time.perf_counter() - start
+    print(f"{len(scenarios)} scenarios in {elapsed:.1f} s ({len(scenarios) / elapsed:.1f}/s), "
+          f"{failed} failed -> {args.output}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
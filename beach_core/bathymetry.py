@@ -0,0 +1,809 @@
+# beach_core/bathymetry.py
+# Bathymetry soundings: loading, spatial index, gridding and profile extraction
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .geometry import EARTH_RADIUS, haversine_distance
+
+DEFAULT_GRID_RESOLUTION = 5.0  # meters
+SAMPLING_MODES = {'nearest': 'Nearest sounding', 'bilinear': 'Bilinear (gridded)', 'adaptive': 'Adaptive (sounding density)'}
+
+
+@dataclass(eq=False)
+class Soundings:
+    """
+    Scattered bathymetry soundings as plain arrays.
+
+    Attributes:
+        lat, lon: Sounding coordinates (degrees)
+        depth: Depth (or elevation) value per sounding
+        source: Path of the file the soundings were read from (None for in-memory data)
+        key: Cache key for derived data (spatial index, grid); set automatically
+    """
+    lat: np.ndarray
+    lon: np.ndarray
+    depth: np.ndarray
+    source: str = None
+    key: tuple = field(default=None)
+
+    def __post_init__(self):
+        if self.key is None:
+            if self.source and os.path.exists(self.source):
+                self.key = (self.source, os.path.getmtime(self.source), len(self.depth))
+            else:
+                self.key = ('memory', id(self))
+
+    def __len__(self):
+        return len(self.depth)
+
+
+def find_depth_variable(ds):
+    """Return the name of the depth variable in a soundings dataset (or None)"""
+    for var in ds.data_vars:
+        if 'label' in var.lower() or 'depth' in var.lower() or 'elevation' in var.lower():
+            return var
+    # Use first variable excluding latitude and longitude
+    available_vars = [v for v in ds.data_vars if v not in ['latitude', 'longitude', 'lat', 'lon']]
+    if available_vars:
+        return available_vars[0]
+    return None
+
+
+def soundings_from_dataset(ds):
+    """
+    Convert an xarray Dataset (data.nc format) to Soundings.
+
+    Returns:
+        Soundings, or None if the dataset has no latitude/longitude/depth variables
+    """
+    if 'latitude' not in ds.data_vars or 'longitude' not in ds.data_vars:
+        return None
+    depth_var = find_depth_variable(ds)
+    if depth_var is None:
+        return None
+
+    return Soundings(
+        lat=np.asarray(ds['latitude'].values, dtype=float).ravel(),
+        lon=np.asarray(ds['longitude'].values, dtype=float).ravel(),
+        depth=np.asarray(ds[depth_var].values, dtype=float).ravel(),
+        source=ds.encoding.get('source'),
+    )
+
+
+def load_soundings(file_path):
+    """Read a NetCDF soundings file (netCDF4 engine, falling back to scipy)"""
+    import xarray as xr
+
+    try:
+        ds = xr.open_dataset(file_path, engine='netcdf4')
+    except:
+        ds = xr.open_dataset(file_path, engine='scipy')
+    with ds:
+        return soundings_from_dataset(ds)
+
+
+# ===== OUT-OF-CORE READING =====
+# Surveys larger than OUT_OF_CORE_BYTES are never loaded whole: the file is
+# streamed in chunks and only the soundings inside the transects' bounding box
+# (plus a buffer) are kept, so memory stays bounded by the chunk size and the
+# size of the area of interest.
+OUT_OF_CORE_BYTES = 512 * 2 ** 20
+CHUNK_SIZE = 1_000_000  # soundings per read
+BBOX_BUFFER = 100.0  # meters around the transects
+_SUBSET_CACHE = OrderedDict()
+_SUBSET_CACHE_SIZE = 4
+# Guards the cache only: a subset is streamed under its own lock, so a long read does
+# not hold up sessions and jobs reading other subsets or files
+_SUBSET_LOCK = threading.Lock()
+_SUBSET_LOADING = {}  # (path, mtime, bbox) -> lock held while that subset is read
+
+
+def transects_bbox(endpoints, buffer=BBOX_BUFFER):
+    """
+    Bounding box of a set of transects, widened by a buffer.
+
+    Args:
+        endpoints: Array of shape (N, 2, 2): [[[lat1, lon1], [lat2, lon2]], ...]
+        buffer: Margin in meters
+
+    Returns:
+        Tuple (lat_min, lat_max, lon_min, lon_max) in degrees
+    """
+    points = np.asarray(endpoints, dtype=float).reshape(-1, 2)
+    d_lat = np.degrees(buffer / EARTH_RADIUS)
+    d_lon = d_lat / np.cos(np.radians(points[:, 0].mean()))
+    return (points[:, 0].min() - d_lat, points[:, 0].max() + d_lat,
+            points[:, 1].min() - d_lon, points[:, 1].max() + d_lon)
+
+
+def iter_sounding_chunks(file_path, chunk_size=CHUNK_SIZE):
+    """
+    Read a NetCDF soundings file lazily, chunk_size soundings at a time.
+
+    Yields:
+        Tuples of (lat, lon, depth) arrays
+    """
+    import xarray as xr
+
+    try:
+        ds = xr.open_dataset(file_path, engine='netcdf4')
+    except:
+        ds = xr.open_dataset(file_path, engine='scipy')
+    with ds:
+        depth_var = find_depth_variable(ds)
+        if 'latitude' not in ds.data_vars or 'longitude' not in ds.data_vars or depth_var is None:
+            return
+        dim = ds['latitude'].dims[0]
+        for start in range(0, ds.sizes[dim], chunk_size):
+            chunk = {dim: slice(start, start + chunk_size)}
+            yield (np.asarray(ds['latitude'].isel(chunk).values, dtype=float).ravel(),
+                   np.asarray(ds['longitude'].isel(chunk).values, dtype=float).ravel(),
+                   np.asarray(ds[depth_var].isel(chunk).values, dtype=float).ravel())
+
+
+def load_soundings_bbox(file_path, bbox, chunk_size=CHUNK_SIZE):
+    """
+    Soundings of a NetCDF file inside a bounding box, streamed chunk by chunk.
+
+    Args:
+        bbox: (lat_min, lat_max, lon_min, lon_max) in degrees
+
+    Returns:
+        Soundings (key includes the bbox; no on-disk grid cache since they are a subset)
+    """
+    lat_min, lat_max, lon_min, lon_max = bbox
+    parts = []
+    for lat, lon, depth in iter_sounding_chunks(file_path, chunk_size):
+        inside = (lat >= lat_min) & (lat <= lat_max) & (lon >= lon_min) & (lon <= lon_max)
+        parts.append((lat[inside], lon[inside], depth[inside].astype(np.float32)))
+
+    if parts:
+        lat, lon, depth = (np.concatenate(column) for column in zip(*parts))
+    else:
+        lat, lon, depth = np.empty(0), np.empty(0), np.empty(0, dtype=np.float32)
+    key = (os.path.abspath(file_path), os.path.getmtime(file_path), len(depth), tuple(float(v) for v in bbox))
+    return Soundings(lat=_read_only(lat), lon=_read_only(lon), depth=_read_only(depth), key=key)
+
+
+def soundings_for_transects(file_path, endpoints=None, buffer=BBOX_BUFFER):
+    """
+    Soundings needed to extract the given transects.
+    A tiled store (beach_core.store) is used when file_path is one or an up-to-date
+    store was ingested from it; only the tiles around the transects are read.
+    Otherwise files up to OUT_OF_CORE_BYTES come whole from the shared cache
+    (get_soundings) and larger files are read out of core around the transects.
+    Subsets are cached and reused while their bounding box still covers the transects.
+
+    Returns:
+        Soundings, or None for a large survey without transects
+    """
+    from .store import find_store, is_store, store_soundings
+
+    store_path = file_path if is_store(file_path) else find_store(file_path)
+    if store_path:
+        return store_soundings(store_path, endpoints, buffer)
+
+    if os.path.getsize(file_path) <= OUT_OF_CORE_BYTES:
+        return get_soundings(file_path)
+    if endpoints is None or np.size(endpoints) == 0:
+        return None
+
+    path = os.path.abspath(file_path)
+    bbox = transects_bbox(endpoints, buffer)
+    mtime = os.path.getmtime(path)
+    subset = _cached_subset(path, mtime, bbox)
+    if subset is not None:
+        return subset
+
+    key = (path, mtime, tuple(bbox))
+    with _SUBSET_LOCK:
+        loading = _SUBSET_LOADING.setdefault(key, threading.Lock())
+    with loading:
+        subset = _cached_subset(path, mtime, bbox)  # Read by another thread meanwhile
+        if subset is None:
+            subset = load_soundings_bbox(path, key[2])
+            with _SUBSET_LOCK:
+                if len(_SUBSET_CACHE) >= _SUBSET_CACHE_SIZE:
+                    _SUBSET_CACHE.popitem(last=False)
+                _SUBSET_CACHE[key] = subset
+    with _SUBSET_LOCK:
+        _SUBSET_LOADING.pop(key, None)
+    return subset
+
+
+def _cached_subset(path, mtime, bbox):
+    """Cached subset of a file whose bounding box covers bbox (None if there is none)"""
+    lat_min, lat_max, lon_min, lon_max = bbox
+    with _SUBSET_LOCK:
+        for (cached_path, cached_mtime, cached_bbox), subset in reversed(_SUBSET_CACHE.items()):
+            # 1e-7° (~1 cm) slack: the longitude margin varies slightly with the transects' mean latitude
+            if (cached_path, cached_mtime) == (path, mtime) and \
+                    cached_bbox[0] <= lat_min + 1e-7 and cached_bbox[1] >= lat_max - 1e-7 and \
+                    cached_bbox[2] <= lon_min + 1e-7 and cached_bbox[3] >= lon_max - 1e-7:
+                return subset
+    return None
+
+
+# ===== SHARED SOUNDINGS CACHE =====
+# One copy of each survey per process, shared read-only by all Streamlit sessions.
+# The arrays are memory-mapped from a store next to the source file
+# (data.coords.npy / data.depth.npy), so worker processes share the same pages through
+# the OS page cache instead of each holding a private copy.
+# Coordinates stay float64 (float32 would quantize them to ~0.4 m at this
+# latitude and change nearest-sounding picks); depths are float32.
+_SOUNDINGS_CACHE = {}
+_SOUNDINGS_LOCK = threading.Lock()
+
+
+def soundings_store_paths(source):
+    """Paths of the memory-mappable store for a source file: <base>.coords.npy (lat, lon rows) and <base>.depth.npy"""
+    base, _ = os.path.splitext(source)
+    return f"{base}.coords.npy", f"{base}.depth.npy"
+
+
+def _read_only(array):
+    array = np.ascontiguousarray(array)
+    array.setflags(write=False)
+    return array
+
+
+def _save_stamped(path, array, mtime):
+    """Write an .npy file atomically and stamp it with the source file's modification time"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+    os.utime(tmp_path, (mtime, mtime))
+    os.replace(tmp_path, path)
+
+
+def open_soundings_store(file_path):
+    """
+    Memory-map the soundings of a NetCDF file, (re)writing the store first if it
+    is missing or was written from another version of the source file. Falls back
+    to in-memory arrays when the store cannot be written.
+
+    Returns:
+        Soundings with read-only, contiguous arrays (or None if the file has no soundings)
+    """
+    coords_path, depth_path = soundings_store_paths(file_path)
+    source_mtime = os.path.getmtime(file_path)
+    fresh = all(os.path.exists(p) and os.path.getmtime(p) == source_mtime for p in (coords_path, depth_path))
+
+    if not fresh:
+        soundings = load_soundings(file_path)
+        if soundings is None:
+            return None
+        coords = np.vstack((soundings.lat, soundings.lon)).astype(np.float64)
+        depth = np.asarray(soundings.depth, dtype=np.float32)
+        try:
+            _save_stamped(coords_path, coords, source_mtime)
+            _save_stamped(depth_path, depth, source_mtime)
+        except OSError:
+            # Read-only location: keep the arrays in memory only
+            return Soundings(lat=_read_only(coords[0]), lon=_read_only(coords[1]), depth=_read_only(depth),
+                             source=file_path)
+
+    coords = np.load(coords_path, mmap_mode='r')
+    return Soundings(lat=coords[0], lon=coords[1], depth=np.load(depth_path, mmap_mode='r'), source=file_path)
+
+
+def get_soundings(file_path):
+    """
+    Soundings of a NetCDF file from the process-wide cache.
+    Loaded once and shared by all callers; reloaded when the file's modification time changes.
+    """
+    path = os.path.abspath(file_path)
+    mtime = os.path.getmtime(path)
+    cached = _SOUNDINGS_CACHE.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    with _SOUNDINGS_LOCK:
+        cached = _SOUNDINGS_CACHE.get(path)
+        if cached is None or cached[0] != mtime:
+            cached = _SOUNDINGS_CACHE[path] = (mtime, open_soundings_store(path))
+    return cached[1]
+
+
+# ===== SPATIAL INDEX =====
+# KD-trees over the sounding coordinates, built once per loaded survey.
+# Keyed by Soundings.key (source file + modification time), so copies of the
+# same survey share one index.
+_SPATIAL_INDEX_CACHE = {}
+_SPATIAL_INDEX_CACHE_SIZE = 4
+_SPATIAL_INDEX_LOCK = threading.Lock()  # Sessions and background jobs build each index once
+
+
+def get_spatial_index(soundings):
+    """Build (or fetch from cache) a KD-tree over the soundings' (lat, lon) coordinates"""
+    tree = _SPATIAL_INDEX_CACHE.get(soundings.key)
+    if tree is not None:
+        return tree
+
+    with _SPATIAL_INDEX_LOCK:
+        if soundings.key not in _SPATIAL_INDEX_CACHE:
+            from scipy.spatial import cKDTree
+
+            # Same metric as before: Euclidean distance in (lat, lon) degrees
+            coords = np.column_stack((soundings.lat, soundings.lon))
+
+            if len(_SPATIAL_INDEX_CACHE) >= _SPATIAL_INDEX_CACHE_SIZE:
+                _SPATIAL_INDEX_CACHE.pop(next(iter(_SPATIAL_INDEX_CACHE)))
+            _SPATIAL_INDEX_CACHE[soundings.key] = cKDTree(coords)
+        return _SPATIAL_INDEX_CACHE[soundings.key]
+
+
+# ===== GRIDDED BATHYMETRY =====
+# Scattered soundings interpolated once onto a regular lat/lon grid.
+# The grid is cached on disk next to the source file (e.g. data.grid_5m.npz)
+# and reloaded on later runs as long as the source file is unchanged.
+_GRID_CACHE = {}
+_GRID_LOCK = threading.Lock()
+
+
+def grid_cache_path(source, resolution):
+    """Path of the on-disk grid cache for a source file and resolution"""
+    base, _ = os.path.splitext(source)
+    return f"{base}.grid_{resolution:g}m.npz"
+
+
+def build_bathymetry_grid(soundings, resolution=DEFAULT_GRID_RESOLUTION):
+    """
+    Interpolate scattered soundings onto a regular lat/lon grid.
+
+    Args:
+        soundings: Soundings to grid
+        resolution: Grid spacing in meters (converted to degrees at the survey's mean latitude)
+
+    Returns:
+        Dict with 'lat' (ny,), 'lon' (nx,) axes and 'depth' (ny, nx) array.
+        Cells outside the survey's convex hull are NaN.
+    """
+    from scipy.interpolate import griddata
+
+    ds_lats = np.asarray(soundings.lat, dtype=float)
+    ds_lons = np.asarray(soundings.lon, dtype=float)
+
+    # Meters to degrees (longitude degrees shrink with cos(latitude))
+    lat_scale = np.cos(np.radians(ds_lats.mean()))
+    d_lat = np.degrees(resolution / EARTH_RADIUS)
+    d_lon = d_lat / lat_scale
+
+    grid_lat = np.arange(ds_lats.min(), ds_lats.max() + d_lat, d_lat)
+    grid_lon = np.arange(ds_lons.min(), ds_lons.max() + d_lon, d_lon)
+    mesh_lon, mesh_lat = np.meshgrid(grid_lon, grid_lat)
+
+    # Triangulate in locally isotropic coordinates so triangles are not skewed
+    depth_grid = griddata(
+        (ds_lons * lat_scale, ds_lats), np.asarray(soundings.depth, dtype=float),
+        (mesh_lon * lat_scale, mesh_lat), method='linear'
+    )
+
+    return {'lat': grid_lat, 'lon': grid_lon, 'depth': depth_grid.astype(np.float32)}
+
+
+def get_bathymetry_grid(soundings, resolution=DEFAULT_GRID_RESOLUTION):
+    """
+    Get the gridded bathymetry for a survey, building it only if no valid cache exists.
+    Looks in memory first, then on disk next to the source file.
+    """
+    key = soundings.key + (resolution,)
+    grid = _GRID_CACHE.get(key)
+    if grid is not None:
+        return grid
+
+    with _GRID_LOCK:
+        if key not in _GRID_CACHE:
+            _GRID_CACHE[key] = _load_or_build_grid(soundings, resolution)
+        return _GRID_CACHE[key]
+
+
+def _load_or_build_grid(soundings, resolution):
+    """Grid from the on-disk cache next to the source file, or built (and written there)"""
+    source = soundings.source
+    cache_file = grid_cache_path(source, resolution) if source and os.path.exists(source) else None
+
+    grid = None
+    if cache_file and os.path.exists(cache_file):
+        try:
+            with np.load(cache_file) as cached:
+                # Only reuse the cache if it was built from the current source file
+                if float(cached['source_mtime']) == os.path.getmtime(source):
+                    grid = {'lat': cached['lat'], 'lon': cached['lon'], 'depth': cached['depth']}
+        except Exception:
+            grid = None
+
+    if grid is None:
+        grid = build_bathymetry_grid(soundings, resolution)
+        if cache_file:
+            try:
+                np.savez(cache_file, source_mtime=os.path.getmtime(source), **grid)
+            except OSError:
+                pass  # Read-only location: keep the grid in memory only
+    return grid
+
+
+def sample_grid_bilinear(grid, lats, lons):
+    """
+    Sample a regular grid at arbitrary points with bilinear interpolation.
+    Points outside the grid (or next to NaN cells) return NaN.
+    """
+    grid_lat, grid_lon, depth = grid['lat'], grid['lon'], grid['depth']
+
+    # Fractional cell coordinates
+    fy = (np.asarray(lats) - grid_lat[0]) / (grid_lat[1] - grid_lat[0])
+    fx = (np.asarray(lons) - grid_lon[0]) / (grid_lon[1] - grid_lon[0])
+    inside = (fy >= 0) & (fy <= len(grid_lat) - 1) & (fx >= 0) & (fx <= len(grid_lon) - 1)
+
+    iy = np.clip(np.floor(fy).astype(int), 0, len(grid_lat) - 2)
+    ix = np.clip(np.floor(fx).astype(int), 0, len(grid_lon) - 2)
+    ty = fy - iy
+    tx = fx - ix
+
+    values = (depth[iy, ix] * (1 - tx) * (1 - ty) +
+              depth[iy, ix + 1] * tx * (1 - ty) +
+              depth[iy + 1, ix] * (1 - tx) * ty +
+              depth[iy + 1, ix + 1] * tx * ty)
+    return np.where(inside, values, np.nan)
+
+
+# ===== PROFILE EXTRACTION =====
+
+def sample_depths(soundings, lats, lons, method='nearest', grid_resolution=DEFAULT_GRID_RESOLUTION):
+    """
+    Raw sounding values at arbitrary points (any shape; NaN where the grid has no data).
+
+    Args:
+        method: 'nearest' (nearest sounding) or 'bilinear' (gridded bathymetry)
+    """
+    lats, lons = np.asarray(lats, dtype=float), np.asarray(lons, dtype=float)
+    if method == 'bilinear':
+        return sample_grid_bilinear(get_bathymetry_grid(soundings, grid_resolution), lats, lons).astype(float)
+    if method != 'nearest':
+        raise ValueError(f"Unknown sampling method for fixed-count extraction: {method}")
+    # Nearest sounding for all points in one batched query
+    tree = get_spatial_index(soundings)
+    _, nearest_idx = tree.query(np.column_stack((lats.ravel(), lons.ravel())))
+    return np.asarray(soundings.depth, dtype=float)[nearest_idx].reshape(lats.shape)
+
+
+def fill_nan_rows(depths):
+    """
+    Fill NaN gaps in each row of a (N, num_points) depth array by linear
+    interpolation along the row (constant beyond the first/last valid value).
+    Rows with fewer than two valid values get NaN replaced by -5.0.
+    """
+    nan_mask = np.isnan(depths)
+    if not nan_mask.any():
+        return depths
+
+    n_rows, n_cols = depths.shape
+    col = np.arange(n_cols)
+    rows = np.arange(n_rows)[:, None]
+
+    # Index of the previous / next valid value for every cell
+    prev_idx = np.maximum.accumulate(np.where(nan_mask, -1, col), axis=1)
+    next_idx = np.minimum.accumulate(np.where(nan_mask, n_cols, col)[:, ::-1], axis=1)[:, ::-1]
+
+    # Before the first / after the last valid value: hold it constant
+    prev_idx, next_idx = np.where(prev_idx < 0, next_idx, prev_idx), np.where(next_idx >= n_cols, prev_idx, next_idx)
+    prev_idx = np.clip(prev_idx, 0, n_cols - 1)
+    next_idx = np.clip(next_idx, 0, n_cols - 1)
+
+    span = next_idx - prev_idx
+    t = np.divide(col - prev_idx, span, out=np.zeros(depths.shape), where=span > 0)
+    filled = depths[rows, prev_idx] + t * (depths[rows, next_idx] - depths[rows, prev_idx])
+    result = np.where(nan_mask, filled, depths)
+
+    sparse_rows = (~nan_mask).sum(axis=1) <= 1
+    result[sparse_rows] = np.nan_to_num(depths[sparse_rows], nan=-5.0)
+    return result
+
+
+# ===== PROFILE CACHE =====
+# Extracted profiles, keyed on the survey, the rounded end points and the
+# sampling settings, so re-picking a section or switching back to it is instant.
+PROFILE_KEY_DECIMALS = 6  # ~0.1 m in latitude / longitude
+PROFILE_CACHE_MAX_BYTES = 64 * 2 ** 20
+
+
+class ProfileCache:
+    """
+    Bounded LRU cache of extracted (distances, depths) profiles.
+
+    Attributes:
+        max_bytes: Memory cap; least recently used profiles are evicted beyond it
+        hits, misses: Lookup counters
+        nbytes: Memory held by the cached arrays
+    """
+
+    def __init__(self, max_bytes=PROFILE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Cached profile for a key (None if absent); counts a hit or miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, distances, depths):
+        """Store a profile (read-only copies) and evict old entries beyond max_bytes"""
+        entry = (_read_only(np.array(distances)), _read_only(np.array(depths)))
+        size = entry[0].nbytes + entry[1].nbytes
+        with self._lock:
+            if key in self._entries:
+                old = self._entries.pop(key)
+                self.nbytes -= old[0].nbytes + old[1].nbytes
+            self._entries[key] = entry
+            self.nbytes += size
+            while self.nbytes > self.max_bytes and self._entries:
+                _, old = self._entries.popitem(last=False)
+                self.nbytes -= old[0].nbytes + old[1].nbytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+            self.hits = self.misses = 0
+
+    def stats(self):
+        """Dict with entries, hits, misses, hit_rate, nbytes and max_bytes"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'nbytes': self.nbytes, 'max_bytes': self.max_bytes,
+        }
+
+
+PROFILE_CACHE = ProfileCache()
+
+
+def profile_cache_key(soundings, endpoint, num_points, method, grid_resolution):
+    """
+    Cache key of one profile, or None for in-memory soundings (no stable fingerprint).
+
+    Args:
+        endpoint: Section end points, shape (2, 2) as [[lat1, lon1], [lat2, lon2]]
+    """
+    if soundings.key[0] == 'memory':
+        return None
+    return (
+        soundings.key,
+        tuple(np.round(np.asarray(endpoint, dtype=float).ravel(), PROFILE_KEY_DECIMALS)),
+        int(num_points), method, float(grid_resolution) if method == 'bilinear' else None,
+    )
+
+
+def extract_depth_profiles(soundings, endpoints, num_points=100, method='nearest', grid_resolution=DEFAULT_GRID_RESOLUTION,
+                           cache=PROFILE_CACHE):
+    """
+    Sample bathymetry along many sections at once.
+    Profiles found in the cache are reused; the rest are extracted in one batch.
+
+    Args:
+        soundings: Soundings to sample
+        endpoints: Array of shape (N, 2, 2): [[[lat1, lon1], [lat2, lon2]], ...]
+        num_points: Number of samples along each section
+        method: 'nearest' (nearest sounding) or 'bilinear' (gridded bathymetry)
+        grid_resolution: Grid spacing in meters for the 'bilinear' method
+        cache: ProfileCache to use (None = always extract)
+
+    Returns:
+        Tuple of (distances, depths) arrays of shape (N, num_points)
+    """
+    endpoints = np.asarray(endpoints, dtype=float).reshape(-1, 2, 2)
+    if cache is None:
+        return _sample_depth_profiles(soundings, endpoints, num_points, method, grid_resolution)
+
+    keys = [profile_cache_key(soundings, endpoint, num_points, method, grid_resolution) for endpoint in endpoints]
+    cached = [cache.get(key) if key is not None else None for key in keys]
+    missing = [i for i, entry in enumerate(cached) if entry is None]
+    if not missing:
+        return np.array([entry[0] for entry in cached]), np.array([entry[1] for entry in cached])
+
+    distances = np.empty((len(endpoints), num_points))
+    depths = np.empty((len(endpoints), num_points))
+    for i, entry in enumerate(cached):
+        if entry is not None:
+            distances[i], depths[i] = entry
+    distances[missing], depths[missing] = _sample_depth_profiles(
+        soundings, endpoints[missing], num_points, method, grid_resolution)
+    for i in missing:
+        if keys[i] is not None:
+            cache.put(keys[i], distances[i], depths[i])
+    return distances, depths
+
+
+def _sample_depth_profiles(soundings, endpoints, num_points, method, grid_resolution):
+    """Uncached extraction for extract_depth_profiles"""
+    t = np.linspace(0.0, 1.0, num_points)
+    start, end = endpoints[:, 0, :], endpoints[:, 1, :]
+
+    # Sample coordinates for every section, shape (N, num_points)
+    lats = start[:, 0:1] + t * (end[:, 0:1] - start[:, 0:1])
+    lons = start[:, 1:2] + t * (end[:, 1:2] - start[:, 1:2])
+    distances = haversine_distance(start[:, 0:1], start[:, 1:2], lats, lons)
+
+    depths = sample_depths(soundings, lats, lons, method, grid_resolution)
+
+    # Fix NaN values
+    depths = fill_nan_rows(depths)
+
+    # If positive values exist (elevation), make negative (for depth)
+    flip = depths.mean(axis=1) > 0
+    depths[flip] = -depths[flip]
+
+    return distances, depths
+
+
+# ===== ADAPTIVE SAMPLING =====
+# Sample spacing follows the local sounding density instead of a fixed count,
+# and intervals are bisected only where the depth jumps or the design profile
+# crosses the bathymetry.
+
+@dataclass
+class AdaptiveProfile:
+    """
+    Adaptively sampled profile.
+
+    Attributes:
+        distances, depths: Samples along the section (m, depths negative)
+        spacing: Median sounding spacing near the section (m)
+        error_estimate: Estimated error of the trapezoid integral of the fill height
+            (or of the depth without a design profile), in m²
+        levels: Number of refinement passes
+    """
+    distances: np.ndarray
+    depths: np.ndarray
+    spacing: float
+    error_estimate: float
+    levels: int
+
+
+def local_sounding_spacing(soundings, lats, lons):
+    """Spacing (m) between the soundings nearest to each point: distance to their own nearest neighbour"""
+    lat = np.asarray(soundings.lat, dtype=float)
+    lon = np.asarray(soundings.lon, dtype=float)
+    tree = get_spatial_index(soundings)
+    _, nearest_idx = tree.query(np.column_stack((np.ravel(lats), np.ravel(lons))))
+    _, neighbour_idx = tree.query(np.column_stack((lat[nearest_idx], lon[nearest_idx])), k=2)
+    neighbour_idx = neighbour_idx[:, 1]
+    return haversine_distance(lat[nearest_idx], lon[nearest_idx], lat[neighbour_idx], lon[neighbour_idx])
+
+
+def _fill_integrand(distances, depths, design_depth):
+    """Fill height (or depth without a design profile) integrated by the error estimate"""
+    if design_depth is None:
+        return depths
+    return np.maximum(np.nan_to_num(design_depth(distances) - depths, nan=0.0), 0)
+
+
+def extract_adaptive_profile(soundings, point1, point2, design_depth=None, method='nearest',
+                             grid_resolution=DEFAULT_GRID_RESOLUTION, samples_per_spacing=2.0,
+                             depth_tolerance=0.25, min_spacing=None, max_levels=6, max_points=5000):
+    """
+    Sample bathymetry along a section with spacing taken from the sounding density.
+
+    Args:
+        soundings: Soundings to sample
+        point1, point2: Section end points {'lat': float, 'lon': float}
+        design_depth: Optional callable distance (m) -> design depth (negative, NaN where
+            undefined); intervals where it crosses the bathymetry are refined
+        method, grid_resolution: Depth lookup (see sample_depths)
+        samples_per_spacing: Initial samples per local sounding spacing
+        depth_tolerance: Intervals with a larger depth change are bisected (m)
+        min_spacing: Smallest sample spacing (m, default: 1/32 of the sounding spacing)
+        max_levels: Maximum refinement passes
+        max_points: Hard cap on the number of samples
+
+    Returns:
+        AdaptiveProfile
+    """
+    lat1, lon1, lat2, lon2 = point1['lat'], point1['lon'], point2['lat'], point2['lon']
+    length = float(haversine_distance(lat1, lon1, lat2, lon2))
+
+    def sample(t):
+        lats, lons = lat1 + t * (lat2 - lat1), lon1 + t * (lon2 - lon1)
+        return haversine_distance(lat1, lon1, lats, lons), sample_depths(soundings, lats, lons, method, grid_resolution)
+
+    # Sounding spacing along the section -> sample density; initial samples evenly spaced in
+    # cumulative density, so they are denser where the survey is denser
+    probe_t = np.linspace(0.0, 1.0, 33)
+    probe_spacing = np.maximum(local_sounding_spacing(soundings, lat1 + probe_t * (lat2 - lat1),
+                                                      lon1 + probe_t * (lon2 - lon1)), 1e-3)
+    spacing = float(np.median(probe_spacing))
+    density = samples_per_spacing / probe_spacing
+    cumulative = np.concatenate(([0.0], np.cumsum((density[1:] + density[:-1]) / 2 * np.diff(probe_t) * length)))
+    n_initial = int(np.clip(np.ceil(cumulative[-1]), 2, max_points - 1)) + 1
+    t = np.interp(np.linspace(0.0, cumulative[-1], n_initial), cumulative, probe_t)
+
+    distances, depths = sample(t)
+    flip = np.nanmean(depths) > 0 if np.isfinite(depths).any() else False
+    depths = -depths if flip else depths
+
+    min_spacing = spacing / 32 if min_spacing is None else min_spacing
+    levels = 0
+    for levels in range(1, max_levels + 1):
+        # With a design profile only jumps of the fill height matter (depth changes
+        # outside the fill region do not change the fill area)
+        gap = np.diff(distances) > 2 * min_spacing
+        refine = gap & (np.abs(np.diff(_fill_integrand(distances, depths, design_depth))) > depth_tolerance)
+        if design_depth is not None:
+            above = design_depth(distances) > depths
+            refine |= gap & (above[1:] != above[:-1])
+        refine &= np.cumsum(refine) <= max_points - len(t)
+        if not refine.any():
+            levels -= 1
+            break
+        new_t = (t[:-1] + t[1:])[refine] / 2
+        new_dist, new_depth = sample(new_t)
+        order = np.argsort(np.concatenate((t, new_t)), kind='stable')
+        t = np.concatenate((t, new_t))[order]
+        distances = np.concatenate((distances, new_dist))[order]
+        depths = np.concatenate((depths, -new_depth if flip else new_depth))[order]
+
+    depths = fill_nan_rows(depths[None, :])[0]
+
+    # Error estimate: all samples vs every other sample (end points kept)
+    coarse = np.unique(np.append(np.arange(0, len(t), 2), len(t) - 1))
+    integrand = _fill_integrand(distances, depths, design_depth)
+    error = abs(np.trapezoid(integrand, distances) - np.trapezoid(integrand[coarse], distances[coarse]))
+
+    return AdaptiveProfile(distances=distances, depths=depths, spacing=spacing, error_estimate=float(error), levels=levels)
+
+
+def extract_adaptive_profiles(soundings, endpoints, design_depths=None, **kwargs):
+    """
+    extract_adaptive_profile for many sections.
+
+    Args:
+        endpoints: Array of shape (N, 2, 2): [[[lat1, lon1], [lat2, lon2]], ...]
+        design_depths: Optional per-section design_depth callables
+
+    Returns:
+        List of AdaptiveProfile
+    """
+    endpoints = np.asarray(endpoints, dtype=float).reshape(-1, 2, 2)
+    design_depths = design_depths or [None] * len(endpoints)
+    return [
+        extract_adaptive_profile(soundings, {'lat': start[0], 'lon': start[1]}, {'lat': end[0], 'lon': end[1]},
+                                 design_depth, **kwargs)
+        for (start, end), design_depth in zip(endpoints, design_depths)
+    ]
+
+
+def extract_depth_profile(soundings, point1, point2, num_points=100, method='nearest', grid_resolution=DEFAULT_GRID_RESOLUTION):
+    """
+    Sample bathymetry along the line point1 -> point2.
+
+    Args:
+        soundings: Soundings to sample
+        point1, point2: Section end points {'lat': float, 'lon': float}
+        num_points: Number of samples along the section
+        method: 'nearest' (nearest sounding) or 'bilinear' (gridded bathymetry)
+        grid_resolution: Grid spacing in meters for the 'bilinear' method
+
+    Returns:
+        Tuple of (distances, depths) arrays
+    """
+    endpoints = [[[point1['lat'], point1['lon']], [point2['lat'], point2['lon']]]]
+    distances, depths = extract_depth_profiles(soundings, endpoints, num_points, method, grid_resolution)
+    return distances[0], depths[0]
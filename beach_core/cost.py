@@ -0,0 +1,83 @@
+# beach_core/cost.py
+# Cost estimate: fill material and placement, optional groin and sill
+from dataclasses import dataclass
+
+
+@dataclass
+class CostInputs:
+    """
+    Unit costs and structure dimensions (defaults match the app's inputs).
+    Structure volumes are length × width × height/depth (m³), unit costs in $/m³.
+    """
+    sand_cost: float = 20.0
+    transport_cost: float = 25.0
+    use_groin: bool = False
+    groin_length: float = 28.3
+    groin_width: float = 1.0
+    groin_depth: float = 5.5
+    groin_cost: float = 33.0
+    use_sill: bool = True
+    sill_length: float = 258.0
+    sill_width: float = 1.5
+    sill_height: float = 0.5
+    sill_cost: float = 30.0
+
+
+@dataclass
+class CostBreakdown:
+    """Cost breakdown of a project ($, volumes in m³)"""
+    fill_volume: float
+    fill_material_cost: float
+    fill_transport_cost: float
+    total_fill_cost: float
+    groin_volume: float
+    groin_total_cost: float
+    sill_volume: float
+    sill_total_cost: float
+    project_total_cost: float
+
+
+def compute_costs(fill_volume, inputs):
+    """
+    Calculate the project cost for a fill volume.
+
+    Args:
+        fill_volume: Total fill volume (m³)
+        inputs: CostInputs
+
+    Returns:
+        CostBreakdown
+    """
+    # Fill material costs
+    fill_material_cost = fill_volume * inputs.sand_cost
+    fill_transport_cost = fill_volume * inputs.transport_cost
+    total_fill_cost = fill_material_cost + fill_transport_cost
+
+    # Groin costs (if applicable)
+    groin_volume = 0
+    groin_total_cost = 0
+    if inputs.use_groin:
+        groin_volume = inputs.groin_length * inputs.groin_width * inputs.groin_depth
+        groin_total_cost = groin_volume * inputs.groin_cost
+
+    # Sill costs (if applicable)
+    sill_volume = 0
+    sill_total_cost = 0
+    if inputs.use_sill:
+        sill_volume = inputs.sill_length * inputs.sill_width * inputs.sill_height
+        sill_total_cost = sill_volume * inputs.sill_cost
+
+    # Grand total
+    project_total_cost = total_fill_cost + groin_total_cost + sill_total_cost
+
+    return CostBreakdown(
+        fill_volume=fill_volume,
+        fill_material_cost=fill_material_cost,
+        fill_transport_cost=fill_transport_cost,
+        total_fill_cost=total_fill_cost,
+        groin_volume=groin_volume,
+        groin_total_cost=groin_total_cost,
+        sill_volume=sill_volume,
+        sill_total_cost=sill_total_cost,
+        project_total_cost=project_total_cost,
+    )
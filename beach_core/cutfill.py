@@ -0,0 +1,252 @@
+# beach_core/cutfill.py
+# Raster cut/fill: the gridded bathymetry is differenced against the design surface
+# cell by cell over the whole project footprint, one block of grid rows at a time.
+# Replaces the fixed allowance for fill outside the drawn sections.
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+from .bathymetry import DEFAULT_GRID_RESOLUTION, get_bathymetry_grid
+from .design import NEW_SHORELINE_P1, NEW_SHORELINE_P2, DesignParams, dean_distance, dean_profile, sill_offset
+from .geometry import EARTH_RADIUS, to_geographic, to_local
+from .surface import nourishment_polygon, points_in_polygon
+
+RASTER_TILE_CELLS = 1_000_000  # grid cells differenced per tile
+RASTER_RESOLUTION = DEFAULT_GRID_RESOLUTION  # m, raster grid spacing (independent of the profile sampling grid)
+OUTSIDE_ZONE = 'Outside sections'
+
+
+@dataclass
+class CutFillResult:
+    """
+    Raster cut/fill volumes of a project.
+
+    Attributes:
+        fill: Fill volume over the footprint, design above the bathymetry (m³)
+        cut: Cut volume over the footprint, bathymetry above the design (m³)
+        zones: Zone names: the regions between consecutive sections, then OUTSIDE_ZONE
+        zone_fill, zone_cut: Fill and cut volume per zone (m³)
+        cell_area: Plan area of one grid cell (m²)
+        footprint_area: Plan area of the footprint cells with bathymetry (m²)
+        no_data_area: Plan area of the footprint cells outside the survey (m²)
+        footprint: Footprint outline, shape (4, 2) as [lat, lon]
+    """
+    fill: float
+    cut: float
+    zones: list
+    zone_fill: np.ndarray
+    zone_cut: np.ndarray
+    cell_area: float
+    footprint_area: float
+    no_data_area: float
+    footprint: np.ndarray
+
+    @property
+    def net(self):
+        return self.fill - self.cut
+
+    @property
+    def outside_fill(self):
+        """Fill volume outside the sections (the part the Average End Area Method does not cover)"""
+        return float(self.zone_fill[-1])
+
+
+def project_footprint(endpoints, shoreline=(NEW_SHORELINE_P1, NEW_SHORELINE_P2), params=None, origin=None):
+    """
+    Project footprint in local meters: the new shoreline from end to end, extended
+    landward to the sections' start points and seaward to the sill line.
+
+    Returns:
+        Tuple of (footprint (4, 2) in meters, section polygon (V, 2) in meters,
+        origin, shoreline point, alongshore unit direction, seaward unit normal)
+    """
+    params = params or DesignParams()
+    polygon, origin, shore_point, normal = nourishment_polygon(endpoints, shoreline, params, origin)
+    shore_end = np.array(to_local(shoreline[1]['lat'], shoreline[1]['lon'], *origin), dtype=float)
+    length = np.hypot(*(shore_end - shore_point))
+    direction = (shore_end - shore_point) / length
+
+    landward = min(0.0, float(((polygon - shore_point) @ normal).min()))
+    seaward = sill_offset(params)
+    footprint = np.array([
+        shore_point + landward * normal,
+        shore_point + length * direction + landward * normal,
+        shore_point + length * direction + seaward * normal,
+        shore_point + seaward * normal,
+    ])
+    return footprint, polygon, origin, shore_point, direction, normal
+
+
+def _region_index(x, y, endpoints_xy):
+    """
+    Region between consecutive sections of each point: the number of sections the
+    point lies beyond in alongshore order, minus one (valid inside the section polygon).
+    """
+    starts, ends = endpoints_xy[:, 0], endpoints_xy[:, 1]
+    alongshore = (starts + ends)[-1] / 2 - (starts + ends)[0] / 2
+    count = np.zeros(np.shape(x), dtype=np.int64)
+    for start, end in zip(starts, ends):
+        perp = np.array([-(end - start)[1], (end - start)[0]])
+        if perp @ alongshore < 0:
+            perp = -perp
+        count += (x - start[0]) * perp[0] + (y - start[1]) * perp[1] > 0
+    return count - 1
+
+
+def _cell_area(grid, origin):
+    """Plan area of one grid cell (m²) at the latitude of origin"""
+    d_lat, d_lon = grid['lat'][1] - grid['lat'][0], grid['lon'][1] - grid['lon'][0]
+    return (EARTH_RADIUS * np.radians(d_lat)) * (EARTH_RADIUS * np.radians(d_lon) * np.cos(np.radians(origin[0])))
+
+
+def _footprint_cells(grid, footprint, polygon, origin, tile_cells=RASTER_TILE_CELLS, progress=None):
+    """
+    Grid cells whose center lies in the footprint or the section polygon, a block of
+    grid rows (at most tile_cells cells) at a time.
+
+    Yields:
+        Tuples of (x, y, bathymetry (m, negative depths, NaN outside the survey), in section polygon)
+        arrays of the block's cells
+    """
+    grid_lat, grid_lon, depth = grid['lat'], grid['lon'], grid['depth']
+    d_lat, d_lon = grid_lat[1] - grid_lat[0], grid_lon[1] - grid_lon[0]
+
+    # Grid window around the footprint and the sections
+    outline = np.vstack((footprint, polygon))
+    lat_lim, lon_lim = to_geographic(outline[:, 0], outline[:, 1], *origin)
+    rows = np.clip(np.searchsorted(grid_lat, [lat_lim.min() - d_lat, lat_lim.max() + d_lat]), 0, len(grid_lat))
+    cols = np.clip(np.searchsorted(grid_lon, [lon_lim.min() - d_lon, lon_lim.max() + d_lon]), 0, len(grid_lon))
+    window = depth[rows[0]:rows[1], cols[0]:cols[1]]
+    # Depths negative, as in profile extraction
+    sign = -1.0 if window.size and np.nanmean(window) > 0 else 1.0
+
+    lon_axis = grid_lon[cols[0]:cols[1]]
+    block = max(1, int(tile_cells) // max(len(lon_axis), 1))
+    for row in range(rows[0], rows[1], block):
+        if progress:
+            progress(row - rows[0], rows[1] - rows[0])
+        lat_axis = grid_lat[row:min(row + block, rows[1])]
+        mesh_lon, mesh_lat = np.meshgrid(lon_axis, lat_axis)
+        x, y = to_local(mesh_lat, mesh_lon, *origin)
+
+        in_sections = points_in_polygon(x, y, polygon)
+        cells = in_sections | points_in_polygon(x, y, footprint)
+        if cells.any():
+            bathy = sign * depth[row:row + len(lat_axis), cols[0]:cols[1]][cells].astype(float)
+            yield x[cells], y[cells], bathy, in_sections[cells]
+
+
+def raster_cut_fill(soundings, endpoints, params=None, shoreline=(NEW_SHORELINE_P1, NEW_SHORELINE_P2),
+                    names=None, resolution=RASTER_RESOLUTION, tile_cells=RASTER_TILE_CELLS, grid=None,
+                    progress=None):
+    """
+    Cut and fill volumes between the gridded bathymetry and the design surface.
+
+    Every grid cell whose center lies in the project footprint or between the sections
+    contributes (design - bathymetry) × cell area: to the fill where positive, to the
+    cut where negative. The design surface is the Dean profile by the distance seaward
+    of the new shoreline (0 landward of it). Cells are processed in blocks of grid rows
+    of at most `tile_cells` cells, so memory does not grow with the footprint.
+
+    Args:
+        soundings: Soundings of the survey
+        endpoints: Sections, shape (N, 2, 2) as [[lat1, lon1], [lat2, lon2]], alongshore order (N >= 2)
+        params: DesignParams (defaults if None)
+        shoreline: New shoreline end points ({'lat', 'lon'} dicts)
+        names: Section names for the zone labels (default: 1, 2, ...)
+        resolution: Bathymetry grid spacing (m)
+        tile_cells: Maximum number of cells per tile
+        grid: Bathymetry grid (default: get_bathymetry_grid(soundings, resolution))
+        progress: Optional callback(done, total) per block of grid rows
+
+    Returns:
+        CutFillResult
+    """
+    params = params or DesignParams()
+    endpoints = np.asarray(endpoints, dtype=float).reshape(-1, 2, 2)
+    if len(endpoints) < 2:
+        raise ValueError("At least two sections are needed")
+    names = list(names) if names is not None else [str(i + 1) for i in range(len(endpoints))]
+    zones = [f"{a}-{b}" for a, b in zip(names[:-1], names[1:])] + [OUTSIDE_ZONE]
+    outside = len(zones) - 1
+
+    footprint, polygon, origin, shore_point, _, normal = project_footprint(endpoints, shoreline, params)
+    ex, ey = to_local(endpoints[..., 0], endpoints[..., 1], *origin)
+    endpoints_xy = np.stack((ex, ey), axis=-1)
+    offset = sill_offset(params)
+
+    grid = grid if grid is not None else get_bathymetry_grid(soundings, resolution)
+    cell_area = _cell_area(grid, origin)
+    zone_fill = np.zeros(len(zones))
+    zone_cut = np.zeros(len(zones))
+    n_cells = n_missing = 0
+    for x, y, bathy, in_sections in _footprint_cells(grid, footprint, polygon, origin, tile_cells, progress):
+        distance = (x - shore_point[0]) * normal[0] + (y - shore_point[1]) * normal[1]
+        zone = np.where(in_sections, np.clip(_region_index(x, y, endpoints_xy), 0, outside - 1), outside)
+
+        # Beyond the sill line (sections not reaching it) there is no design surface
+        valid = ~np.isnan(bathy) & (distance <= offset)
+        n_missing += int((np.isnan(bathy) & (distance <= offset)).sum())
+        n_cells += int(valid.sum())
+        thickness = -dean_profile(distance[valid], params.a, params.exponent) - bathy[valid]
+        zone_fill += np.bincount(zone[valid], weights=np.maximum(thickness, 0.0), minlength=len(zones))
+        zone_cut += np.bincount(zone[valid], weights=np.maximum(-thickness, 0.0), minlength=len(zones))
+
+    zone_fill *= cell_area
+    zone_cut *= cell_area
+    footprint_lat, footprint_lon = to_geographic(footprint[:, 0], footprint[:, 1], *origin)
+    return CutFillResult(
+        fill=float(zone_fill.sum()),
+        cut=float(zone_cut.sum()),
+        zones=zones,
+        zone_fill=zone_fill,
+        zone_cut=zone_cut,
+        cell_area=float(cell_area),
+        footprint_area=float(n_cells * cell_area),
+        no_data_area=float(n_missing * cell_area),
+        footprint=np.column_stack((footprint_lat, footprint_lon)),
+    )
+
+
+def outside_fill_sweep(soundings, endpoints, a_values, params=None, shoreline=(NEW_SHORELINE_P1, NEW_SHORELINE_P2),
+                       resolution=RASTER_RESOLUTION, tile_cells=RASTER_TILE_CELLS, grid=None, progress=None):
+    """
+    Fill outside the sections (CutFillResult.outside_fill) for many profile parameters A.
+
+    The footprint cells are found once, for the smallest A (the sill line farthest
+    seaward). The footprint and section polygon of a larger A are these cut at its
+    sill offset (exactly so for sections reaching the sill line), so a cell counts for
+    an A when its distance from the shoreline is within that A's sill offset, and the
+    Dean surfaces of all A are differenced as one (K, cells) array per block.
+
+    Args:
+        soundings, endpoints, shoreline, resolution, grid: See raster_cut_fill
+        a_values: K profile scale parameters
+        params: DesignParams for the exponent and sill depth (its A is not used)
+        tile_cells: Maximum number of (A, cell) pairs per block
+        progress: Optional callback(done, total) per block of grid rows
+
+    Returns:
+        Array of fill volumes outside the sections (m³), shape (K,)
+    """
+    params = params or DesignParams()
+    a = np.atleast_1d(np.asarray(a_values, dtype=float))
+    endpoints = np.asarray(endpoints, dtype=float).reshape(-1, 2, 2)
+    if len(endpoints) < 2:
+        raise ValueError("At least two sections are needed")
+    offsets = dean_distance(params.sill_depth, a, params.exponent)  # (K,)
+    widest = replace(params, a=float(a.min()))
+    footprint, polygon, origin, shore_point, _, normal = project_footprint(endpoints, shoreline, widest)
+
+    grid = grid if grid is not None else get_bathymetry_grid(soundings, resolution)
+    fill = np.zeros(len(a))
+    step = max(1, int(tile_cells) // len(a))
+    for x, y, bathy, in_sections in _footprint_cells(grid, footprint, polygon, origin, tile_cells, progress):
+        distance = (x - shore_point[0]) * normal[0] + (y - shore_point[1]) * normal[1]
+        outside = ~in_sections & ~np.isnan(bathy) & (distance <= offsets.max())
+        distance, bathy = distance[outside], bathy[outside]
+        for start in range(0, len(distance), step):
+            d, z = distance[None, start:start + step], bathy[None, start:start + step]
+            thickness = -dean_profile(d, a[:, None], params.exponent) - z  # (K, cells)
+            fill += np.where(d <= offsets[:, None], np.maximum(thickness, 0.0), 0.0).sum(axis=1)
+    return fill * _cell_area(grid, origin)
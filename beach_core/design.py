@@ -0,0 +1,156 @@
+# beach_core/design.py
+# Design profile: equilibrium (Dean) profile h = A * x^m from the new shoreline out to the sill
+from dataclasses import dataclass
+
+import numpy as np
+
+from .geometry import calculate_distance, find_line_intersection
+
+# New shoreline of the Ağlayankaya project (fill start line)
+NEW_SHORELINE_P1 = {'lat': 41.1775, 'lon': 29.6244}  # 41°10'39"N 29°37'28"E
+NEW_SHORELINE_P2 = {'lat': 41.1747, 'lon': 29.6286}  # 41°10'29"N 29°37'43"E
+
+
+@dataclass
+class DesignParams:
+    """
+    Design profile parameters.
+
+    Attributes:
+        a: Profile scale parameter A in h = A * x^m
+        exponent: Profile exponent m
+        sill_depth: Target depth for the sill (m, positive)
+        buffer_distance: Bathymetry kept beyond the sill (m)
+    """
+    a: float = 0.11
+    exponent: float = 0.67
+    sill_depth: float = 2.5
+    buffer_distance: float = 10.0
+
+    @classmethod
+    def from_d50(cls, d50, **kwargs):
+        """Parameters with A derived from the median grain size d50 (mm)"""
+        return cls(a=float(dean_a_from_d50(d50)), **kwargs)
+
+
+@dataclass
+class DesignProfile:
+    """
+    Design profile of one section, with the bathymetry trimmed to the sill + buffer.
+    Distances are measured from the section's first point (m), depths are negative (m).
+    """
+    bathy_dist: np.ndarray
+    bathy_depth: np.ndarray
+    design_dist: np.ndarray
+    design_depth: np.ndarray
+    fill_distance: float  # Original shoreline position (fill start)
+    sill_distance: float
+    sill_depth: float
+
+
+def dean_a_from_d50(d50):
+    """
+    Profile scale parameter A (m^1/3) from the median grain size, Moore (1982) fit
+    (d50 = 0.25 mm gives A ≈ 0.11).
+
+    Args:
+        d50: Median grain size (mm), scalar or array
+
+    Returns:
+        A, same shape as d50
+    """
+    d = np.asarray(d50, dtype=float)
+    return np.select(
+        [d < 0.4, d < 10.0, d < 40.0],
+        [0.41 * d ** 0.94, 0.23 * d ** 0.32, 0.23 * d ** 0.28],
+        default=0.46 * d ** 0.11
+    )
+
+
+def dean_profile(x, a, exponent=0.67):
+    """
+    Equilibrium profile depth h = A * x^m (positive, 0 landward of the shoreline).
+    x and a broadcast: e.g. x of shape (P,) with a of shape (K, 1) gives (K, P).
+    """
+    return np.asarray(a, dtype=float) * np.maximum(np.asarray(x, dtype=float), 0) ** exponent
+
+
+def dean_distance(depth, a, exponent=0.67):
+    """Distance from the shoreline where the profile reaches the given depth: x = (h / A)^(1/m) (broadcasts)"""
+    return (np.asarray(depth, dtype=float) / np.asarray(a, dtype=float)) ** (1 / exponent)
+
+
+def sill_offset(params):
+    """Distance from the shoreline where the profile reaches the sill depth"""
+    return float(dean_distance(params.sill_depth, params.a, params.exponent))
+
+
+def design_depth_function(fill_distance, params=None):
+    """Design depth as a function of distance along the section (negative, NaN beyond the sill)"""
+    params = params or DesignParams()
+    sill_distance = fill_distance + sill_offset(params)
+
+    def depth_at(x):
+        x = np.asarray(x, dtype=float)
+        return np.where(x <= sill_distance, -dean_profile(x - fill_distance, params.a, params.exponent), np.nan)
+
+    return depth_at
+
+
+def fill_start_distance(point1, point2, shoreline_p1, shoreline_p2):
+    """Distance along the section to its intersection with the new shoreline (0 if they don't cross)"""
+    intersection_start = find_line_intersection(point1, point2, shoreline_p1, shoreline_p2)
+    return calculate_distance(point1, intersection_start) if intersection_start else 0.0
+
+
+def build_design_profile(bathy_dist, bathy_depth, fill_distance, params=None):
+    """
+    Create the design profile for a section from its bathymetry profile.
+    Zero depth up to the fill start, then the equilibrium profile down to the sill.
+
+    Args:
+        bathy_dist, bathy_depth: Bathymetry profile along the section
+        fill_distance: Distance of the new shoreline along the section (m)
+        params: DesignParams (defaults if None)
+
+    Returns:
+        DesignProfile
+    """
+    params = params or DesignParams()
+    bathy_dist = np.asarray(bathy_dist, dtype=float)
+    bathy_depth = np.asarray(bathy_depth, dtype=float)
+
+    # Sill location: where the profile reaches the target depth
+    sill_distance = fill_distance + sill_offset(params)
+    sill_depth = -params.sill_depth
+
+    # Trim bathymetry profile to sill + buffer distance (distances increase along the
+    # section, so the trimmed profile is a view of the extracted one)
+    max_distance = sill_distance + params.buffer_distance
+    end = int(np.searchsorted(bathy_dist, max_distance, side='right'))
+    dist_trimmed = bathy_dist[:end]
+    depth_trimmed = bathy_depth[:end]
+
+    # Ensure bathymetry has a point at sill location
+    if len(dist_trimmed) and dist_trimmed[-1] < sill_distance:
+        dist_trimmed = np.append(dist_trimmed, sill_distance)
+        depth_trimmed = np.append(depth_trimmed, np.interp(sill_distance, bathy_dist, bathy_depth))
+
+    # Design depth at each trimmed bathymetry distance (only up to sill)
+    design_dist = dist_trimmed[:int(np.searchsorted(dist_trimmed, sill_distance, side='right'))]
+    design_depth = -dean_profile(design_dist - fill_distance, params.a, params.exponent)
+
+    # Ensure design profile ends exactly at sill point
+    if len(design_dist) == 0 or abs(design_dist[-1] - sill_distance) > 0.01:
+        design_dist = np.append(design_dist, sill_distance)
+        design_depth = np.append(design_depth, sill_depth)
+
+    return DesignProfile(
+        bathy_dist=dist_trimmed,
+        bathy_depth=depth_trimmed,
+        design_dist=design_dist,
+        design_depth=design_depth,
+        fill_distance=fill_distance,
+        sill_distance=sill_distance,
+        sill_depth=sill_depth,
+    )
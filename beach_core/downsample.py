@@ -0,0 +1,56 @@
+# beach_core/downsample.py
+# Shape-preserving downsampling of long profiles for plotting:
+# Largest-Triangle-Three-Buckets (Steinarsson, 2013)
+import numpy as np
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Indices of the points kept by Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept. The points in between are split into
+    n_out - 2 buckets; from each bucket the point forming the largest triangle with the
+    point kept from the previous bucket and the average of the next bucket is kept,
+    so peaks and troughs survive.
+
+    Args:
+        x, y: Profile, x increasing
+        n_out: Number of points to keep (all points if the profile is not longer)
+
+    Returns:
+        Sorted index array of length min(n_out, len(x))
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # Bucket edges: bucket i covers [edges[i], edges[i + 1]), the last point is its own bucket
+    edges = (np.arange(n_out - 1) * (n - 2) / (n_out - 2)).astype(np.int64) + 1
+    edges[-1] = n - 1
+    edges = np.append(edges, n)
+
+    # Bucket averages from cumulative sums (NaN depths count as 0 in the average)
+    cx = np.concatenate(([0.0], np.cumsum(x)))
+    cy = np.concatenate(([0.0], np.cumsum(np.nan_to_num(y))))
+    counts = np.diff(edges)
+    avg_x = (cx[edges[1:]] - cx[edges[:-1]]) / counts
+    avg_y = (cy[edges[1:]] - cy[edges[:-1]]) / counts
+
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        bx, by = x[start:end], y[start:end]
+        area = np.abs((x[a] - avg_x[i + 1]) * (by - y[a]) - (x[a] - bx) * (avg_y[i + 1] - y[a]))
+        a = start + int(np.argmax(np.nan_to_num(area, nan=-1.0)))
+        indices[i + 1] = a
+    return indices
+
+
+def lttb(x, y, n_out):
+    """Downsample a profile to n_out points with Largest-Triangle-Three-Buckets: returns (x, y)"""
+    indices = lttb_indices(x, y, n_out)
+    return np.asarray(x)[indices], np.asarray(y)[indices]
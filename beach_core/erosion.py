@@ -0,0 +1,237 @@
+# beach_core/erosion.py
+# Long-term erosion: shoreline retreat with the profile pinned at the sill
+from dataclasses import dataclass
+
+import numpy as np
+
+from .geometry import haversine_distance
+
+DEFAULT_RETREAT_RATE = 0.7  # m/year, for a new section (each section has its own, see Section.retreat_rate)
+EROSION_YEARS = 30
+RENOURISHMENT_HORIZON = 50  # years
+SIMULATION_POINTS = 200  # samples per transect, shoreline to sill
+
+
+@dataclass
+class ErosionResult:
+    """
+    Eroded design profile after a number of years.
+    eroded_dist / eroded_depth are None when the retreat would pass the sill.
+    """
+    retreat_rate: float
+    years: int
+    total_retreat: float
+    x_shore_old: float
+    x_shore_new: float
+    eroded_dist: np.ndarray = None
+    eroded_depth: np.ndarray = None
+
+
+def shoreline_position(design_dist, design_depth):
+    """
+    Original shoreline position from a design profile:
+    the last zero-depth point before the profile first goes below zero.
+    """
+    design_dist = np.asarray(design_dist, dtype=float)
+    below = np.flatnonzero(np.asarray(design_depth) < 0)
+    if len(below) == 0:
+        return 0.0
+    return float(design_dist[max(below[0] - 1, 0)])
+
+
+def erode_profile(design_dist, design_depth, sill_distance, sill_depth, retreat_rate,
+                  years=EROSION_YEARS, exponent=0.67, num_points=100):
+    """
+    Retreat the shoreline by retreat_rate * years and refit the profile
+    y = a * (x - x_shore_new)^m so it still passes through the sill.
+
+    Returns:
+        ErosionResult
+    """
+    total_retreat = years * retreat_rate  # meters
+    x_shore_old = shoreline_position(design_dist, design_depth)
+    x_shore_new = x_shore_old - total_retreat
+    result = ErosionResult(retreat_rate, years, total_retreat, x_shore_old, x_shore_new)
+
+    # Sill remains at same location
+    # At sill: y_sill = a * (x_sill - x_shore_new)^m  =>  a = y_sill / (x_sill - x_shore_new)^m
+    delta_x = sill_distance - x_shore_new
+    if delta_x <= 0:
+        return result
+
+    a_new = sill_depth / (delta_x ** exponent)
+    eroded_dist = np.linspace(x_shore_new, sill_distance, num_points)
+    relative_x = eroded_dist - x_shore_new
+    result.eroded_dist = eroded_dist
+    result.eroded_depth = np.where(relative_x > 0, a_new * np.maximum(relative_x, 0) ** exponent, 0.0)  # Already negative
+    return result
+
+
+# ===== MULTI-YEAR SIMULATION =====
+# All transects and years at once: the eroded profiles form a (years, transects, x)
+# array, from which the yearly remaining fill and shoreline positions follow.
+
+@dataclass
+class ErosionSimulation:
+    """
+    Yearly erosion of a nourished project.
+
+    Attributes:
+        years: Years since nourishment, shape (Y,)
+        retreat_rates: Retreat rate per transect (m/year), shape (N,)
+        shoreline: Shoreline position along each transect (m from its start), shape (Y, N)
+        x: Sample distances along each transect, start to sill, shape (N, P)
+        depth: Eroded profiles (negative), shape (Y, N, P)
+        areas: Remaining fill area per transect (m²), shape (Y, N)
+        volume: Remaining fill volume between the transects (m³), shape (Y,)
+    """
+    years: np.ndarray
+    retreat_rates: np.ndarray
+    shoreline: np.ndarray
+    x: np.ndarray
+    depth: np.ndarray
+    areas: np.ndarray
+    volume: np.ndarray
+
+    @property
+    def remaining_fraction(self):
+        return self.volume / self.volume[0] if self.volume[0] > 0 else np.ones_like(self.volume)
+
+
+def simulate_erosion(bathy_dists, bathy_depths, fill_distances, sill_distances, sill_depth, retreat_rates,
+                     endpoints, years=RENOURISHMENT_HORIZON, exponent=0.67, num_points=SIMULATION_POINTS):
+    """
+    Step the erosion of every transect through every year.
+
+    Each year the shoreline of a transect retreats by its rate and the profile is refit
+    through the fixed sill point, as in erode_profile. The remaining fill is the area
+    between the eroded profile and the bathymetry up to the sill, integrated between
+    transects with the Average End Area Method.
+
+    Args:
+        bathy_dists, bathy_depths: Bathymetry profiles, one per transect (alongshore order)
+        fill_distances: Design shoreline position along each transect (m)
+        sill_distances: Sill position along each transect (m)
+        sill_depth: Sill depth (m, positive or negative)
+        retreat_rates: Retreat rate (m/year), scalar or one per transect
+        endpoints: Transect end points, shape (N, 2, 2) as [[lat1, lon1], [lat2, lon2]]
+        years: Last simulated year (years 0..years)
+        num_points: Samples per transect between its start and the sill
+
+    Returns:
+        ErosionSimulation
+
+    Raises:
+        ValueError: A negative retreat rate, or a design shoreline at or beyond its sill
+    """
+    n = len(bathy_dists)
+    fill = np.asarray(fill_distances, dtype=float)
+    sill = np.asarray(sill_distances, dtype=float)
+    rates = np.broadcast_to(np.asarray(retreat_rates, dtype=float), (n,)).copy()
+    year = np.arange(int(years) + 1, dtype=float)
+    if np.any(rates < 0):
+        raise ValueError("Retreat rates must not be negative")
+    # The profile is refit between the shoreline and the sill, so the shoreline must start
+    # landward of the sill (it only moves further landward)
+    reached = np.flatnonzero(~(sill > fill))  # Also catches missing (NaN) positions
+    if len(reached):
+        raise ValueError(f"Transect {reached[0] + 1} has no design shoreline landward of its sill")
+
+    x = sill[:, None] * np.linspace(0.0, 1.0, num_points)  # (N, P)
+    bathy = np.array([np.interp(x[i], bathy_dists[i], bathy_depths[i]) for i in range(n)])
+
+    # Eroded profile: zero up to the retreated shoreline, then y = -h_sill * (relative x)^m to the sill.
+    # Computed in place: allocating (Y, N, P) temporaries costs more than the arithmetic.
+    shoreline = fill - year[:, None] * rates  # (Y, N)
+    relative = x[None] - shoreline[..., None]  # (Y, N, P)
+    relative /= (sill - shoreline)[..., None]
+    np.clip(relative, 0.0, 1.0, out=relative)
+    depth = np.zeros_like(relative)
+    np.power(relative, exponent, out=depth, where=relative > 0)  # 0 ** m takes a slow path
+    depth *= -abs(sill_depth)
+
+    # Fill height above the bathymetry; samples are evenly spaced along each transect (trapezoid rule)
+    fill_height = np.subtract(depth, bathy[None], out=relative)
+    np.maximum(fill_height, 0.0, out=fill_height)
+    dx = sill / (num_points - 1)
+    areas = dx * (fill_height.sum(axis=-1) - 0.5 * (fill_height[..., 0] + fill_height[..., -1]))  # (Y, N)
+
+    midpoints = np.asarray(endpoints, dtype=float).reshape(-1, 2, 2).mean(axis=1)
+    spacing = haversine_distance(midpoints[:-1, 0], midpoints[:-1, 1], midpoints[1:, 0], midpoints[1:, 1])
+    volume = ((areas[:, :-1] + areas[:, 1:]) / 2 * spacing).sum(axis=1)
+
+    return ErosionSimulation(year, rates, shoreline, x, depth, areas, volume)
+
+
+@dataclass
+class RenourishmentScenarios:
+    """
+    Periodic renourishment over a horizon, one entry per interval.
+
+    Attributes:
+        intervals: Years between renourishments, shape (I,)
+        events: Renourishments within the horizon, shape (I,)
+        event_volume: Fill placed per renourishment (m³), shape (I,)
+        total_volume: Fill placed over the horizon (m³), shape (I,)
+        discounted_volume: total_volume discounted to year 0, shape (I,)
+        mean_remaining: Mean yearly remaining fraction of the design fill, shape (I,)
+        min_remaining: Lowest remaining fraction before a renourishment, shape (I,)
+    """
+    intervals: np.ndarray
+    events: np.ndarray
+    event_volume: np.ndarray
+    total_volume: np.ndarray
+    discounted_volume: np.ndarray
+    mean_remaining: np.ndarray
+    min_remaining: np.ndarray
+
+
+def renourishment_scenarios(simulation, intervals=None, horizon=RENOURISHMENT_HORIZON, discount_rate=0.0):
+    """
+    Evaluate renourishment every T years for all intervals at once. After each
+    renourishment the project is back at its design, so every cycle repeats the
+    simulated remaining-fill curve from year 0 to T.
+
+    Args:
+        simulation: ErosionSimulation covering at least the longest interval
+        intervals: Renourishment intervals in years (default: 1 .. horizon)
+        horizon: Planning horizon (years)
+        discount_rate: Yearly discount rate for the discounted volume (e.g. 0.04)
+
+    Returns:
+        RenourishmentScenarios
+    """
+    horizon = int(horizon)
+    intervals = np.arange(1, horizon + 1) if intervals is None else np.asarray(intervals, dtype=int)
+    if intervals.min() < 1 or intervals.max() >= len(simulation.volume):
+        raise ValueError(f"Intervals must be between 1 and {len(simulation.volume) - 1} years")
+
+    volume = simulation.volume
+    fraction = simulation.remaining_fraction
+    event_volume = volume[0] - volume[intervals]
+    events = (horizon - 1) // intervals  # Renourishments strictly before the horizon
+
+    # Event years: T, 2T, ... (padded to the largest count)
+    k = np.arange(1, max(int(events.max()), 1) + 1)
+    event_years = intervals[:, None] * k
+    discount = np.where(k <= events[:, None], (1 + discount_rate) ** -event_years.astype(float), 0.0)
+
+    # Remaining fraction in each year of the horizon: the curve restarts every T years
+    cycle_year = np.arange(horizon)[None] % intervals[:, None]  # (I, H)
+    remaining = fraction[cycle_year]
+
+    return RenourishmentScenarios(
+        intervals=intervals,
+        events=events,
+        event_volume=event_volume,
+        total_volume=events * event_volume,
+        discounted_volume=event_volume * discount.sum(axis=1),
+        mean_remaining=remaining.mean(axis=1),
+        min_remaining=np.where(events > 0, fraction[np.minimum(intervals, horizon - 1)], remaining.min(axis=1)),
+    )
+
+
+def renourishment_interval(simulation, min_remaining=0.5):
+    """Years until the remaining fill first drops below min_remaining of the design fill (None if never)"""
+    below = np.flatnonzero(simulation.remaining_fraction < min_remaining)
+    return int(simulation.years[below[0]]) if len(below) else None
@@ -0,0 +1,90 @@
+# beach_core/geometry.py
+# Coordinate helpers: line intersection, great-circle distances, midpoints,
+# local projection to meters
+import numpy as np
+
+EARTH_RADIUS = 6371000  # meters
+
+
+def find_line_intersection(p1, p2, p3, p4):
+    """Find intersection point between two lines
+    p1-p2: First line (section line)
+    p3-p4: Second line (new shoreline)
+    """
+    try:
+        # Calculate intersection point between two lines
+        x1, y1 = p1['lon'], p1['lat']
+        x2, y2 = p2['lon'], p2['lat']
+        x3, y3 = p3['lon'], p3['lat']
+        x4, y4 = p4['lon'], p4['lat']
+
+        # Calculate determinant
+        denom = (x1 - x2) * (y3 - y4) - (y1 - y2) * (x3 - x4)
+
+        if abs(denom) < 1e-10:  # Parallel lines
+            return None
+
+        # Intersection point
+        t = ((x1 - x3) * (y3 - y4) - (y1 - y3) * (x3 - x4)) / denom
+
+        # Check if intersection point is on the section line
+        # t value should be between 0 and 1
+        if t < 0 or t > 1:
+            return None
+
+        # Intersection point coordinates
+        intersection_lon = x1 + t * (x2 - x1)
+        intersection_lat = y1 + t * (y2 - y1)
+
+        return {'lat': intersection_lat, 'lon': intersection_lon}
+    except:
+        return None
+
+
+def haversine_distance(lat1, lon1, lat2, lon2):
+    """Great-circle distance in meters (Haversine formula), works on scalars or arrays"""
+    lat1_rad = np.radians(lat1)
+    lat2_rad = np.radians(lat2)
+    delta_lat = np.radians(np.subtract(lat2, lat1))
+    delta_lon = np.radians(np.subtract(lon2, lon1))
+
+    a = np.sin(delta_lat/2)**2 + np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin(delta_lon/2)**2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1-a))
+    return EARTH_RADIUS * c
+
+
+def calculate_distance(point1, point2):
+    """Calculate distance between two points (Haversine formula)"""
+    return haversine_distance(point1['lat'], point1['lon'], point2['lat'], point2['lon'])
+
+
+def to_local(lat, lon, lat0, lon0):
+    """Equirectangular projection to meters around (lat0, lon0): returns (x east, y north)"""
+    x = EARTH_RADIUS * np.radians(np.asarray(lon, dtype=float) - lon0) * np.cos(np.radians(lat0))
+    y = EARTH_RADIUS * np.radians(np.asarray(lat, dtype=float) - lat0)
+    return x, y
+
+
+def to_geographic(x, y, lat0, lon0):
+    """Inverse of to_local: (x east, y north) in meters around (lat0, lon0) to (lat, lon)"""
+    lat = lat0 + np.degrees(np.asarray(y) / EARTH_RADIUS)
+    lon = lon0 + np.degrees(np.asarray(x) / (EARTH_RADIUS * np.cos(np.radians(lat0))))
+    return lat, lon
+
+
+def calculate_section_midpoint(points):
+    """
+    Calculate the midpoint of a section line.
+
+    Args:
+        points: List of two points [{'lat': float, 'lon': float}, ...]
+
+    Returns:
+        Midpoint coordinates {'lat': float, 'lon': float} or None if insufficient points
+    """
+    if len(points) >= 2:
+        return {
+            'lat': (points[0]['lat'] + points[1]['lat']) / 2,
+            'lon': (points[0]['lon'] + points[1]['lon']) / 2
+        }
+    return None
@@ -0,0 +1,133 @@
+# beach_core/jobs.py
+# Background jobs on a worker pool shared by all sessions of a process: a job reports
+# its progress, can be cancelled (queued ones never start, running ones stop at their
+# next progress report), and is polled for its result instead of being waited on.
+#
+# Threads, not processes: the numerical core spends its time in NumPy / SciPy calls
+# that release the GIL, and jobs read the process-wide survey caches (soundings,
+# spatial index, grids) without copying them. beach_core.batch uses a process pool
+# for whole scenarios instead.
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from . import timing
+
+DEFAULT_WORKERS = int(os.environ.get('BEACH_JOB_WORKERS', 0)) or min(8, os.cpu_count() or 1)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class Cancelled(Exception):
+    """Raised in a job's function by its progress callback once the job is cancelled"""
+
+
+class Job:
+    """
+    A function running on a JobPool.
+
+    Attributes:
+        name: Job kind (e.g. 'profiles')
+        key: Hash of the job's inputs, to tell whether a running job is still wanted
+        progress: Fraction done (0 to 1), as last reported
+        message: Last progress message (None if none)
+        submitted: Submission time (time.time())
+        profiler: Profiler current on the job's worker thread, enabled if the submitting
+            thread's is: the job's run time (stage 'job:<name>') and any stages inside it,
+            to be merged into a run with Profiler.merge once the job is done
+    """
+
+    def __init__(self, name, key=None):
+        self.name = name
+        self.key = key
+        self.progress = 0.0
+        self.message = None
+        self.submitted = time.time()
+        self.profiler = timing.Profiler(enabled=timing.current().enabled)
+        self._cancel = threading.Event()
+        self._future = None
+
+    def report(self, done, total, message=None):
+        """Progress callback(done, total) given to the job's function; raises Cancelled once cancelled"""
+        if self._cancel.is_set():
+            raise Cancelled(self.name)
+        self.progress = min(done / total, 1.0) if total else 1.0
+        if message is not None:
+            self.message = message
+
+    def cancel(self):
+        """Cancel the job: it does not start if still queued, and stops at its next progress report"""
+        self._cancel.set()
+        self._future.cancel()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    @property
+    def done(self):
+        """Finished, failed or cancelled"""
+        return self._future.done()
+
+    @property
+    def elapsed(self):
+        return time.time() - self.submitted
+
+    def wait(self, timeout=None):
+        """Wait up to timeout seconds for the job to finish: returns whether it is done"""
+        wait([self._future], timeout)
+        return self.done
+
+    def result(self):
+        """Result of a finished job (raises its exception, or Cancelled)"""
+        if self._future.cancelled():
+            raise Cancelled(self.name)
+        return self._future.result()
+
+
+class JobPool:
+    """Worker threads running jobs in submission order"""
+
+    def __init__(self, max_workers=DEFAULT_WORKERS):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='beach-job')
+
+    def submit(self, name, key, func, *args, **kwargs):
+        """
+        Run func(*args, progress=job.report, **kwargs) on a worker.
+
+        Args:
+            name: Job kind
+            key: Hash of the job's inputs (see Job)
+            func: Function taking a progress callback(done, total) keyword argument;
+                it should report regularly, which is where a cancelled job stops
+
+        Returns:
+            Job
+        """
+        job = Job(name, key)
+        job._future = self._executor.submit(self._run, job, func, args, kwargs)
+        return job
+
+    @staticmethod
+    def _run(job, func, args, kwargs):
+        job.report(0, 1)  # Cancelled while queued
+        with timing.use(job.profiler), job.profiler.stage(f"job:{job.name}"):
+            result = func(*args, progress=job.report, **kwargs)
+        job.report(1, 1)
+        return result
+
+    def shutdown(self, cancel_pending=True):
+        self._executor.shutdown(wait=False, cancel_futures=cancel_pending)
+
+
+def shared_pool():
+    """Process-wide JobPool (created on first use, BEACH_JOB_WORKERS threads)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = JobPool()
+    return _pool
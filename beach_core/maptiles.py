@@ -0,0 +1,304 @@
+# beach_core/maptiles.py
+# Bathymetry map overlay: the survey is rendered once into a colored depth raster
+# and depth contour lines, cut into Web Mercator (XYZ) image tiles for each zoom
+# level and written to disk, so a web map only fetches the static tiles in view.
+#
+# Usage:
+#   python -m beach_core.maptiles data.nc [-o static/tiles/data] [--min-zoom 12] [--max-zoom 17]
+#
+# Output layout (directory):
+#   meta.json                  source file and its modification time, bounds, zoom levels, depth range
+#   depth/{z}/{x}/{y}.png      colored depth, transparent outside the survey
+#   contours/{z}/{x}/{y}.png   contour lines every `contour_interval` meters, transparent elsewhere
+import argparse
+import json
+import math
+import os
+import sys
+import time
+import zlib
+
+import numpy as np
+
+from .bathymetry import DEFAULT_GRID_RESOLUTION, get_bathymetry_grid, iter_sounding_chunks, sample_grid_bilinear, \
+    soundings_for_transects
+from .geometry import EARTH_RADIUS
+
+TILES_VERSION = 1
+TILE_PIXELS = 256
+DEFAULT_MIN_ZOOM = 12
+CONTOUR_INTERVAL = 1.0  # meters
+# Depth color ramp: (fraction of the depth range, RGB), shallow to deep
+DEPTH_COLORS = [(0.0, (224, 246, 250)), (0.35, (116, 196, 224)), (0.7, (38, 120, 186)), (1.0, (8, 48, 107))]
+DEPTH_ALPHA = 170
+CONTOUR_COLOR = (20, 20, 20, 200)
+_MERCATOR_MAX_LAT = 85.0511
+
+
+# ===== TILE GEOMETRY =====
+
+def lat_lon_to_pixel(lat, lon, zoom):
+    """Global Web Mercator pixel coordinates of points at a zoom level: returns (x, y)"""
+    scale = TILE_PIXELS * 2 ** zoom
+    lat = np.radians(np.clip(np.asarray(lat, dtype=float), -_MERCATOR_MAX_LAT, _MERCATOR_MAX_LAT))
+    x = (np.asarray(lon, dtype=float) + 180.0) / 360.0 * scale
+    y = (1.0 - np.log(np.tan(lat) + 1.0 / np.cos(lat)) / np.pi) / 2.0 * scale
+    return x, y
+
+
+def pixel_to_lat_lon(x, y, zoom):
+    """Inverse of lat_lon_to_pixel: returns (lat, lon)"""
+    scale = TILE_PIXELS * 2 ** zoom
+    lon = np.asarray(x, dtype=float) / scale * 360.0 - 180.0
+    lat = np.degrees(np.arctan(np.sinh(np.pi * (1.0 - 2.0 * np.asarray(y, dtype=float) / scale))))
+    return lat, lon
+
+
+def native_max_zoom(resolution, lat):
+    """Highest zoom level worth rendering: pixels about half the grid spacing"""
+    ground_pixel = 2 * np.pi * EARTH_RADIUS * math.cos(math.radians(lat)) / TILE_PIXELS
+    return int(math.ceil(math.log2(ground_pixel / (resolution / 2))))
+
+
+def tile_range(bounds, zoom):
+    """Tile columns and rows covering (lat_min, lat_max, lon_min, lon_max): returns (x0, x1, y0, y1), inclusive"""
+    lat_min, lat_max, lon_min, lon_max = bounds
+    x0, y0 = lat_lon_to_pixel(lat_max, lon_min, zoom)
+    x1, y1 = lat_lon_to_pixel(lat_min, lon_max, zoom)
+    return (int(x0 // TILE_PIXELS), int(x1 // TILE_PIXELS), int(y0 // TILE_PIXELS), int(y1 // TILE_PIXELS))
+
+
+# ===== RENDERING =====
+
+def depth_colors(depth, depth_range):
+    """RGBA image of positive-down depths on the depth color ramp (transparent where NaN)"""
+    low, high = depth_range
+    fraction = np.nan_to_num(np.clip((depth - low) / max(high - low, 1e-9), 0.0, 1.0))
+    stops = [stop for stop, _ in DEPTH_COLORS]
+    image = np.zeros(depth.shape + (4,), dtype=np.uint8)
+    for channel in range(3):
+        image[..., channel] = np.interp(fraction, stops, [color[channel] for _, color in DEPTH_COLORS])
+    image[..., 3] = np.where(np.isnan(depth), 0, DEPTH_ALPHA)
+    return image
+
+
+def contour_mask(depth, interval=CONTOUR_INTERVAL):
+    """
+    Contour line pixels of a depth image with one extra row and column (shape (H + 1, W + 1)):
+    pixels whose depth band (multiple of `interval`) differs from the next pixel right or down.
+    The extra row and column come from the neighbouring tiles, so lines join across tile edges.
+    """
+    band = np.floor(depth / interval)
+    with np.errstate(invalid='ignore'):
+        right = band[:-1, :-1] != band[:-1, 1:]
+        down = band[:-1, :-1] != band[1:, :-1]
+    valid = ~np.isnan(depth)
+    return (right & valid[:-1, 1:] | down & valid[1:, :-1]) & valid[:-1, :-1]
+
+
+def write_png(path, image):
+    """Write an RGBA uint8 image (H, W, 4) as a PNG file"""
+    height, width = image.shape[:2]
+    raw = np.zeros((height, 1 + width * 4), dtype=np.uint8)  # filter byte 0 (none) per row
+    raw[:, 1:] = image.reshape(height, -1)
+
+    def chunk(kind, data):
+        body = kind + data
+        return len(data).to_bytes(4, 'big') + body + zlib.crc32(body).to_bytes(4, 'big')
+
+    header = width.to_bytes(4, 'big') + height.to_bytes(4, 'big') + bytes((8, 6, 0, 0, 0))
+    with open(path, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header) + chunk(b'IDAT', zlib.compress(raw.tobytes(), 6)) +
+                chunk(b'IEND', b''))
+
+
+# ===== SURVEY GRID =====
+
+def binned_depth_grid(iter_chunks, resolution=DEFAULT_GRID_RESOLUTION):
+    """
+    Depth grid of a survey too large to load whole: the mean depth of the soundings in
+    each cell, streamed chunk by chunk (two passes: bounds, then cell sums).
+
+    Args:
+        iter_chunks: Callable returning an iterator of (lat, lon, depth) chunks
+        resolution: Cell size in meters
+
+    Returns:
+        Grid dict as get_bathymetry_grid ('lat', 'lon' axes, 'depth'); cells without soundings are NaN
+    """
+    lat_min = lon_min = np.inf
+    lat_max = lon_max = -np.inf
+    lat_sum = count = 0
+    for lat, lon, _ in iter_chunks():
+        if len(lat):
+            lat_min, lat_max = min(lat_min, lat.min()), max(lat_max, lat.max())
+            lon_min, lon_max = min(lon_min, lon.min()), max(lon_max, lon.max())
+            lat_sum += lat.sum()
+            count += len(lat)
+    if not count:
+        raise ValueError("The survey has no soundings")
+
+    d_lat = np.degrees(resolution / EARTH_RADIUS)
+    d_lon = d_lat / np.cos(np.radians(lat_sum / count))
+    grid_lat = np.arange(lat_min, lat_max + d_lat, d_lat)
+    grid_lon = np.arange(lon_min, lon_max + d_lon, d_lon)
+    sums = np.zeros(len(grid_lat) * len(grid_lon))
+    counts = np.zeros(len(grid_lat) * len(grid_lon))
+    for lat, lon, depth in iter_chunks():
+        valid = ~np.isnan(depth)
+        rows = np.rint((lat[valid] - grid_lat[0]) / d_lat).astype(np.int64)
+        cols = np.rint((lon[valid] - grid_lon[0]) / d_lon).astype(np.int64)
+        cells = np.clip(rows, 0, len(grid_lat) - 1) * len(grid_lon) + np.clip(cols, 0, len(grid_lon) - 1)
+        sums += np.bincount(cells, weights=depth[valid], minlength=len(sums))
+        counts += np.bincount(cells, minlength=len(counts))
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        depth = (sums / counts).reshape(len(grid_lat), len(grid_lon))
+    return {'lat': grid_lat, 'lon': grid_lon, 'depth': depth.astype(np.float32)}
+
+
+def survey_grid(file_path, resolution=DEFAULT_GRID_RESOLUTION):
+    """
+    Depth grid of a whole survey for rendering: the interpolated grid (get_bathymetry_grid)
+    when the survey can be loaded whole, else cell means streamed from the file or its
+    tiled store (binned_depth_grid).
+    """
+    from .store import find_store, is_store, open_store
+
+    soundings = soundings_for_transects(file_path)
+    if soundings is not None:
+        return get_bathymetry_grid(soundings, resolution)
+    store_path = file_path if is_store(file_path) else find_store(file_path)
+    if store_path:
+        return binned_depth_grid(lambda: open_store(store_path).iter_chunks(), resolution)
+    return binned_depth_grid(lambda: iter_sounding_chunks(file_path), resolution)
+
+
+# ===== TILE PYRAMID =====
+
+def _source_stamp(path):
+    """Modification time of a survey file, or of a store's metadata"""
+    meta_path = os.path.join(path, 'meta.json')
+    return os.path.getmtime(meta_path if os.path.isdir(path) else path)
+
+
+def find_tiles(source, tiles_path):
+    """Metadata of a tile pyramid, if it is complete and was rendered from the current source (else None)"""
+    meta_path = os.path.join(tiles_path, 'meta.json')
+    if not os.path.isfile(meta_path):
+        return None
+    with open(meta_path, encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('version') != TILES_VERSION or meta.get('source_mtime') != _source_stamp(source):
+        return None
+    return meta
+
+
+def render_tiles(source, tiles_path, resolution=DEFAULT_GRID_RESOLUTION, min_zoom=DEFAULT_MIN_ZOOM, max_zoom=None,
+                 contour_interval=CONTOUR_INTERVAL, progress=None):
+    """
+    Render the depth and contour tile pyramid of a survey.
+
+    Every tile is sampled from the survey grid (bilinear) at its pixel centers plus one
+    extra row and column for the contours; tiles with no data are not written (the
+    map shows nothing there). Zoom levels above max_zoom are upscaled by the map.
+
+    Args:
+        source: Survey file (NetCDF) or tiled store
+        tiles_path: Output directory
+        resolution: Survey grid spacing (m)
+        min_zoom, max_zoom: Zoom levels to render (max_zoom default: native_max_zoom)
+        contour_interval: Depth between contour lines (m)
+        progress: Optional callback(done, total) per zoom level
+
+    Returns:
+        Tile metadata (dict, as written to meta.json)
+    """
+    grid = survey_grid(source, resolution)
+    # Positive-down depths, as on charts
+    depth_grid = grid['depth'] if np.nanmean(grid['depth']) >= 0 else -grid['depth']
+    grid = dict(grid, depth=depth_grid)
+    bounds = (float(grid['lat'][0]), float(grid['lat'][-1]), float(grid['lon'][0]), float(grid['lon'][-1]))
+    depth_range = tuple(float(v) for v in np.nanpercentile(depth_grid, [1, 99]))
+    max_zoom = max_zoom if max_zoom is not None else native_max_zoom(resolution, (bounds[0] + bounds[1]) / 2)
+    max_zoom = max(min_zoom, max_zoom)
+
+    n_tiles = 0
+    offsets = np.arange(TILE_PIXELS + 1) + 0.5
+    for level, zoom in enumerate(range(min_zoom, max_zoom + 1)):
+        x0, x1, y0, y1 = tile_range(bounds, zoom)
+        for tx in range(x0, x1 + 1):
+            for ty in range(y0, y1 + 1):
+                px, py = np.meshgrid(tx * TILE_PIXELS + offsets, ty * TILE_PIXELS + offsets)
+                lat, lon = pixel_to_lat_lon(px, py, zoom)
+                depth = sample_grid_bilinear(grid, lat, lon)
+                if np.isnan(depth[:-1, :-1]).all():
+                    continue
+
+                contours = np.zeros((TILE_PIXELS, TILE_PIXELS, 4), dtype=np.uint8)
+                contours[contour_mask(depth, contour_interval)] = CONTOUR_COLOR
+                for layer, image in (('depth', depth_colors(depth[:-1, :-1], depth_range)), ('contours', contours)):
+                    folder = os.path.join(tiles_path, layer, str(zoom), str(tx))
+                    os.makedirs(folder, exist_ok=True)
+                    write_png(os.path.join(folder, f"{ty}.png"), image)
+                n_tiles += 1
+        if progress:
+            progress(level + 1, max_zoom - min_zoom + 1)
+
+    meta = {
+        'version': TILES_VERSION,
+        'source': os.path.abspath(source),
+        'source_mtime': _source_stamp(source),
+        'bounds': bounds,
+        'min_zoom': min_zoom,
+        'max_zoom': max_zoom,
+        'n_tiles': n_tiles,
+        'resolution': float(resolution),
+        'depth_range': depth_range,
+        'contour_interval': float(contour_interval),
+        'created': time.time(),
+    }
+    # meta.json is written last: its presence marks a complete pyramid
+    with open(os.path.join(tiles_path, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+def ensure_tiles(source, tiles_path, **kwargs):
+    """Tile metadata of a survey, rendering the pyramid first if it is missing or out of date"""
+    return find_tiles(source, tiles_path) or render_tiles(source, tiles_path, **kwargs)
+
+
+def default_tiles_path(source, root='static'):
+    """Tile directory of a survey: <root>/tiles/<survey file name without extension>"""
+    return os.path.join(root, 'tiles', os.path.splitext(os.path.basename(os.path.normpath(source)))[0])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render a bathymetry survey into depth and contour map tiles")
+    parser.add_argument('input', help="Survey file (.nc) or tiled store (.bathy)")
+    parser.add_argument('-o', '--output', default=None, help="Tile directory (default: static/tiles/<input name>)")
+    parser.add_argument('--resolution', type=float, default=DEFAULT_GRID_RESOLUTION, help="Survey grid spacing in meters (default: 5)")
+    parser.add_argument('--min-zoom', type=int, default=DEFAULT_MIN_ZOOM, help=f"Lowest zoom level (default: {DEFAULT_MIN_ZOOM})")
+    parser.add_argument('--max-zoom', type=int, default=None, help="Highest zoom level (default: from the resolution)")
+    parser.add_argument('--contour-interval', type=float, default=CONTOUR_INTERVAL, help="Contour interval in meters (default: 1)")
+    args = parser.parse_args(argv)
+
+    output = args.output or default_tiles_path(args.input)
+    start = time.perf_counter()
+
+    def report(done, total):
+        print(f"[{done}/{total}] zoom level {args.min_zoom + done - 1}", file=sys.stderr)
+
+    try:
+        meta = render_tiles(args.input, output, args.resolution, args.min_zoom, args.max_zoom,
+                            args.contour_interval, progress=report)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    print(f"{meta['n_tiles']:,} tiles, zoom {meta['min_zoom']}-{meta['max_zoom']} -> {output} "
+          f"({time.perf_counter() - start:.1f} s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,75 @@
+# beach_core/pipeline.py
+# Full design chain for a set of transects: extraction -> design profile -> fill volume
+import numpy as np
+
+from .bathymetry import DEFAULT_GRID_RESOLUTION, extract_adaptive_profiles, extract_depth_profiles
+from .design import (
+    NEW_SHORELINE_P1,
+    NEW_SHORELINE_P2,
+    DesignParams,
+    build_design_profile,
+    design_depth_function,
+    fill_start_distance,
+)
+from .cutfill import raster_cut_fill
+from .volume import compute_total_volume
+
+
+def design_transects(soundings, endpoints, params=None, shoreline=(NEW_SHORELINE_P1, NEW_SHORELINE_P2),
+                     num_points=100, method='nearest', grid_resolution=DEFAULT_GRID_RESOLUTION):
+    """
+    Extract bathymetry for all transects in one batch and build their design profiles.
+
+    Args:
+        soundings: Soundings to sample
+        endpoints: Transect end points, shape (N, 2, 2) as [[lat1, lon1], [lat2, lon2]]
+        params: DesignParams (defaults if None)
+        shoreline: New shoreline end points ({'lat', 'lon'} dicts)
+        method: 'nearest', 'bilinear' (num_points samples) or 'adaptive' (spacing from the
+            sounding density, refined where the design crosses the bathymetry)
+
+    Returns:
+        List of DesignProfile, one per transect
+    """
+    endpoints = np.asarray(endpoints, dtype=float).reshape(-1, 2, 2)
+    params = params or DesignParams()
+    fill_distances = [
+        fill_start_distance({'lat': start[0], 'lon': start[1]}, {'lat': end[0], 'lon': end[1]}, shoreline[0], shoreline[1])
+        for start, end in endpoints
+    ]
+
+    if method == 'adaptive':
+        adaptive = extract_adaptive_profiles(
+            soundings, endpoints, [design_depth_function(fill, params) for fill in fill_distances])
+        distances, depths = [p.distances for p in adaptive], [p.depths for p in adaptive]
+    else:
+        distances, depths = extract_depth_profiles(soundings, endpoints, num_points, method, grid_resolution)
+
+    return [build_design_profile(dist, depth, fill, params) for dist, depth, fill in zip(distances, depths, fill_distances)]
+
+
+def evaluate_transects(soundings, endpoints, names=None, params=None, extra_volume=None, **design_kwargs):
+    """
+    Design profiles and total fill volume for a set of transects (in alongshore order).
+    The fill outside the transects comes from the raster cut/fill over the project
+    footprint, unless extra_volume is given.
+
+    Returns:
+        Tuple of (profiles, VolumeResult)
+    """
+    endpoints = np.asarray(endpoints, dtype=float).reshape(-1, 2, 2)
+    names = names or [str(i + 1) for i in range(len(endpoints))]
+    profiles = design_transects(soundings, endpoints, params, **design_kwargs)
+    cut_fill = None
+    if extra_volume is None:
+        cut_fill = raster_cut_fill(
+            soundings, endpoints, params, design_kwargs.get('shoreline', (NEW_SHORELINE_P1, NEW_SHORELINE_P2)), names
+        )
+    result = compute_total_volume(
+        names, endpoints,
+        [p.bathy_dist for p in profiles], [p.bathy_depth for p in profiles],
+        [p.design_dist for p in profiles], [p.design_depth for p in profiles],
+        [p.sill_distance for p in profiles],
+        extra_volume=extra_volume, cut_fill=cut_fill,
+    )
+    return profiles, result
@@ -0,0 +1,195 @@
+# beach_core/project.py
+# Project files: the project name, inputs, sections (end points, extracted and design
+# profiles) and results in one .npz archive with a small JSON header, so a saved
+# project opens without re-extracting or redesigning anything.
+#
+# File layout (.npz, uncompressed, no pickles):
+#   header       uint8: UTF-8 JSON with the format and version, name, inputs, per-section
+#                end points / sampling / sill / node cache keys, and the results
+#   lengths      int64 (N, 3): raw, trimmed bathymetry and design profile length per section
+#   *_dist       float64: the sections' profile distances, concatenated
+#   *_depth      float32: the sections' profile depths, concatenated
+import json
+from dataclasses import asdict, dataclass, field
+
+import numpy as np
+
+from .cutfill import CutFillResult
+from .design import DesignProfile
+from .erosion import DEFAULT_RETREAT_RATE
+from .section import DEPTH_DTYPE, DIST_DTYPE, Section
+from .volume import VolumeResult
+
+PROJECT_FORMAT = 'beach-project'
+PROJECT_VERSION = 1
+PROJECT_EXTENSION = '.npz'
+
+# Profiles of all sections, concatenated per field; 'lengths' (N, 3) splits them
+PROFILE_FIELDS = (('raw_dist', 'raw_depth'), ('bathy_dist', 'bathy_depth'), ('user_dist', 'user_depth'))
+# Node cache entries saved with a section / the project (see beach_core.incremental)
+SECTION_NODES = ('profile', 'design', 'fill_area')
+RESULT_NODES = ('cut_fill', 'volume')
+
+
+@dataclass
+class Project:
+    """
+    A saved project.
+
+    Attributes:
+        name: Project name
+        sections: Sections in alongshore order (with their node caches filled in)
+        inputs: Input values by name (numbers, strings, booleans)
+        results: Project-level node -> (input key, value) for RESULT_NODES
+            (CutFillResult, VolumeResult)
+    """
+    name: str
+    sections: list
+    inputs: dict = field(default_factory=dict)
+    results: dict = field(default_factory=dict)
+
+
+def _json_default(value):
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _result_to_json(node, value):
+    if node == 'cut_fill':
+        return asdict(value)
+    if node == 'volume':
+        return {**asdict(value), 'cut_fill': None}  # Saved as its own node
+    raise ValueError(f"Unknown result node: {node}")
+
+
+def _result_from_json(node, value, results):
+    if node == 'cut_fill':
+        return CutFillResult(**{**value, 'zone_fill': np.asarray(value['zone_fill'], dtype=float),
+                                'zone_cut': np.asarray(value['zone_cut'], dtype=float),
+                                'footprint': np.asarray(value['footprint'], dtype=float)})
+    if node == 'volume':
+        cut_fill = results.get('cut_fill', (None, None))[1]
+        return VolumeResult(**{**value, 'areas': np.asarray(value['areas'], dtype=float),
+                               'distances': np.asarray(value['distances'], dtype=float),
+                               'volumes': np.asarray(value['volumes'], dtype=float), 'cut_fill': cut_fill})
+    raise ValueError(f"Unknown result node: {node}")
+
+
+def _section_header(section):
+    cache = section.cache
+    return {
+        'name': section.name,
+        'points': section.points,
+        'completed': section.completed,
+        'sampling': section.sampling,
+        'sampling_info': section.sampling_info,
+        'fill_distance': section.fill_distance,
+        'sill_distance': section.sill_distance,
+        'sill_depth': section.sill_depth,
+        'design_params': section.design_params,
+        'retreat_rate': section.retreat_rate,
+        'nodes': {node: cache.key(node) for node in SECTION_NODES if node in cache},
+        'fill_area': cache.get('fill_area'),
+    }
+
+
+def save_project(file, project):
+    """
+    Write a project file.
+
+    Args:
+        file: Path or binary file object
+        project: Project
+    """
+    sections = project.sections
+    header = {
+        'format': PROJECT_FORMAT,
+        'version': PROJECT_VERSION,
+        'name': project.name,
+        'inputs': project.inputs,
+        'sections': [_section_header(section) for section in sections],
+        'results': {node: {'key': key, 'value': _result_to_json(node, value)}
+                    for node, (key, value) in project.results.items() if node in RESULT_NODES and value is not None},
+    }
+    arrays = {
+        'header': np.frombuffer(json.dumps(header, default=_json_default).encode('utf-8'), dtype=np.uint8),
+        'lengths': np.array([[len(getattr(section, dist)) for dist, _ in PROFILE_FIELDS] for section in sections],
+                            dtype=np.int64).reshape(-1, len(PROFILE_FIELDS)),
+    }
+    for dist, depth in PROFILE_FIELDS:
+        arrays[dist] = np.concatenate([np.empty(0, dtype=DIST_DTYPE)] + [getattr(s, dist) for s in sections]).astype(DIST_DTYPE, copy=False)
+        arrays[depth] = np.concatenate([np.empty(0, dtype=DEPTH_DTYPE)] + [getattr(s, depth) for s in sections]).astype(DEPTH_DTYPE, copy=False)
+    np.savez(file, **arrays)
+
+
+def load_project(file):
+    """
+    Read a project file written by save_project.
+
+    Sections get their profiles, designs and fill areas back in their node caches under
+    the saved input keys, so they are only recomputed if their inputs differ now
+    (e.g. a changed survey file).
+
+    Args:
+        file: Path or binary file object
+
+    Returns:
+        Project
+
+    Raises:
+        ValueError: Not a project file, or a newer format version
+    """
+    try:
+        archive = np.load(file, allow_pickle=False)
+    except (OSError, ValueError) as e:
+        raise ValueError("Not a project file") from e
+    with archive:
+        if 'header' not in archive.files:
+            raise ValueError("Not a project file: no header")
+        header = json.loads(archive['header'].tobytes().decode('utf-8'))
+        if header.get('format') != PROJECT_FORMAT:
+            raise ValueError("Not a project file")
+        if header.get('version', 0) > PROJECT_VERSION:
+            raise ValueError(f"Project file version {header['version']} is newer than this version of the tool ({PROJECT_VERSION})")
+        lengths = archive['lengths']
+        profiles = {name: archive[name] for pair in PROFILE_FIELDS for name in pair}
+
+    # Offsets of each section's profiles in the concatenated arrays
+    offsets = np.zeros((len(lengths) + 1, len(PROFILE_FIELDS)), dtype=np.int64)
+    np.cumsum(lengths, axis=0, out=offsets[1:])
+
+    sections = []
+    for i, saved in enumerate(header['sections']):
+        section = Section(saved['name'], points=saved['points'])
+        for j, (dist, depth) in enumerate(PROFILE_FIELDS):
+            start, end = offsets[i, j], offsets[i + 1, j]
+            setattr(section, dist, profiles[dist][start:end])
+            setattr(section, depth, profiles[depth][start:end])
+        section.completed = saved['completed']
+        section.sampling = tuple(saved['sampling']) if saved['sampling'] else None
+        section.sampling_info = saved['sampling_info']
+        section.fill_distance = saved['fill_distance']
+        section.sill_distance = saved['sill_distance']
+        section.sill_depth = saved['sill_depth']
+        section.design_params = tuple(saved['design_params']) if saved['design_params'] else None
+        section.retreat_rate = saved.get('retreat_rate', DEFAULT_RETREAT_RATE)
+
+        nodes = saved['nodes']
+        if 'profile' in nodes:
+            section.cache.restore('profile', nodes['profile'], section.sampling_info)
+        if 'design' in nodes and section.completed:
+            section.cache.restore('design', nodes['design'], DesignProfile(
+                section.bathy_dist, section.bathy_depth, section.user_dist, section.user_depth,
+                section.fill_distance, section.sill_distance, section.sill_depth))
+        if 'fill_area' in nodes and saved['fill_area'] is not None:
+            section.cache.restore('fill_area', nodes['fill_area'], saved['fill_area'])
+        sections.append(section)
+
+    results = {}
+    for node in RESULT_NODES:
+        if node in header['results']:
+            saved = header['results'][node]
+            results[node] = (saved['key'], _result_from_json(node, saved['value'], results))
+
+    return Project(name=header['name'], sections=sections, inputs=header['inputs'], results=results)
@@ -0,0 +1,106 @@
+# beach_core/section.py
+# One cross-section of a project: its end points, extracted bathymetry profile and
+# design profile, held as NumPy arrays (a project keeps hundreds of them in memory).
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .erosion import DEFAULT_RETREAT_RATE
+from .incremental import NodeCache
+
+# Same precision as the soundings (see beach_core.bathymetry): distances float64, depths float32
+DIST_DTYPE = np.float64
+DEPTH_DTYPE = np.float32
+
+
+def _empty_dist():
+    return np.empty(0, dtype=DIST_DTYPE)
+
+
+def _empty_depth():
+    return np.empty(0, dtype=DEPTH_DTYPE)
+
+
+def profile_arrays(dist, depth):
+    """A profile as (distances, depths) arrays of the section dtypes (no copy if they already are)"""
+    dist = np.asarray(dist, dtype=DIST_DTYPE)
+    depth = np.asarray(depth, dtype=DEPTH_DTYPE)
+    if dist.shape != depth.shape or dist.ndim != 1:
+        raise ValueError(f"Profile distances {dist.shape} and depths {depth.shape} must be 1-D of the same length")
+    return dist, depth
+
+
+@dataclass(eq=False, slots=True)
+class Section:
+    """
+    A cross-section: end points, bathymetry and design profiles, and its node cache.
+    Distances are measured from the first point (m), depths are negative (m).
+
+    Attributes:
+        name: Section name ('A', 'B', ..., 'AA', ...)
+        points: End points picked so far, [{'lat', 'lon'}] (0 to 2)
+        raw_dist, raw_depth: Extracted (untrimmed) bathymetry profile
+        bathy_dist, bathy_depth: Bathymetry trimmed to the sill + buffer once designed
+            (the extracted profile before that)
+        user_dist, user_depth: Design profile up to the sill
+        completed: The design profile is built
+        sampling: (mode, grid resolution, samples) of the extracted profile
+        sampling_info: Adaptive sampling details {'spacing', 'error_estimate'}
+        fill_distance, sill_distance, sill_depth: Fill start and sill of the design
+        design_params: (a, exponent, sill_depth) of the design
+        retreat_rate: Shoreline retreat rate (m/year) for the erosion analysis
+        cache: Node cache (profile, design, fill area, erosion, figures)
+    """
+    name: str
+    points: list = field(default_factory=list)
+    raw_dist: np.ndarray = field(default_factory=_empty_dist)
+    raw_depth: np.ndarray = field(default_factory=_empty_depth)
+    bathy_dist: np.ndarray = field(default_factory=_empty_dist)
+    bathy_depth: np.ndarray = field(default_factory=_empty_depth)
+    user_dist: np.ndarray = field(default_factory=_empty_dist)
+    user_depth: np.ndarray = field(default_factory=_empty_depth)
+    completed: bool = False
+    sampling: tuple = None
+    sampling_info: dict = None
+    fill_distance: float = None
+    sill_distance: float = None
+    sill_depth: float = None
+    design_params: tuple = None
+    retreat_rate: float = DEFAULT_RETREAT_RATE
+    cache: NodeCache = field(default_factory=NodeCache)
+
+    @property
+    def endpoints(self):
+        """End points as [[lat, lon], ...]"""
+        return [[p['lat'], p['lon']] for p in self.points]
+
+    @property
+    def has_profile(self):
+        return len(self.raw_dist) > 0
+
+    def set_profile(self, dist, depth, sampling, info=None):
+        """Store a newly extracted profile (the design is built again from it)"""
+        self.raw_dist, self.raw_depth = profile_arrays(dist, depth)
+        self.bathy_dist, self.bathy_depth = self.raw_dist, self.raw_depth
+        self.user_dist, self.user_depth = _empty_dist(), _empty_depth()
+        self.sampling = tuple(sampling)
+        self.sampling_info = info
+        self.completed = False
+
+    def set_design(self, profile, design_params):
+        """Store a design (DesignProfile) built from the extracted profile"""
+        self.fill_distance = profile.fill_distance
+        self.sill_distance = profile.sill_distance
+        self.sill_depth = profile.sill_depth
+        self.bathy_dist, self.bathy_depth = profile_arrays(profile.bathy_dist, profile.bathy_depth)
+        self.user_dist, self.user_depth = profile_arrays(profile.design_dist, profile.design_depth)
+        self.design_params = tuple(design_params)
+        self.completed = True
+
+    def clear_profile(self):
+        """Drop the extracted and design profiles (they are rebuilt on the next run)"""
+        self.raw_dist, self.raw_depth = _empty_dist(), _empty_depth()
+        self.bathy_dist, self.bathy_depth = self.raw_dist, self.raw_depth
+        self.user_dist, self.user_depth = _empty_dist(), _empty_depth()
+        self.completed = False
+        self.cache.discard()
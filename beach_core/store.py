@@ -0,0 +1,405 @@
+# beach_core/store.py
+# Tiled bathymetry store: a survey converted once into memory-mappable float32
+# arrays, sorted along a Z-order (Morton) curve and split into square tiles with
+# an index, so opening it does no parsing and a transect only pages in the
+# tiles it touches. Surveys are ingested a chunk at a time, so they need not fit
+# in memory either.
+#
+# Usage:
+#   python -m beach_core.store data.nc [-o data.bathy] [--tile-size 250]
+#   python -m beach_core.store survey.xyz -o survey.bathy
+#
+# Inputs: NetCDF (data.nc format), XYZ (whitespace separated lon lat depth) or CSV
+# (with a header naming the latitude / longitude / depth columns, or lon,lat,depth).
+#
+# Store layout (directory):
+#   meta.json    origin, tile size, point count, source file and its modification time
+#   tiles.npy    int64 (n_tiles, 4): tile row, tile column, first point, end point
+#   offsets.npy  float32 (n, 2): lat / lon of each point relative to its tile's corner
+#   depth.npy    float32 (n,): raw depth values (sign as in the source)
+import argparse
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from .bathymetry import CHUNK_SIZE, OUT_OF_CORE_BYTES, Soundings, iter_sounding_chunks
+from .geometry import EARTH_RADIUS
+from .incremental import input_hash
+
+STORE_VERSION = 1
+STORE_SUFFIX = '.bathy'
+DEFAULT_TILE_SIZE = 250.0  # meters
+_MAX_TILES_PER_AXIS = 2 ** 16
+
+LAT_NAMES = ('lat', 'latitude', 'y')
+LON_NAMES = ('lon', 'long', 'longitude', 'x')
+DEPTH_NAMES = ('depth', 'z', 'elevation', 'label', 'value')
+
+
+# ===== READING INPUTS =====
+
+def iter_xyz_chunks(file_path, chunk_size=CHUNK_SIZE):
+    """
+    Read an XYZ / CSV survey lazily, chunk_size rows at a time.
+
+    Yields:
+        Tuples of (lat, lon, depth) arrays
+    """
+    with open(file_path, encoding='utf-8') as f:
+        first_line = f.readline()
+        delimiter = ',' if ',' in first_line else (';' if ';' in first_line else None)
+        tokens = [t.strip().strip('"').lower() for t in (first_line.split(delimiter) if delimiter else first_line.split())]
+
+        try:
+            [float(t) for t in tokens]
+            has_header = False
+        except ValueError:
+            has_header = True
+
+        if has_header:
+            def column(names):
+                for i, token in enumerate(tokens):
+                    if token in names:
+                        return i
+                raise ValueError(f"{file_path}: no column named any of {', '.join(names)}")
+            lat_col, lon_col, depth_col = column(LAT_NAMES), column(LON_NAMES), column(DEPTH_NAMES)
+        else:
+            lon_col, lat_col, depth_col = 0, 1, 2  # XYZ order
+            f.seek(0)
+
+        while True:
+            lines = list(itertools.islice(f, chunk_size))
+            if not lines:
+                return
+            lines = [line for line in lines if line.strip()]
+            if lines:
+                data = np.loadtxt(lines, delimiter=delimiter, usecols=(lat_col, lon_col, depth_col), ndmin=2)
+                yield data[:, 0], data[:, 1], data[:, 2]
+
+
+def iter_survey_chunks(file_path, chunk_size=CHUNK_SIZE):
+    """Read a NetCDF, XYZ or CSV survey lazily as (lat, lon, depth) chunks"""
+    if os.path.splitext(file_path)[1].lower() in ('.nc', '.nc4', '.netcdf', '.cdf'):
+        return iter_sounding_chunks(file_path, chunk_size)
+    return iter_xyz_chunks(file_path, chunk_size)
+
+
+# ===== WRITING THE STORE =====
+
+def _spread_bits(values):
+    """Spread the low 16 bits of each value to the even bit positions (Morton interleave)"""
+    v = values.astype(np.uint64) & np.uint64(0xFFFF)
+    v = (v | (v << np.uint64(8))) & np.uint64(0x00FF00FF)
+    v = (v | (v << np.uint64(4))) & np.uint64(0x0F0F0F0F)
+    v = (v | (v << np.uint64(2))) & np.uint64(0x33333333)
+    v = (v | (v << np.uint64(1))) & np.uint64(0x55555555)
+    return v
+
+
+def morton_code(rows, cols):
+    """Z-order code of (row, col) pairs (16 bits each)"""
+    return _spread_bits(rows) | (_spread_bits(cols) << np.uint64(1))
+
+
+def tile_degrees(tile_size, mean_lat):
+    """Tile height and width in degrees for a tile size in meters"""
+    d_lat = np.degrees(tile_size / EARTH_RADIUS)
+    return d_lat, d_lat / np.cos(np.radians(mean_lat))
+
+
+def tile_groups(ends, chunk_size=CHUNK_SIZE):
+    """Consecutive tiles in groups of about chunk_size points (whole tiles), from the tiles' end points"""
+    groups = np.searchsorted(ends, np.arange(chunk_size, ends[-1] if len(ends) else 0, chunk_size), side='left')
+    return [tiles for tiles in np.split(np.arange(len(ends)), np.unique(groups + 1)) if len(tiles)]
+
+
+def write_store(iter_chunks, store_path, tile_size=DEFAULT_TILE_SIZE, source=None, chunk_size=CHUNK_SIZE):
+    """
+    Write a survey as a tiled store, streamed chunk by chunk so the survey never has to
+    fit in memory (passes: bounds, points per tile, each chunk's points appended to their
+    tiles in the memory-mapped output, then each group of tiles sorted in place).
+    Points are ordered by tile (Z-order of the tile grid) and, inside each tile,
+    along a finer Z-order curve, so nearby points are stored close together.
+
+    Args:
+        iter_chunks: Callable returning an iterator of (lat, lon, depth) chunks
+        store_path: Store directory
+        tile_size: Tile size in meters
+        source: Survey file the store is built from (recorded in the metadata)
+        chunk_size: Points per group of tiles sorted at a time
+
+    Returns:
+        Store metadata (dict)
+    """
+    def valid_chunks():
+        for lat, lon, depth in iter_chunks():
+            lat = np.asarray(lat, dtype=float)
+            lon = np.asarray(lon, dtype=float)
+            valid = np.isfinite(lat) & np.isfinite(lon)
+            if valid.any():
+                yield lat[valid], lon[valid], np.asarray(depth, dtype=float)[valid]
+
+    # Pass 1: bounds
+    lat0 = lon0 = np.inf
+    lat_sum = n = 0
+    for lat, lon, _ in valid_chunks():
+        lat0, lon0 = min(lat0, lat.min()), min(lon0, lon.min())
+        lat_sum += lat.sum()
+        n += len(lat)
+    if not n:
+        raise ValueError("No soundings to store")
+    d_lat, d_lon = tile_degrees(tile_size, lat_sum / n)
+    lat0, lon0 = float(lat0), float(lon0)
+
+    def tiles_of(lat, lon):
+        rows = ((lat - lat0) // d_lat).astype(np.int64)
+        cols = ((lon - lon0) // d_lon).astype(np.int64)
+        return rows, cols, morton_code(rows, cols)
+
+    # Pass 2: points per tile, tiles in Z-order
+    codes, rows, cols, counts = [], [], [], []
+    for lat, lon, _ in valid_chunks():
+        chunk_rows, chunk_cols, chunk_codes = tiles_of(lat, lon)
+        if chunk_rows.max() >= _MAX_TILES_PER_AXIS or chunk_cols.max() >= _MAX_TILES_PER_AXIS:
+            raise ValueError("Survey too large for the tile size: use larger tiles")
+        chunk_codes, first, chunk_counts = np.unique(chunk_codes, return_index=True, return_counts=True)
+        codes.append(chunk_codes)
+        rows.append(chunk_rows[first])
+        cols.append(chunk_cols[first])
+        counts.append(chunk_counts)
+    codes, first, inverse = np.unique(np.concatenate(codes), return_index=True, return_inverse=True)
+    counts = np.bincount(inverse, weights=np.concatenate(counts), minlength=len(codes)).astype(np.int64)
+    ends = np.cumsum(counts)
+    starts = ends - counts
+    tiles = np.column_stack((np.concatenate(rows)[first], np.concatenate(cols)[first], starts, ends)).astype(np.int64)
+
+    # Pass 3: each chunk's points appended to their tiles
+    os.makedirs(store_path, exist_ok=True)
+    meta_path = os.path.join(store_path, 'meta.json')
+    if os.path.exists(meta_path):
+        os.remove(meta_path)  # Incomplete until rewritten
+    offsets = np.lib.format.open_memmap(os.path.join(store_path, 'offsets.npy'), mode='w+', dtype=np.float32, shape=(n, 2))
+    depths = np.lib.format.open_memmap(os.path.join(store_path, 'depth.npy'), mode='w+', dtype=np.float32, shape=(n,))
+    cursor = starts.copy()
+    for lat, lon, depth in valid_chunks():
+        chunk_rows, chunk_cols, chunk_codes = tiles_of(lat, lon)
+        tile = np.searchsorted(codes, chunk_codes)
+        order = np.argsort(tile, kind='stable')
+        tile = tile[order]
+        # Position of each point: its tile's cursor plus its rank among the chunk's points of that tile
+        dest = cursor[tile] + np.arange(len(tile)) - np.searchsorted(tile, tile, side='left')
+        offsets[dest, 0] = (lat - (lat0 + chunk_rows * d_lat))[order]
+        offsets[dest, 1] = (lon - (lon0 + chunk_cols * d_lon))[order]
+        depths[dest] = depth[order]
+        cursor += np.bincount(tile, minlength=len(codes))
+
+    # Pass 4: inside each tile, order along a finer Z-order curve of the offsets (quantized to 16 bits)
+    for group in tile_groups(ends, chunk_size):
+        start, end = starts[group[0]], ends[group[-1]]
+        group_offsets = np.asarray(offsets[start:end])
+        local_tile = np.repeat(np.arange(len(group), dtype=np.uint64), counts[group])
+        fine = morton_code(np.clip(group_offsets[:, 0] / d_lat * 0xFFFF, 0, 0xFFFF),
+                           np.clip(group_offsets[:, 1] / d_lon * 0xFFFF, 0, 0xFFFF))
+        order = np.argsort((local_tile << np.uint64(32)) | fine, kind='stable')
+        offsets[start:end] = group_offsets[order]
+        depths[start:end] = np.asarray(depths[start:end])[order]
+    offsets.flush()
+    depths.flush()
+    del offsets, depths
+    np.save(os.path.join(store_path, 'tiles.npy'), tiles)
+
+    meta = {
+        'version': STORE_VERSION,
+        'n_points': int(n),
+        'n_tiles': int(len(tiles)),
+        'tile_size': float(tile_size),
+        'lat0': lat0, 'lon0': lon0, 'd_lat': float(d_lat), 'd_lon': float(d_lon),
+        'source': os.path.abspath(source) if source else None,
+        'source_mtime': os.path.getmtime(source) if source else None,
+        'created': time.time(),
+    }
+    # meta.json is written last: its presence marks a complete store
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+def ingest(input_path, store_path=None, tile_size=DEFAULT_TILE_SIZE, chunk_size=CHUNK_SIZE):
+    """Convert a NetCDF / XYZ / CSV survey into a tiled store (default: <input base>.bathy), chunk_size soundings at a time"""
+    store_path = store_path or default_store_path(input_path)
+    return write_store(lambda: iter_survey_chunks(input_path, chunk_size), store_path, tile_size,
+                       source=input_path, chunk_size=chunk_size)
+
+
+# ===== OPENING THE STORE =====
+
+def default_store_path(source):
+    base, _ = os.path.splitext(source)
+    return base + STORE_SUFFIX
+
+
+def is_store(path):
+    return os.path.isfile(os.path.join(path, 'meta.json'))
+
+
+def find_store(source):
+    """Store built from a source file, if one exists next to it and is up to date (else None)"""
+    store_path = default_store_path(source)
+    if not is_store(store_path):
+        return None
+    with open(os.path.join(store_path, 'meta.json'), encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('source_mtime') != os.path.getmtime(source):
+        return None
+    return store_path
+
+
+class TileStore:
+    """
+    Read-only view of a tiled store. Arrays are memory-mapped: only the tiles
+    that are read get paged in.
+
+    Attributes:
+        path: Store directory
+        meta: Store metadata (see write_store)
+        tiles: Tile index, int64 (n_tiles, 4): row, column, first point, end point
+    """
+    _SUBSET_CACHE_SIZE = 4
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        if self.meta.get('version') != STORE_VERSION:
+            raise ValueError(f"{path}: unsupported store version {self.meta.get('version')}")
+        self.tiles = np.load(os.path.join(path, 'tiles.npy'))
+        self.offsets = np.load(os.path.join(path, 'offsets.npy'), mmap_mode='r')
+        self.depth = np.load(os.path.join(path, 'depth.npy'), mmap_mode='r')
+        self._subsets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self.meta['n_points']
+
+    @property
+    def nbytes(self):
+        return self.offsets.nbytes + self.depth.nbytes
+
+    def tiles_in_bbox(self, bbox):
+        """Indices of the tiles overlapping (lat_min, lat_max, lon_min, lon_max)"""
+        m = self.meta
+        lat_min, lat_max, lon_min, lon_max = bbox
+        rows, cols = self.tiles[:, 0], self.tiles[:, 1]
+        return np.flatnonzero(
+            (rows >= np.floor((lat_min - m['lat0']) / m['d_lat'])) & (rows <= np.floor((lat_max - m['lat0']) / m['d_lat'])) &
+            (cols >= np.floor((lon_min - m['lon0']) / m['d_lon'])) & (cols <= np.floor((lon_max - m['lon0']) / m['d_lon']))
+        )
+
+    def soundings(self, tile_ids=None, bbox=None):
+        """
+        Soundings of the given tiles (all tiles if None), optionally only those inside
+        bbox = (lat_min, lat_max, lon_min, lon_max). Subsets are cached, so repeated
+        requests for the same tiles share one Soundings (and its KD-tree).
+        """
+        tile_ids = np.arange(len(self.tiles)) if tile_ids is None else np.asarray(tile_ids, dtype=np.int64)
+        bbox = None if bbox is None else tuple(float(v) for v in bbox)
+        key = ('store', self.path, self.meta['created'], input_hash(tile_ids), bbox)
+        with self._lock:
+            if key in self._subsets:
+                self._subsets.move_to_end(key)
+                return self._subsets[key]
+
+            m = self.meta
+            tiles = self.tiles[tile_ids]
+            counts = tiles[:, 3] - tiles[:, 2]
+            index = np.concatenate([np.arange(start, end) for start, end in tiles[:, 2:4]]) if len(tiles) else \
+                np.empty(0, dtype=np.int64)
+            offsets = np.asarray(self.offsets[index], dtype=float) if len(tiles) else np.empty((0, 2))
+            lat = m['lat0'] + np.repeat(tiles[:, 0], counts) * m['d_lat'] + offsets[:, 0]
+            lon = m['lon0'] + np.repeat(tiles[:, 1], counts) * m['d_lon'] + offsets[:, 1]
+            depth = np.asarray(self.depth[index])
+            if bbox is not None:
+                lat_min, lat_max, lon_min, lon_max = bbox
+                inside = (lat >= lat_min) & (lat <= lat_max) & (lon >= lon_min) & (lon <= lon_max)
+                lat, lon, depth = lat[inside], lon[inside], depth[inside]
+            subset = Soundings(lat=lat, lon=lon, depth=depth, key=key)
+
+            if len(self._subsets) >= self._SUBSET_CACHE_SIZE:
+                self._subsets.popitem(last=False)
+            self._subsets[key] = subset
+            return subset
+
+    def soundings_in_bbox(self, bbox):
+        """Soundings inside a bounding box (read from the tiles overlapping it)"""
+        return self.soundings(self.tiles_in_bbox(bbox), bbox)
+
+    def iter_chunks(self, chunk_size=CHUNK_SIZE):
+        """
+        Read the whole store a group of whole tiles at a time (about chunk_size points), without caching.
+
+        Yields:
+            Tuples of (lat, lon, depth) arrays
+        """
+        m = self.meta
+        # Tiles are stored back to back: group consecutive tiles into chunks
+        for group in tile_groups(self.tiles[:, 3], chunk_size):
+            tiles = self.tiles[group]
+            start, end = tiles[0, 2], tiles[-1, 3]
+            counts = tiles[:, 3] - tiles[:, 2]
+            offsets = np.asarray(self.offsets[start:end], dtype=float)
+            yield (m['lat0'] + np.repeat(tiles[:, 0], counts) * m['d_lat'] + offsets[:, 0],
+                   m['lon0'] + np.repeat(tiles[:, 1], counts) * m['d_lon'] + offsets[:, 1],
+                   np.asarray(self.depth[start:end], dtype=float))
+
+
+_STORE_CACHE = {}
+
+
+def open_store(path):
+    """Open a store (cached per process; reopened when it is rewritten)"""
+    path = os.path.abspath(path)
+    stamp = os.path.getmtime(os.path.join(path, 'meta.json'))
+    cached = _STORE_CACHE.get(path)
+    if cached is None or cached[0] != stamp:
+        cached = _STORE_CACHE[path] = (stamp, TileStore(path))
+    return cached[1]
+
+
+def store_soundings(path, endpoints=None, buffer=None):
+    """
+    Soundings from a store for a set of transects (see bathymetry.soundings_for_transects).
+    Without transects the whole store is returned if it is small enough, else None.
+    """
+    from .bathymetry import BBOX_BUFFER, transects_bbox
+
+    store = open_store(path)
+    if endpoints is None or np.size(endpoints) == 0:
+        return store.soundings() if store.nbytes <= OUT_OF_CORE_BYTES else None
+    return store.soundings_in_bbox(transects_bbox(endpoints, BBOX_BUFFER if buffer is None else buffer))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert a bathymetry survey into a tiled, memory-mappable store")
+    parser.add_argument('input', help="Survey file (.nc, .xyz, .csv)")
+    parser.add_argument('-o', '--output', default=None, help="Store directory (default: <input>.bathy)")
+    parser.add_argument('--tile-size', type=float, default=DEFAULT_TILE_SIZE, help="Tile size in meters (default: 250)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        meta = ingest(args.input, args.output, args.tile_size)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    print(f"{meta['n_points']:,} soundings in {meta['n_tiles']:,} tiles of {meta['tile_size']:g} m "
+          f"-> {args.output or default_store_path(args.input)} ({time.perf_counter() - start:.1f} s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,170 @@
+# beach_core/surface.py
+# Surface-based (TIN) fill volume: the bathymetry is triangulated (Delaunay),
+# the design surface is the Dean profile measured perpendicular to the new
+# shoreline, and the fill is integrated over the nourishment polygon as
+# per-triangle prism volumes. Complements the Average End Area estimate in volume.py.
+from dataclasses import dataclass
+
+import numpy as np
+
+from .design import NEW_SHORELINE_P1, NEW_SHORELINE_P2, DesignParams, dean_profile, sill_offset
+from .geometry import to_geographic, to_local
+
+DEFAULT_TIN_SPACING = 2.0  # meters, refinement grid of the TIN
+
+
+@dataclass
+class SurfaceVolumeResult:
+    """
+    TIN fill volume of a project.
+
+    Attributes:
+        volume: Fill volume inside the nourishment polygon (m³)
+        polygon_area: Plan area of the nourishment polygon (m²)
+        fill_area: Plan area where fill is needed (m²)
+        n_triangles: Triangles integrated
+        polygon: Nourishment polygon vertices, shape (V, 2) as [lat, lon]
+    """
+    volume: float
+    polygon_area: float
+    fill_area: float
+    n_triangles: int
+    polygon: np.ndarray
+
+
+def points_in_polygon(x, y, polygon):
+    """Even-odd point-in-polygon test, vectorized over the points (one pass per polygon edge)"""
+    inside = np.zeros(np.shape(x), dtype=bool)
+    px, py = polygon[:, 0], polygon[:, 1]
+    for i in range(len(polygon)):
+        x1, y1, x2, y2 = px[i - 1], py[i - 1], px[i], py[i]
+        crosses = (y1 > y) != (y2 > y)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x_cross = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+        inside ^= crosses & (x < x_cross)
+    return inside
+
+
+def nourishment_polygon(endpoints, shoreline=(NEW_SHORELINE_P1, NEW_SHORELINE_P2), params=None, origin=None):
+    """
+    Nourishment polygon in local meters: the transects' start points on the land side
+    and, on the sea side, each transect's crossing with the sill line (the new shoreline
+    offset seaward by the sill distance; the transect's end point if it does not reach it).
+
+    Args:
+        endpoints: Transects, shape (N, 2, 2) as [[lat1, lon1], [lat2, lon2]], alongshore order
+        origin: (lat0, lon0) of the local projection (default: mean of the end points)
+
+    Returns:
+        Tuple of (polygon (V, 2) in meters, origin, shoreline point, seaward unit normal)
+    """
+    params = params or DesignParams()
+    endpoints = np.asarray(endpoints, dtype=float).reshape(-1, 2, 2)
+    origin = origin or tuple(endpoints.reshape(-1, 2).mean(axis=0))
+    sx, sy = to_local(endpoints[..., 0], endpoints[..., 1], *origin)  # (N, 2) each
+    starts = np.column_stack((sx[:, 0], sy[:, 0]))
+    ends = np.column_stack((sx[:, 1], sy[:, 1]))
+
+    # Shoreline line and its seaward normal (the side the transects point to)
+    shore = np.array([to_local(p['lat'], p['lon'], *origin) for p in shoreline], dtype=float)
+    direction = (shore[1] - shore[0]) / np.hypot(*(shore[1] - shore[0]))
+    normal = np.array([-direction[1], direction[0]])
+    if np.dot(normal, (ends - starts).sum(axis=0)) < 0:
+        normal = -normal
+
+    # Transect crossing with the sill line: dot(normal, p - shore0) = sill offset
+    offset = sill_offset(params)
+    along = ends - starts
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = (offset - (starts - shore[0]) @ normal) / (along @ normal)
+    t = np.where(np.isfinite(t), np.clip(t, 0.0, 1.0), 1.0)
+    sill_points = starts + t[:, None] * along
+
+    polygon = np.vstack((starts, sill_points[::-1]))
+    return polygon, origin, shore[0], normal
+
+
+def tin_fill_volume(soundings, endpoints, params=None, shoreline=(NEW_SHORELINE_P1, NEW_SHORELINE_P2),
+                    spacing=DEFAULT_TIN_SPACING):
+    """
+    Fill volume between a triangulated bathymetry and the design surface.
+
+    The soundings are triangulated (Delaunay) and the TIN is refined onto a regular
+    triangulated grid of `spacing` over the polygon. Each triangle inside the polygon
+    contributes a prism of volume area × mean fill thickness of its vertices.
+
+    Args:
+        soundings: Soundings of the survey
+        endpoints: Transects, shape (N, 2, 2), alongshore order (N >= 2)
+        params: DesignParams (defaults if None)
+        shoreline: New shoreline end points ({'lat', 'lon'} dicts)
+        spacing: Refinement grid spacing (m); the volume converges as it decreases
+
+    Returns:
+        SurfaceVolumeResult
+    """
+    from scipy.interpolate import LinearNDInterpolator
+    from scipy.spatial import Delaunay, cKDTree
+
+    params = params or DesignParams()
+    endpoints = np.asarray(endpoints, dtype=float).reshape(-1, 2, 2)
+    if len(endpoints) < 2:
+        raise ValueError("At least two sections are needed")
+
+    polygon, origin, shore_point, normal = nourishment_polygon(endpoints, shoreline, params)
+    x_min, y_min = polygon.min(axis=0) - spacing
+    x_max, y_max = polygon.max(axis=0) + spacing
+
+    # Sounding TIN (depths negative, as in profile extraction)
+    sx, sy = to_local(soundings.lat, soundings.lon, *origin)
+    depth = np.asarray(soundings.depth, dtype=float)
+    if np.nanmean(depth) > 0:
+        depth = -depth
+    margin = 10 * spacing
+    near = (sx >= x_min - margin) & (sx <= x_max + margin) & (sy >= y_min - margin) & (sy <= y_max + margin)
+    if near.sum() < 3:
+        raise ValueError("Not enough soundings around the nourishment area")
+    sounding_xy = np.column_stack((sx[near], sy[near]))
+    bathymetry = LinearNDInterpolator(Delaunay(sounding_xy), depth[near])
+
+    # Refined TIN: regular grid over the polygon, two triangles per cell. Its vertex
+    # depths are interpolated linearly on the sounding TIN, so the surface follows it;
+    # the grid resolves the curved design surface and the polygon edge.
+    gx, gy = np.meshgrid(np.arange(x_min, x_max + spacing, spacing), np.arange(y_min, y_max + spacing, spacing))
+    ny, nx = gx.shape
+    vertices = np.column_stack((gx.ravel(), gy.ravel()))
+
+    node = np.arange(ny * nx).reshape(ny, nx)
+    lower_left, lower_right = node[:-1, :-1].ravel(), node[:-1, 1:].ravel()
+    upper_left, upper_right = node[1:, :-1].ravel(), node[1:, 1:].ravel()
+    triangles = np.concatenate((np.column_stack((lower_left, lower_right, upper_left)),
+                                np.column_stack((upper_right, upper_left, lower_right))))
+    centroid = vertices[triangles].mean(axis=1)
+    triangles = triangles[points_in_polygon(centroid[:, 0], centroid[:, 1], polygon)]
+    used = np.unique(triangles)
+
+    # Bathymetry at the used vertices (nearest sounding outside the survey's hull)
+    z_bathy = np.full(len(vertices), np.nan)
+    z_bathy[used] = bathymetry(vertices[used])
+    missing = used[np.isnan(z_bathy[used])]
+    if len(missing):
+        _, idx = cKDTree(sounding_xy).query(vertices[missing])
+        z_bathy[missing] = depth[near][idx]
+
+    # Design surface: Dean profile by the distance seaward of the new shoreline
+    distance = (vertices[used] - shore_point) @ normal
+    thickness = np.zeros(len(vertices))
+    thickness[used] = np.maximum(-dean_profile(distance, params.a, params.exponent) - z_bathy[used], 0.0)
+
+    # Prisms: every triangle of the grid has the same plan area
+    area = spacing ** 2 / 2
+    mean_thickness = thickness[triangles].mean(axis=1)
+
+    polygon_lat, polygon_lon = to_geographic(polygon[:, 0], polygon[:, 1], *origin)
+    return SurfaceVolumeResult(
+        volume=float(mean_thickness.sum() * area),
+        polygon_area=float(len(triangles) * area),
+        fill_area=float((mean_thickness > 0).sum() * area),
+        n_triangles=int(len(triangles)),
+        polygon=np.column_stack((polygon_lat, polygon_lon)),
+    )
@@ -0,0 +1,171 @@
+# beach_core/timing.py
+# Lightweight stage timers and counters for finding where a run (an app rerun,
+# a batch scenario) spends its time. Hooks on a disabled profiler return at once,
+# so they can stay in hot paths.
+import functools
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+HISTORY_SIZE = 50  # runs kept in memory per profiler
+
+_NULL_STAGE = nullcontext()
+_local = threading.local()
+
+
+class _Stage:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        entry = self.profiler.stages.get(self.name)
+        if entry is None:
+            self.profiler.stages[self.name] = [elapsed, 1]
+        else:
+            entry[0] += elapsed
+            entry[1] += 1
+        return False
+
+
+class Profiler:
+    """
+    Stage timings and counters of one run at a time.
+
+    Stage times are inclusive: a stage run inside another counts in both.
+    Each finished run is kept in `history` and, with a log path, appended to it
+    as one JSON line.
+
+    Attributes:
+        enabled: Record anything at all (hooks are no-ops when False)
+        log_path: JSON-lines file the runs are appended to (None: not logged)
+        stages: Stage name -> [seconds, calls] of the current run
+        counters: Counter name -> value of the current run
+        history: Records of the last HISTORY_SIZE runs (see end_run)
+    """
+
+    def __init__(self, enabled=False, log_path=None):
+        self.enabled = enabled
+        self.log_path = log_path
+        self.stages = {}
+        self.counters = {}
+        self.history = deque(maxlen=HISTORY_SIZE)
+        self._start = None
+
+    def stage(self, name):
+        """Context manager timing a stage"""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def count(self, name, n=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def merge(self, other):
+        """Add the stages and counters of another profiler (e.g. a background job's) to the current run"""
+        if not self.enabled:
+            return
+        for name, (seconds, calls) in other.stages.items():
+            entry = self.stages.setdefault(name, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += calls
+        for name, value in other.counters.items():
+            self.count(name, value)
+
+    def begin_run(self):
+        """Start a run on this thread: clears the stages and counters and makes this the current profiler"""
+        self.stages = {}
+        self.counters = {}
+        self._start = time.perf_counter()
+        _local.profiler = self
+
+    def end_run(self, **fields):
+        """
+        Finish the current run.
+
+        Args:
+            **fields: Extra fields for the record (e.g. page, session)
+
+        Returns:
+            Run record (dict: time, total_ms, stages {name: {ms, calls}}, counters, fields),
+            or None if disabled
+        """
+        if _local.__dict__.get('profiler') is self:
+            del _local.profiler
+        if not self.enabled or self._start is None:
+            return None
+        record = {
+            'time': time.time(),
+            'total_ms': round((time.perf_counter() - self._start) * 1000, 3),
+            'stages': {name: {'ms': round(seconds * 1000, 3), 'calls': calls}
+                       for name, (seconds, calls) in sorted(self.stages.items(), key=lambda item: -item[1][0])},
+            'counters': dict(self.counters),
+            **fields,
+        }
+        self._start = None
+        self.history.append(record)
+        if self.log_path:
+            try:
+                with open(self.log_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record) + '\n')
+            except OSError:
+                pass  # Unwritable log: keep the in-memory history only
+        return record
+
+
+_DISABLED = Profiler()
+
+
+def current():
+    """Profiler of the run on this thread (a disabled one outside a run)"""
+    return getattr(_local, 'profiler', _DISABLED)
+
+
+@contextmanager
+def use(profiler):
+    """Make a profiler the current one on this thread for a block (e.g. a job on a worker thread)"""
+    previous = _local.__dict__.get('profiler')
+    _local.profiler = profiler
+    try:
+        yield profiler
+    finally:
+        if previous is None:
+            del _local.profiler
+        else:
+            _local.profiler = previous
+
+
+def stage(name):
+    """Time a stage on the current profiler (context manager)"""
+    return current().stage(name)
+
+
+def count(name, n=1):
+    """Add to a counter of the current profiler"""
+    current().count(name, n)
+
+
+def timed(name=None):
+    """Decorator timing every call of a function as a stage (default name: the function's name)"""
+    def decorator(func):
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = current()
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            with _Stage(profiler, stage_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,263 @@
+# beach_core/volume.py
+# Fill areas per section and fill volume between sections (Average End Area Method)
+from dataclasses import dataclass
+
+import numpy as np
+
+from .design import dean_distance, dean_profile
+from .geometry import haversine_distance
+
+
+@dataclass
+class VolumeResult:
+    """
+    Fill volume of a project.
+    'areas' has one value per section; 'distances' and 'volumes' one per region
+    between consecutive sections. 'extra' is the fill outside the sections
+    (see beach_core.cutfill), 'cut_fill' the raster result it came from, if any.
+    """
+    names: list
+    regions: list
+    areas: np.ndarray  # m²
+    distances: np.ndarray  # m
+    volumes: np.ndarray  # m³
+    extra: float  # m³
+    total: float  # m³
+    cut_fill: object = None  # CutFillResult
+
+
+def calculate_fill_area(bathy_dist, bathy_depth, design_dist, design_depth, sill_distance=None):
+    """
+    Calculate fill area between bathymetry and design profiles.
+    If sill_distance is provided, calculates only up to that distance
+    """
+    if len(bathy_dist) == 0 or len(design_dist) == 0:
+        return 0.0
+
+    common_dist = np.asarray(bathy_dist, dtype=float)  # Distance values from bathymetry profile
+    design_interp = np.interp(common_dist, design_dist, design_depth)  # Interpolated design depth values
+    bathy_array = np.asarray(bathy_depth, dtype=float)  # Depth values from bathymetry profile
+
+    # Extract portion up to sill distance
+    if sill_distance is not None:
+        mask = common_dist <= sill_distance  # Extract portion up to sill distance
+        common_dist = common_dist[mask]  # Distance values up to sill
+        design_interp = design_interp[mask]  # Design depth values up to sill
+        bathy_array = bathy_array[mask]  # Bathymetry depth values up to sill
+
+    # Calculate fill height (vertical distance from bathymetry to design profile)
+    # Note: Depths are negative (e.g., -5m means 5 meters deep)
+    # If design is shallower (less negative) than bathymetry, we need fill
+    # Example: design = -5m, bathy = -8m, fill_height = -5 - (-8) = 3m (positive = fill needed)
+    # Example: design = -8m, bathy = -5m, fill_height = -8 - (-5) = -3m (negative = cut, not fill)
+    fill_height = design_interp - bathy_array
+
+    # Only count positive values (where design is above bathymetry = fill needed)
+    # Negative values mean bathymetry is shallower than design (no fill needed)
+    fill_height = np.maximum(fill_height, 0)
+
+    # Calculate area using trapezoidal integration
+    if len(common_dist) < 2:
+        return 0.0
+
+    area = np.trapezoid(fill_height, common_dist)
+
+    return float(area)
+
+
+def calculate_fill_areas(bathy_dists, bathy_depths, design_dists, design_depths, sill_distances=None):
+    """
+    Calculate fill areas for many sections at once.
+    Same result as calling calculate_fill_area for each section, but all
+    profiles are concatenated and processed as single arrays.
+
+    Args:
+        bathy_dists, bathy_depths: Per-section bathymetry profiles (sequences of any length)
+        design_dists, design_depths: Per-section design profiles
+        sill_distances: Per-section sill distance (None entries = no limit)
+
+    Returns:
+        Array of fill areas (m²), one per section
+    """
+    n_sections = len(bathy_dists)
+    areas = np.zeros(n_sections)
+
+    bathy_len = np.array([len(d) for d in bathy_dists], dtype=int)
+    design_len = np.array([len(d) for d in design_dists], dtype=int)
+    keep = np.flatnonzero((bathy_len > 0) & (design_len > 0))
+    if len(keep) == 0:
+        return areas
+
+    bathy_x = np.concatenate([np.asarray(bathy_dists[i], dtype=float) for i in keep])
+    bathy_z = np.concatenate([np.asarray(bathy_depths[i], dtype=float) for i in keep])
+    design_x = np.concatenate([np.asarray(design_dists[i], dtype=float) for i in keep])
+    design_z = np.concatenate([np.asarray(design_depths[i], dtype=float) for i in keep])
+    bathy_row = np.repeat(np.arange(len(keep)), bathy_len[keep])
+    design_row = np.repeat(np.arange(len(keep)), design_len[keep])
+
+    # np.interp holds the end values beyond a profile: clamp to each design profile's range
+    design_end = np.cumsum(design_len[keep])
+    design_first = design_x[design_end - design_len[keep]]
+    design_last = design_x[design_end - 1]
+    query_x = np.clip(bathy_x, design_first[bathy_row], design_last[bathy_row])
+
+    # Shift every section to its own distance band so one np.interp call serves all of them
+    band = 2 * max(np.abs(bathy_x).max(), np.abs(design_x).max()) + 1
+    design_interp = np.interp(query_x + bathy_row * band, design_x + design_row * band, design_z)
+
+    # Only count positive values (where design is above bathymetry = fill needed)
+    fill_height = np.maximum(design_interp - bathy_z, 0)
+
+    # Extract portion up to sill distance
+    if sill_distances is not None:
+        sills = np.array([np.inf if sill_distances[i] is None else sill_distances[i] for i in keep], dtype=float)
+        mask = bathy_x <= sills[bathy_row]
+        bathy_x, fill_height, bathy_row = bathy_x[mask], fill_height[mask], bathy_row[mask]
+
+    # Trapezoids between consecutive points of the same section
+    same_section = bathy_row[1:] == bathy_row[:-1]
+    trapezoids = 0.5 * (fill_height[1:] + fill_height[:-1]) * (bathy_x[1:] - bathy_x[:-1])
+    areas[keep] = np.bincount(bathy_row[1:][same_section], weights=trapezoids[same_section], minlength=len(keep))
+
+    return areas
+
+
+def _pad_rows(rows):
+    """Stack sequences of different lengths into a 2D array, padded with NaN"""
+    out = np.full((len(rows), max((len(r) for r in rows), default=1)), np.nan)
+    for i, row in enumerate(rows):
+        out[i, :len(row)] = row
+    return out
+
+
+def sweep_fill_areas(bathy_dists, bathy_depths, fill_distances, a_values, sill_depth,
+                     exponent=0.67, buffer_distance=10.0):
+    """
+    Fill areas of all sections for many profile parameters A at once.
+    Same result as build_design_profile + calculate_fill_area for every (A, section)
+    pair, evaluated as one (K, N, P) array.
+
+    Args:
+        bathy_dists, bathy_depths: Untrimmed bathymetry profiles of the N sections
+        fill_distances: Fill start distance of each section (m)
+        a_values: K profile scale parameters
+        sill_depth: Target sill depth (m, positive)
+        exponent, buffer_distance: See DesignParams
+
+    Returns:
+        Array of fill areas (m²), shape (K, N)
+    """
+    x = _pad_rows(bathy_dists)[None]  # (1, N, P)
+    z = _pad_rows(bathy_depths)[None]
+    fill = np.asarray(fill_distances, dtype=float)[None, :, None]  # (1, N, 1)
+    a = np.atleast_1d(np.asarray(a_values, dtype=float))[:, None, None]  # (K, 1, 1)
+    sill = fill + dean_distance(sill_depth, a, exponent)  # (K, N, 1)
+
+    # Fill height at the bathymetry points up to the sill (NaN padding compares False)
+    inside = x <= sill
+    fill_height = np.where(inside, np.maximum(-dean_profile(x - fill, a, exponent) - z, 0), 0.0)
+    trapezoids = 0.5 * (fill_height[..., 1:] + fill_height[..., :-1]) * np.diff(x, axis=-1)
+    areas = np.where(inside[..., 1:], trapezoids, 0.0).sum(axis=-1)
+
+    # build_design_profile adds a bathymetry point at the sill when none is kept beyond it
+    n_inside = inside.sum(axis=-1, keepdims=True)
+    beyond = (x > sill) & (x <= sill + buffer_distance)
+    add_sill = (n_inside > 0) & ~beyond.any(axis=-1, keepdims=True)
+    last = np.maximum(n_inside - 1, 0)
+    nxt = np.minimum(last + 1, x.shape[-1] - 1)
+    x0 = np.take_along_axis(np.broadcast_to(x, inside.shape), last, -1)
+    z0 = np.take_along_axis(np.broadcast_to(z, inside.shape), last, -1)
+    x1 = np.take_along_axis(np.broadcast_to(x, inside.shape), nxt, -1)
+    z1 = np.take_along_axis(np.broadcast_to(z, inside.shape), nxt, -1)
+    # Bathymetry at the sill: linear between the neighbouring points, held beyond the profile end
+    has_next = (nxt > last) & ~np.isnan(x1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        z_sill = np.where(has_next, z0 + (z1 - z0) * (sill - x0) / (x1 - x0), z0)
+    h0 = np.maximum(-dean_profile(x0 - fill, a, exponent) - z0, 0)
+    h_sill = np.maximum(-sill_depth - z_sill, 0)
+    areas += np.where(add_sill, 0.5 * (h0 + h_sill) * (sill - x0), 0.0)[..., 0]
+    return areas
+
+
+def sweep_total_volume(areas, endpoints, extra_volume=0.0):
+    """
+    Total fill volume (Average End Area Method) for each row of sweep_fill_areas.
+
+    Args:
+        areas: Fill areas, shape (K, N), sections in alongshore order
+        endpoints: Section end points, shape (N, 2, 2)
+        extra_volume: Fill outside the sections (m³), scalar or shape (K,)
+
+    Returns:
+        Array of total volumes (m³), shape (K,)
+    """
+    midpoints = np.asarray(endpoints, dtype=float).reshape(-1, 2, 2).mean(axis=1)
+    distances = haversine_distance(midpoints[:-1, 0], midpoints[:-1, 1], midpoints[1:, 0], midpoints[1:, 1])
+    return ((areas[:, :-1] + areas[:, 1:]) / 2 * distances).sum(axis=1) + extra_volume
+
+
+def compute_total_volume(names, endpoints, bathy_dists, bathy_depths, design_dists, design_depths,
+                         sill_distances, extra_volume=0.0, cut_fill=None):
+    """
+    Calculate total fill volume between consecutive sections.
+    Uses Average End Area Method: V = (A1 + A2) / 2 * L, with L the distance
+    between section midpoints.
+
+    Args:
+        names: Section names, in alongshore order
+        endpoints: Section end points, shape (N, 2, 2) as [[lat1, lon1], [lat2, lon2]]
+        bathy_dists, bathy_depths, design_dists, design_depths, sill_distances:
+            Per-section profiles (see calculate_fill_areas)
+        extra_volume: Volume added for fill outside the sections (m³)
+        cut_fill: CutFillResult; its fill outside the sections is used as the extra volume
+
+    Returns:
+        VolumeResult
+    """
+    if len(names) < 2:
+        raise ValueError("At least two sections are needed")
+
+    # Calculate fill area for each section (up to SILL)
+    areas = calculate_fill_areas(bathy_dists, bathy_depths, design_dists, design_depths, sill_distances)
+    return volume_from_areas(names, endpoints, areas, extra_volume, cut_fill)
+
+
+def volume_from_areas(names, endpoints, areas, extra_volume=0.0, cut_fill=None):
+    """
+    Total fill volume from the fill areas of the sections (Average End Area Method).
+
+    Args:
+        names: Section names, in alongshore order
+        endpoints: Section end points, shape (N, 2, 2) as [[lat1, lon1], [lat2, lon2]]
+        areas: Fill area per section (m²)
+        extra_volume: Volume added for fill outside the sections (m³)
+        cut_fill: CutFillResult; its fill outside the sections is used as the extra volume
+
+    Returns:
+        VolumeResult
+    """
+    if len(names) < 2:
+        raise ValueError("At least two sections are needed")
+    if cut_fill is not None:
+        extra_volume = cut_fill.outside_fill
+    areas = np.asarray(areas, dtype=float)
+
+    # Section midpoints, shape (N, 2) as [lat, lon]
+    midpoints = np.asarray(endpoints, dtype=float).reshape(-1, 2, 2).mean(axis=1)
+
+    # Distances between consecutive sections
+    distances = haversine_distance(midpoints[:-1, 0], midpoints[:-1, 1], midpoints[1:, 0], midpoints[1:, 1])
+
+    # Calculate volume (Average End Area Method)
+    volumes = (areas[:-1] + areas[1:]) / 2 * distances
+
+    return VolumeResult(
+        names=list(names),
+        regions=[f"{a}-{b}" for a, b in zip(names[:-1], names[1:])],
+        areas=areas,
+        distances=distances,
+        volumes=volumes,
+        extra=extra_volume,
+        total=float(volumes.sum() + extra_volume),
+        cut_fill=cut_fill,
+    )
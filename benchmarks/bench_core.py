@@ -0,0 +1,310 @@
+# bench_core.py
+# Benchmark suite for the numerical core on synthetic surveys: profile extraction,
+# fill areas, shoreline intersections, total volume and raster cut/fill, from 10^3
+# to 10^7 soundings and 3 to 1000 transects. Results (times and peak memory) are
+# written as JSON and can be compared against a saved baseline.
+#
+# Usage:
+#   python benchmarks/bench_core.py [-o results.json] [--soundings 1e3,1e4,...] [--transects 3,10,...]
+#   python benchmarks/bench_core.py --quick --baseline baseline.json   (exit code 1 on a regression)
+#
+# To save a baseline, keep a results file: python benchmarks/bench_core.py -o baseline.json
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import scipy.interpolate
+import scipy.spatial
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from beach_core import bathymetry, cutfill, design, geometry, volume
+
+# Warm-up: load SciPy's KD-tree and interpolators up front so the first case is not charged for them
+scipy.spatial.cKDTree(np.zeros((1, 2)))
+scipy.interpolate.RegularGridInterpolator(([0.0, 1.0], [0.0, 1.0]), np.zeros((2, 2)))
+
+RESULTS_VERSION = 1
+DEFAULT_SOUNDINGS = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7]
+DEFAULT_TRANSECTS = [3, 10, 100, 1000]
+QUICK_SOUNDINGS = [10 ** 3, 10 ** 4, 10 ** 5]
+QUICK_TRANSECTS = [3, 100]
+MAX_GRID_SOUNDINGS = 10 ** 6  # gridding (Delaunay) above this takes minutes
+CASE_TIME_BUDGET = 10.0  # seconds of timed repeats per case
+DEFAULT_THRESHOLD = 1.25  # slowdown / memory growth flagged as a regression
+TIME_NOISE_MS = 0.5  # smaller slowdowns are timer noise, never flagged
+
+# Synthetic coast: the new shoreline of the project, sea to the south-west
+SHORELINE = (design.NEW_SHORELINE_P1, design.NEW_SHORELINE_P2)
+CROSS_SHORE_RANGE = (-40.0, 300.0)  # meters, landward (-) to seaward (+) of the shoreline
+TRANSECT_RANGE = (-30.0, 250.0)
+
+
+# ===== SYNTHETIC SURVEY =====
+
+def _coast_frame():
+    """Origin (lat, lon), alongshore unit vector, seaward unit normal (local meters) and shoreline length"""
+    lat0, lon0 = SHORELINE[0]['lat'], SHORELINE[0]['lon']
+    scale = geometry.EARTH_RADIUS * np.pi / 180
+    end = np.array([(SHORELINE[1]['lon'] - lon0) * scale * np.cos(np.radians(lat0)), (SHORELINE[1]['lat'] - lat0) * scale])
+    length = float(np.hypot(*end))
+    along = end / length
+    normal = np.array([along[1], -along[0]])  # right of P1 -> P2: sea side
+    if normal[0] > 0:  # sea is to the south-west
+        normal = -normal
+    return (lat0, lon0), along, normal, length
+
+
+def _to_lat_lon(origin, x, y):
+    scale = geometry.EARTH_RADIUS * np.pi / 180
+    return origin[0] + y / scale, origin[1] + x / (scale * np.cos(np.radians(origin[0])))
+
+
+def synthetic_depth(cross_shore, alongshore, rng=None):
+    """Positive-down depth: Dean profile (A = 0.1) with an alongshore-varying bar and sounding noise"""
+    x = np.maximum(cross_shore, 0.0)
+    depth = 0.1 * x ** (2 / 3)
+    depth += 0.6 * np.exp(-((x - 120.0 - 20.0 * np.sin(alongshore / 80.0)) / 25.0) ** 2)
+    if rng is not None:
+        depth += rng.normal(0.0, 0.05, np.shape(cross_shore))
+    return np.maximum(depth, 0.0)
+
+
+def make_survey(n, seed=0):
+    """Synthetic scattered soundings around the project shoreline (in memory, so no on-disk caches apply)"""
+    rng = np.random.default_rng(seed)
+    origin, along, normal, length = _coast_frame()
+    s = rng.uniform(-50.0, length + 50.0, n)
+    c = rng.uniform(*CROSS_SHORE_RANGE, n)
+    x, y = s * along[0] + c * normal[0], s * along[1] + c * normal[1]
+    lat, lon = _to_lat_lon(origin, x, y)
+    return bathymetry.Soundings(lat=lat, lon=lon, depth=synthetic_depth(c, s, rng).astype(np.float32))
+
+
+def make_transects(k):
+    """k transects perpendicular to the shoreline, evenly spaced along it, shape (k, 2, 2)"""
+    origin, along, normal, length = _coast_frame()
+    s = np.linspace(0.05 * length, 0.95 * length, k)
+    ends = []
+    for c in TRANSECT_RANGE:
+        x, y = s * along[0] + c * normal[0], s * along[1] + c * normal[1]
+        ends.append(np.column_stack(_to_lat_lon(origin, x, y)))
+    return np.stack(ends, axis=1)
+
+
+# ===== TIMING =====
+
+def measure(func, repeats, budget=CASE_TIME_BUDGET):
+    """
+    Run func once untimed under tracemalloc (peak memory, warm-up), then time up to
+    `repeats` runs within `budget` seconds (at least one).
+
+    Returns:
+        Dict with min_ms, median_ms, repeats and peak_mb
+    """
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    times = []
+    spent = 0.0
+    while len(times) < repeats and (not times or spent < budget):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+        spent += times[-1]
+    return {
+        'min_ms': round(min(times) * 1e3, 4),
+        'median_ms': round(float(np.median(times)) * 1e3, 4),
+        'repeats': len(times),
+        'peak_mb': round(peak / 2 ** 20, 3),
+    }
+
+
+def design_profiles(soundings, transects, num_points):
+    """Extracted and designed profiles for the volume cases"""
+    distances, depths = bathymetry.extract_depth_profiles(soundings, transects, num_points, cache=None)
+    params = design.DesignParams()
+    return [design.build_design_profile(dist, depth, design.fill_start_distance(
+        {'lat': t[0, 0], 'lon': t[0, 1]}, {'lat': t[1, 0], 'lon': t[1, 1]}, *SHORELINE), params)
+        for dist, depth, t in zip(distances, depths, transects)]
+
+
+def run_cases(n, transect_counts, args, report):
+    """Benchmark all cases for one survey size"""
+    soundings = make_survey(n, args.seed)
+
+    def clear_index():
+        bathymetry._SPATIAL_INDEX_CACHE.pop(soundings.key, None)
+
+    def build_index():
+        clear_index()
+        bathymetry.get_spatial_index(soundings)
+
+    report('spatial_index', n, None, measure(build_index, args.repeats))
+    bathymetry.get_spatial_index(soundings)
+
+    grid = None
+    if n <= args.max_grid_soundings:
+        report('bathymetry_grid', n, None,
+               measure(lambda: bathymetry.build_bathymetry_grid(soundings, args.grid_resolution), args.repeats))
+        grid = bathymetry.get_bathymetry_grid(soundings, args.grid_resolution)
+
+    for k in transect_counts:
+        transects = make_transects(k)
+        section_points = [[{'lat': t[0, 0], 'lon': t[0, 1]}, {'lat': t[1, 0], 'lon': t[1, 1]}] for t in transects]
+
+        report('extract_depth_profile', n, k, measure(lambda: [
+            bathymetry.extract_depth_profile(soundings, p1, p2, args.num_points) for p1, p2 in section_points
+        ], args.repeats))
+        report('extract_depth_profiles', n, k, measure(
+            lambda: bathymetry.extract_depth_profiles(soundings, transects, args.num_points, cache=None), args.repeats))
+        if grid is not None:
+            report('extract_depth_profiles_bilinear', n, k, measure(lambda: bathymetry.extract_depth_profiles(
+                soundings, transects, args.num_points, method='bilinear', grid_resolution=args.grid_resolution, cache=None),
+                args.repeats))
+
+        if n == args.soundings[0]:
+            # Cases that do not depend on the survey size: once per transect count
+            profiles = design_profiles(soundings, transects, args.num_points)
+            report('find_line_intersection', None, k, measure(lambda: [
+                geometry.find_line_intersection(p1, p2, *SHORELINE) for p1, p2 in section_points
+            ], args.repeats))
+            report('calculate_fill_area', None, k, measure(lambda: [
+                volume.calculate_fill_area(p.bathy_dist, p.bathy_depth, p.design_dist, p.design_depth, p.sill_distance)
+                for p in profiles
+            ], args.repeats))
+            names = [str(i + 1) for i in range(k)]
+            report('compute_total_volume', None, k, measure(lambda: volume.compute_total_volume(
+                names, transects, [p.bathy_dist for p in profiles], [p.bathy_depth for p in profiles],
+                [p.design_dist for p in profiles], [p.design_depth for p in profiles], [p.sill_distance for p in profiles]
+            ), args.repeats))
+
+        if grid is not None and k >= 2:
+            report('raster_cut_fill', n, k, measure(lambda: cutfill.raster_cut_fill(
+                soundings, transects, shoreline=SHORELINE, resolution=args.grid_resolution, grid=grid), args.repeats))
+    clear_index()
+
+
+# ===== RESULTS =====
+
+def machine_info():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, timeout=10,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'python': platform.python_version(), 'numpy': np.__version__, 'scipy': scipy.__version__,
+        'platform': platform.platform(), 'machine': platform.machine(), 'cpus': os.cpu_count(), 'commit': commit,
+    }
+
+
+def case_key(result):
+    return (result['case'], result['soundings'], result['transects'])
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare results with a baseline on min_ms (least noisy) and peak_mb.
+    Slowdowns under TIME_NOISE_MS are not flagged.
+
+    Returns:
+        List of (result, baseline result, time ratio, memory ratio, regressed) for the cases in both
+    """
+    base = {case_key(r): r for r in baseline['results']}
+    rows = []
+    for result in results:
+        old = base.get(case_key(result))
+        if old is None:
+            continue
+        time_ratio = result['min_ms'] / old['min_ms'] if old['min_ms'] > 0 else 1.0
+        # Sub-megabyte peaks vary with allocator details: only compare larger ones
+        memory_ratio = result['peak_mb'] / old['peak_mb'] if old['peak_mb'] >= 1.0 else 1.0
+        slower = time_ratio > threshold and result['min_ms'] - old['min_ms'] > TIME_NOISE_MS
+        rows.append((result, old, time_ratio, memory_ratio, slower or memory_ratio > threshold))
+    return rows
+
+
+def _count(value):
+    return '-' if value is None else f"{value:,}"
+
+
+def _sizes(text):
+    return [int(float(v)) for v in text.split(',') if v.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Numerical core benchmark on synthetic surveys")
+    parser.add_argument('-o', '--output', default='bench_core.json', help="Results JSON (default: bench_core.json)")
+    parser.add_argument('--soundings', type=_sizes, default=None, help="Survey sizes, comma separated (default: 1e3,...,1e7)")
+    parser.add_argument('--transects', type=_sizes, default=None, help="Transect counts, comma separated (default: 3,10,100,1000)")
+    parser.add_argument('--quick', action='store_true', help="Small sizes only (1e3-1e5 soundings, 3 and 100 transects)")
+    parser.add_argument('--num-points', type=int, default=100, help="Samples per transect (default: 100)")
+    parser.add_argument('--grid-resolution', type=float, default=bathymetry.DEFAULT_GRID_RESOLUTION,
+                        help="Grid spacing for the gridded cases in meters (default: 5)")
+    parser.add_argument('--max-grid-soundings', type=int, default=MAX_GRID_SOUNDINGS,
+                        help="Largest survey for the gridded cases (default: 1e6)")
+    parser.add_argument('--repeats', type=int, default=5, help="Timed runs per case (default: 5, fewer for slow cases)")
+    parser.add_argument('--seed', type=int, default=0, help="Synthetic survey seed (default: 0)")
+    parser.add_argument('--baseline', default=None, help="Baseline results JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Time or memory ratio to the baseline flagged as a regression (default: 1.25)")
+    args = parser.parse_args(argv)
+    args.soundings = sorted(args.soundings or (QUICK_SOUNDINGS if args.quick else DEFAULT_SOUNDINGS))
+    transect_counts = sorted(args.transects or (QUICK_TRANSECTS if args.quick else DEFAULT_TRANSECTS))
+
+    results = []
+    print(f"{'case':<32} {'soundings':>11} {'transects':>9} {'min (ms)':>11} {'median (ms)':>12} {'peak (MB)':>10}")
+
+    def report(case, n, k, timing):
+        result = {'case': case, 'soundings': n, 'transects': k, **timing}
+        results.append(result)
+        print(f"{case:<32} {_count(n):>11} {_count(k):>9} {timing['min_ms']:>11.3f} {timing['median_ms']:>12.3f} "
+              f"{timing['peak_mb']:>10.2f}", flush=True)
+
+    start = time.perf_counter()
+    for n in args.soundings:
+        run_cases(n, transect_counts, args, report)
+
+    output = {
+        'version': RESULTS_VERSION,
+        'created': time.time(),
+        'elapsed_s': round(time.perf_counter() - start, 1),
+        'machine': machine_info(),
+        'settings': {'num_points': args.num_points, 'grid_resolution': args.grid_resolution, 'seed': args.seed},
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(output, f, indent=2)
+    print(f"{len(results)} cases in {output['elapsed_s']} s -> {args.output}", file=sys.stderr)
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get('settings') != output['settings']:
+        print("Warning: baseline was run with other settings", file=sys.stderr)
+    if baseline.get('machine', {}).get('platform') != output['machine']['platform']:
+        print("Warning: baseline was run on another machine", file=sys.stderr)
+
+    rows = compare(results, baseline, args.threshold)
+    print(f"\n{'case':<32} {'soundings':>11} {'transects':>9} {'baseline (ms)':>14} {'now (ms)':>11} {'time':>7} {'memory':>7}")
+    for result, old, time_ratio, memory_ratio, regressed in rows:
+        print(f"{result['case']:<32} {_count(result['soundings']):>11} {_count(result['transects']):>9} "
+              f"{old['min_ms']:>14.3f} {result['min_ms']:>11.3f} {time_ratio:>6.2f}x {memory_ratio:>6.2f}x"
+              f"{'  REGRESSION' if regressed else ''}")
+    regressions = sum(row[-1] for row in rows)
+    print(f"{len(rows)} cases compared, {regressions} regressions (threshold {args.threshold:g}x)", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
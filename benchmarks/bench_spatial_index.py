@@ -0,0 +1,80 @@
+# bench_spatial_index.py
+# Benchmark: nearest-sounding lookup for one transect, brute force vs KD-tree
+#
+# Usage:
+#   python benchmarks/bench_spatial_index.py [--max-size 1000000] [--num-points 100]
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import scipy.spatial
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from beach_core import bathymetry
+
+# Warm-up: load SciPy's KD-tree up front so the first index build is not charged for it
+scipy.spatial.cKDTree(np.zeros((1, 2)))
+
+# Survey extent (same area as data.nc)
+LAT_RANGE = (41.1736, 41.1799)
+LON_RANGE = (29.6219, 29.6389)
+
+
+def make_survey(n, seed=0):
+    """Synthetic scattered soundings over the data.nc area"""
+    rng = np.random.default_rng(seed)
+    lats = rng.uniform(*LAT_RANGE, n)
+    lons = rng.uniform(*LON_RANGE, n)
+    depth = 10.0 * (lats - LAT_RANGE[0]) / (LAT_RANGE[1] - LAT_RANGE[0])
+    return bathymetry.Soundings(lat=lats, lon=lons, depth=depth)
+
+
+def brute_force_lookup(soundings, lats, lons):
+    """Previous implementation: one full scan of the survey per sample point"""
+    ds_lats = soundings.lat
+    ds_lons = soundings.lon
+    depth_data = soundings.depth
+    depths = []
+    for lat, lon in zip(lats, lons):
+        nearest_idx = np.argmin(np.sqrt((ds_lats - lat)**2 + (ds_lons - lon)**2))
+        depths.append(float(depth_data[nearest_idx]))
+    return depths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Nearest-sounding lookup benchmark")
+    parser.add_argument('--max-size', type=int, default=1_000_000, help="Largest survey size to test")
+    parser.add_argument('--num-points', type=int, default=100, help="Samples per transect")
+    args = parser.parse_args()
+
+    point1 = {'lat': 41.1790, 'lon': 29.6250}
+    point2 = {'lat': 41.1745, 'lon': 29.6350}
+    lats = np.linspace(point1['lat'], point2['lat'], args.num_points)
+    lons = np.linspace(point1['lon'], point2['lon'], args.num_points)
+
+    print(f"{'soundings':>12} {'brute (ms)':>12} {'index build (ms)':>17} {'indexed query (ms)':>19}")
+    n = 1_000
+    while n <= args.max_size:
+        soundings = make_survey(n)
+
+        t0 = time.perf_counter()
+        brute_force_lookup(soundings, lats, lons)
+        t_brute = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        bathymetry.get_spatial_index(soundings)
+        t_build = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        bathymetry.extract_depth_profile(soundings, point1, point2, num_points=args.num_points)
+        t_query = time.perf_counter() - t0
+
+        print(f"{n:>12,} {t_brute * 1e3:>12.2f} {t_build * 1e3:>17.2f} {t_query * 1e3:>19.2f}")
+        n *= 10
+
+
+if __name__ == '__main__':
+    main()
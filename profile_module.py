@@ -2,210 +2,980 @@
 import streamlit as st
 import plotly.graph_objects as go
 import folium
-from streamlit_folium import st_folium
-import xarray as xr
+from streamlit_folium import generate_leaflet_string, st_folium
 import numpy as np
+import io
 import os
+import re
+import threading
+import time
 
-# ===== HELPER FUNCTIONS =====
-def find_line_intersection(p1, p2, p3, p4):
-    """Find intersection point between two lines
-    p1-p2: First line (section line)
-    p3-p4: Second line (new shoreline)
-    """
+from beach_core import bathymetry, cutfill, design, downsample, erosion, jobs, maptiles, project, surface, timing, volume
+from beach_core.bathymetry import DEFAULT_GRID_RESOLUTION, SAMPLING_MODES
+from beach_core.incremental import NodeCache, input_hash
+from beach_core.section import Section
+
+def bathymetry_file():
+    """Path of the survey file: data.nc in the working directory, else next to the app"""
+    file_name = "data.nc"
+    if os.path.exists(file_name):
+        return os.path.abspath(file_name)
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), file_name)
+
+@timing.timed()
+def load_bathymetry(endpoints=None):
+    # Process-wide cache shared by all sessions (reloaded when data.nc changes), see beach_core.bathymetry.
+    # Very large surveys are read out of core, only around the sections' end points.
     try:
-        # Calculate intersection point between two lines
-        x1, y1 = p1['lon'], p1['lat']
-        x2, y2 = p2['lon'], p2['lat']
-        x3, y3 = p3['lon'], p3['lat']
-        x4, y4 = p4['lon'], p4['lat']
-        
-        # Calculate determinant
-        denom = (x1 - x2) * (y3 - y4) - (y1 - y2) * (x3 - x4)
-        
-        if abs(denom) < 1e-10:  # Parallel lines
-            return None
-        
-        # Intersection point
-        t = ((x1 - x3) * (y3 - y4) - (y1 - y3) * (x3 - x4)) / denom
-        
-        # Check if intersection point is on the section line
-        # t value should be between 0 and 1
-        if t < 0 or t > 1:
-            return None
-        
-        # Intersection point coordinates
-        intersection_lon = x1 + t * (x2 - x1)
-        intersection_lat = y1 + t * (y2 - y1)
-        
-        return {'lat': intersection_lat, 'lon': intersection_lon}
+        return bathymetry.soundings_for_transects(bathymetry_file(), endpoints)
     except:
         return None
 
-def calculate_distance(point1, point2):
-    """Calculate distance between two points (Haversine formula)"""
-    R = 6371000  # Earth radius (meters)
-    lat1_rad = np.radians(point1['lat'])
-    lat2_rad = np.radians(point2['lat'])
-    delta_lat = np.radians(point2['lat'] - point1['lat'])
-    delta_lon = np.radians(point2['lon'] - point1['lon'])
-    
-    a = np.sin(delta_lat/2)**2 + np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin(delta_lon/2)**2
-    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1-a))
-    return R * c
+# Depth / contour map tiles, served by Streamlit's static file serving (.streamlit/config.toml)
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+# Tile renders by tile directory, shared by all sessions: (survey modification time, Job).
+# A failed render stays here, so it is not retried on every rerun, only once the survey changes.
+_TILE_RENDERS = {}
+_TILE_RENDERS_LOCK = threading.Lock()
+
+def tile_render(source, tiles_path):
+    """
+    Tile metadata from the render job of a tile directory, submitted to the shared pool
+    if there is none for the current survey (one per directory, whichever session asks
+    first). Each session waits JOB_WAIT for it once, then polls it with job_progress.
+
+    Returns:
+        Tile metadata, or None while the job runs (raises the render's error if it failed)
+    """
+    stamp = os.path.getmtime(source)
+    with _TILE_RENDERS_LOCK:
+        entry = _TILE_RENDERS.get(tiles_path)
+        if entry is None or entry[0] != stamp:
+            job = jobs.shared_pool().submit('tiles', stamp, maptiles.render_tiles, source, tiles_path)
+            entry = _TILE_RENDERS[tiles_path] = (stamp, job)
+    job = entry[1]
+    running = session_jobs()
+    if running.get('tiles') is not job:
+        running['tiles'] = job
+        job.wait(JOB_WAIT)
+    if not job.done:
+        return None
+    running.pop('tiles', None)
+    return job.result()
+
+def bathymetry_tiles():
+    """
+    Metadata of the survey's map tiles, rendering them in the background first if needed
+    (see beach_core.maptiles and tile_render). Surveys too large to load whole are not
+    rendered here (python -m beach_core.maptiles data.nc).
 
-@st.cache_data
-def load_bathymetry():
+    Returns:
+        Tile metadata with the tiles' 'url', or None if there are no tiles (yet)
+    """
+    source = bathymetry_file()
+    tiles_path = maptiles.default_tiles_path(source, STATIC_DIR)
     try:
-        file_name = "data.nc"
-        if os.path.exists(file_name):
-            file_path = os.path.abspath(file_name)
-        else:
-            file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), file_name)
-        
-        try:
-            return xr.open_dataset(file_path, engine='netcdf4')
-        except:
-            return xr.open_dataset(file_path, engine='scipy')
-    except:
+        meta = maptiles.find_tiles(source, tiles_path)
+        if meta is None and os.path.getsize(source) <= bathymetry.OUT_OF_CORE_BYTES:
+            meta = tile_render(source, tiles_path)
+    except Exception:
+        return None
+    if meta is None:
         return None
+    session_jobs().pop('tiles', None)  # Rendered (possibly by another session)
+    base_path = st.get_option('server.baseUrlPath').strip('/')
+    relative = os.path.relpath(tiles_path, STATIC_DIR).replace(os.sep, '/')
+    return dict(meta, url=f"{'/' + base_path if base_path else ''}/app/static/{relative}")
+
+# ===== SECTION MODEL =====
+# Sections are an ordered list (alongshore order) of any length.
+# Volumes are computed between consecutive sections.
+# Each section (beach_core.section.Section) holds its profiles as NumPy arrays and
+# keeps a node cache (profile, design, fill area, erosion, figures), and the session
+# one for results over all sections; a node is recomputed only when the hash of its
+# inputs changes, so e.g. a cost input change does not touch geometry.
+DEFAULT_SECTION_COUNT = 3
+DEFAULT_PROFILE_POINTS = 100  # Samples per section (nearest / bilinear sampling)
+# Sampling settings by widget key. Streamlit drops a widget's state on reruns that do not
+# show it (the All Results view, the landing page), so the values are kept in
+# st.session_state.sampling_settings, updated by the widgets' on_change callback
+SAMPLING_DEFAULTS = {'sampling_mode': 'nearest', 'grid_resolution': DEFAULT_GRID_RESOLUTION,
+                     'profile_points': DEFAULT_PROFILE_POINTS}
+RESULTS_PAGE_SIZE = 10  # Sections per page in the All Results view
+
+SECTION_COLORS = ['#2563EB', '#DC2626', '#FACC15', '#7C3AED', '#059669', '#EA580C', '#DB2777', '#0891B2']
+SILL_COLORS = ['#006400', '#00FF00', '#90EE90']  # Dark green, normal green, light green
+MAP_COLORS = ['blue', 'green', 'orange', 'red', 'purple', 'darkblue', 'cadetblue', 'darkred']
 
-def extract_depth_profile(ds, point1, point2, num_points=100):
-    if ds is None:
-        return None, None
+def section_name(index):
+    """Section name for a list index: 0 -> 'A', 25 -> 'Z', 26 -> 'AA', ..."""
+    name = ''
+    index += 1
+    while index > 0:
+        index, remainder = divmod(index - 1, 26)
+        name = chr(ord('A') + remainder) + name
+    return name
+
+def next_section_name(sections):
+    """First section name not used by any existing section"""
+    used = {sec.name for sec in sections}
+    index = 0
+    while section_name(index) in used:
+        index += 1
+    return section_name(index)
+
+def project_cache():
+    """Session node cache for the results over all sections"""
+    if 'compute_cache' not in st.session_state:
+        st.session_state.compute_cache = NodeCache()
+    return st.session_state.compute_cache
+
+def init_session_state():
+    """Create the section list and navigation state if missing"""
+    if 'sections' not in st.session_state:
+        st.session_state.sections = [Section(section_name(i)) for i in range(DEFAULT_SECTION_COUNT)]
     
-    lats = np.linspace(point1['lat'], point2['lat'], num_points)
-    lons = np.linspace(point1['lon'], point2['lon'], num_points)
+    if 'current_section' not in st.session_state:
+        st.session_state.current_section = 0  # Index into sections, or 'ALL'
     
-    R = 6371000
-    lat1_rad = np.radians(point1['lat'])
-    lat2_rad = np.radians(lats)
-    delta_lat = np.radians(lats - point1['lat'])
-    delta_lon = np.radians(lons - point1['lon'])
+    if 'coord_version' not in st.session_state:
+        st.session_state.coord_version = 0
     
-    a = np.sin(delta_lat/2)**2 + np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin(delta_lon/2)**2
-    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1-a))
-    distances = R * c
+    if 'sampling_settings' not in st.session_state:
+        st.session_state.sampling_settings = dict(SAMPLING_DEFAULTS)
+
+# ===== INITIALIZE SESSION STATE =====
+init_session_state()
+
+# New shoreline coordinates (constants, see beach_core.design)
+NEW_SHORELINE_P1 = design.NEW_SHORELINE_P1
+NEW_SHORELINE_P2 = design.NEW_SHORELINE_P2
+
+# Sill depth constant (meters)
+SILL_DEPTH_TARGET = 2.5  # Target depth for sill location
+
+def sampling_settings():
+    """Current sampling settings: (mode, grid resolution, samples per section)"""
+    settings = st.session_state.sampling_settings
+    return tuple(settings[key] for key in SAMPLING_DEFAULTS)
+
+def store_sampling_setting(key):
+    """on_change callback of a sampling widget: keep its value beyond the widget's state"""
+    st.session_state.sampling_settings[key] = st.session_state[key]
+
+def design_key(params):
+    return (params.a, params.exponent, params.sill_depth)
+
+def section_sampling(data, method='nearest', grid_resolution=DEFAULT_GRID_RESOLUTION, num_points=DEFAULT_PROFILE_POINTS):
+    """Sampling of a section, (mode, grid resolution, samples): the one it was sampled with, or the given one for a new profile (data None)"""
+    sampling = (data and data.sampling) or (method, grid_resolution, num_points)
+    mode, resolution = sampling[:2]
+    points = sampling[2] if len(sampling) > 2 else DEFAULT_PROFILE_POINTS
+    return (mode, resolution if mode == 'bilinear' else None, None if mode == 'adaptive' else int(points))
+
+def profile_key(data, sampling, soundings, params):
+    """Inputs of a section's profile: its points, sampling and survey (and the design for adaptive sampling)"""
+    inputs = (data.points, sampling, soundings.key)
+    if sampling[0] == 'adaptive':
+        inputs += (design_key(params), NEW_SHORELINE_P1, NEW_SHORELINE_P2)
+    return input_hash(*inputs)
+
+EXTRACT_CHUNK_SECTIONS = 25  # Sections per batched call in a profile job (its progress / cancellation steps)
+
+def extract_profile_groups(soundings, groups, grid_resolution=DEFAULT_GRID_RESOLUTION, progress=None):
+    """
+    Extract the profiles of groups of sections sharing a sampling, in batched calls of
+    EXTRACT_CHUNK_SECTIONS sections. Runs as a background job (no Streamlit calls).
+
+    Args:
+        soundings: Soundings to sample
+        groups: List of (sampling (mode, resolution, samples), end points, design depth functions or None)
+        grid_resolution: Grid spacing for bilinear sampling without a resolution of its own
+        progress: Optional callback(done, total) per chunk of sections
+
+    Returns:
+        Per group: (distances, depths, adaptive sampling infos or None), or the exception it failed with
+    """
+    total = sum(len(endpoints) for _, endpoints, _ in groups)
+    done = 0
+    results = []
+    for (mode, resolution, points), endpoints, design_depths in groups:
+        distances, depths, infos = [], [], [] if mode == 'adaptive' else None
+        try:
+            for start in range(0, len(endpoints), EXTRACT_CHUNK_SECTIONS):
+                if progress:
+                    progress(done, total)
+                chunk = endpoints[start:start + EXTRACT_CHUNK_SECTIONS]
+                if mode == 'adaptive':
+                    profiles = bathymetry.extract_adaptive_profiles(
+                        soundings, chunk, design_depths[start:start + EXTRACT_CHUNK_SECTIONS])
+                    distances += [p.distances for p in profiles]
+                    depths += [p.depths for p in profiles]
+                    infos += [{'spacing': p.spacing, 'error_estimate': p.error_estimate} for p in profiles]
+                else:
+                    chunk_distances, chunk_depths = bathymetry.extract_depth_profiles(
+                        soundings, chunk, points, method=mode, grid_resolution=resolution or grid_resolution)
+                    distances += list(chunk_distances)
+                    depths += list(chunk_depths)
+                done += len(chunk)
+        except jobs.Cancelled:
+            raise
+        except Exception as e:
+            results.append(e)
+            continue
+        results.append((distances, depths, infos))
+    return results
+
+@timing.timed('extract_profiles')
+def extract_pending_sections(soundings, sections, method='nearest', grid_resolution=DEFAULT_GRID_RESOLUTION, params=None,
+                             num_points=DEFAULT_PROFILE_POINTS):
+    """
+    Extract bathymetry for every section that has both points and a stale (or no) profile,
+    with one batched call per sampling mode instead of one call per section.
+    Adaptive sampling is refined where the design profile (params) crosses the bathymetry.
+    The extraction runs as the session's 'profiles' job (see run_job).
+    
+    Returns:
+        Sections whose profiles are still being extracted (empty when all are up to date)
+    """
+    if soundings is None:
+        return []
+    params = params or design.DesignParams()
+    
+    groups = {}
+    for data in sections:
+        if len(data.points) != 2:
+            continue
+        sampling = section_sampling(data, method, grid_resolution, num_points)
+        key = profile_key(data, sampling, soundings, params)
+        if not data.cache.is_fresh('profile', key):
+            groups.setdefault(sampling, []).append((data, key))
+    if not groups:
+        return []
+    
+    requests = []
+    for sampling, pending in groups.items():
+        design_depths = None
+        if sampling[0] == 'adaptive':
+            design_depths = [
+                design.design_depth_function(
+                    design.fill_start_distance(data.points[0], data.points[1], NEW_SHORELINE_P1, NEW_SHORELINE_P2),
+                    params)
+                for data, _ in pending
+            ]
+        requests.append((sampling, [data.endpoints for data, _ in pending], design_depths))
     
+    job_key = input_hash([key for pending in groups.values() for _, key in pending])
+    done, results = run_job('profiles', job_key, extract_profile_groups, soundings, requests, grid_resolution)
+    if not done:
+        return [data for pending in groups.values() for data, _ in pending]
+    if isinstance(results, Exception):
+        st.error(f"Error extracting profiles: {str(results) or type(results).__name__}")
+        return []
+    
+    for (sampling, pending), result in zip(groups.items(), results):
+        if isinstance(result, Exception):
+            st.error(f"Error extracting profiles: {result}")
+            continue
+        timing.count('profiles_extracted', len(pending))
+        distances, depths, infos = result
+        for i, ((data, key), dist, depth) in enumerate(zip(pending, distances, depths)):
+            info = infos[i] if infos else None
+            data.cache.put('profile', key, info)
+            data.set_profile(dist, depth, sampling, info)  # Designed again by design_pending_sections
+    return []
+
+def section_design_key(data, params):
+    """Inputs of a section's design: its profile and the design parameters"""
+    return input_hash(data.cache.key('profile'), design_key(params), NEW_SHORELINE_P1, NEW_SHORELINE_P2)
+
+def design_section(data, params):
+    """
+    (Re)build the design profile of a section from its untrimmed bathymetry profile,
+    so it follows the current A / sill depth without re-extracting.
+    """
+    # Fill start distance (intersection with the new shoreline)
+    fill_distance = design.fill_start_distance(
+        data.points[0], data.points[1], NEW_SHORELINE_P1, NEW_SHORELINE_P2
+    )
+    profile = data.cache.compute(
+        'design', section_design_key(data, params),
+        design.build_design_profile, data.raw_dist, data.raw_depth, fill_distance, params
+    )
+    
+    # Sill and fill locations, bathymetry trimmed to sill + buffer, design profile up to sill
+    data.set_design(profile, design_key(params))
+
+@timing.timed('design_profiles')
+def design_pending_sections(sections, params):
+    """Design every extracted section whose design is stale (new profile or other parameters)"""
+    for data in sections:
+        if data.has_profile and 'profile' in data.cache and \
+                not (data.completed and data.cache.is_fresh('design', section_design_key(data, params))):
+            design_section(data, params)
+
+def section_fill_area(data):
+    """Fill area of a designed section up to its sill (cached against its design)"""
+    cache = data.cache
+    return cache.compute(
+        'fill_area', cache.key('design'), volume.calculate_fill_area,
+        data.bathy_dist, data.bathy_depth, data.user_dist, data.user_depth, data.sill_distance
+    )
+
+def section_erosion(data, params):
+    """Eroded design profile of a section after EROSION_YEARS (cached against its design and retreat rate)"""
+    cache = data.cache
+    return cache.compute(
+        'erosion', input_hash(cache.key('design'), data.retreat_rate, params.exponent, erosion.EROSION_YEARS),
+        erosion.erode_profile, data.user_dist, data.user_depth, data.sill_distance, data.sill_depth,
+        data.retreat_rate, exponent=params.exponent
+    )
+
+def recomputed_nodes(sections):
+    """Nodes recomputed in this run, over the session cache and all section caches"""
+    nodes = list(project_cache().recomputed)
+    for data in sections:
+        nodes += [f"{data.name}: {node}" for node in data.cache.recomputed]
+    return nodes
+
+# ===== SECTION PICKER MAP =====
+# The base map (satellite tiles, bathymetry depth / contour tiles, new shoreline, click
+# popup) is built and rendered once per session and reused, so the map component is not remounted on a rerun. Section
+# markers and lines are sent as a separate feature group that the component swaps in
+# place; only that layer is re-sent when a point is added or a section changes.
+MAP_CENTER = [41.175354, 29.626743]
+MAP_ZOOM = 15
+MAP_MAX_ZOOM = 20
+SATELLITE_TILES = 'https://server.arcgisonline.com/ArcGIS/rest/services/World_Imagery/MapServer/tile/{z}/{y}/{x}'
+
+def build_base_map(tiles=None):
+    """Static part of the section picker map, rendered (with the bathymetry overlay if there are tiles)"""
+    m = folium.Map(location=MAP_CENTER, zoom_start=MAP_ZOOM)
+    folium.TileLayer(
+        tiles=SATELLITE_TILES,
+        attr='Esri',
+        name='Satellite',
+        overlay=False,
+        control=True
+    ).add_to(m)
+
+    if tiles:
+        lat_min, lat_max, lon_min, lon_max = tiles['bounds']
+        for layer, name, opacity in (('depth', 'Depth', 0.7), ('contours', f"Contours ({tiles['contour_interval']:g} m)", 1.0)):
+            folium.TileLayer(
+                tiles=f"{tiles['url']}/{layer}/{{z}}/{{x}}/{{y}}.png",
+                attr='Bathymetry survey',
+                name=name,
+                overlay=True,
+                control=True,
+                opacity=opacity,
+                max_zoom=MAP_MAX_ZOOM,
+                min_native_zoom=tiles['min_zoom'],
+                max_native_zoom=tiles['max_zoom'],
+                bounds=[[lat_min, lon_min], [lat_max, lon_max]],
+            ).add_to(m)
+        folium.LayerControl(collapsed=True).add_to(m)
+
+    # Add new shoreline to map
+    new_shoreline_coords = [[NEW_SHORELINE_P1['lat'], NEW_SHORELINE_P1['lon']], 
+                            [NEW_SHORELINE_P2['lat'], NEW_SHORELINE_P2['lon']]]
+    
+    folium.PolyLine(new_shoreline_coords, color='green', weight=3, opacity=0.8,
+                   popup='New Shoreline (Fill Start)').add_to(m)
+    
+    # Add markers to shoreline start and end points
+    folium.Marker(new_shoreline_coords[0], popup='New Shoreline Start',
+                 icon=folium.Icon(color='green', icon='info-sign')).add_to(m)
+    folium.Marker(new_shoreline_coords[1], popup='New Shoreline End',
+                 icon=folium.Icon(color='green', icon='info-sign')).add_to(m)
+
+    m.add_child(folium.LatLngPopup())
+    m.get_root().render()
+    generate_leaflet_string(m)  # Gives the elements the ids st_folium uses, so the map script is the same from the first run on
+    return m
+
+def section_feature_group(sections, current):
+    """
+    Dynamic layer of the section picker map. The current section gets colored markers
+    and a line; the others are drawn as one gray GeoJSON layer, so the layer costs
+    about the same to render however many sections there are.
+    """
+    group = folium.FeatureGroup(name='Sections')
+    others = []
+    for index, sec_data in enumerate(sections):
+        if index == current or not sec_data.points:
+            continue
+        points = [[p['lon'], p['lat']] for p in sec_data.points]
+        names = [sec_data.name, f"{sec_data.name}'"]
+        others += [{'type': 'Feature', 'properties': {'name': label}, 'geometry': {'type': 'Point', 'coordinates': point}}
+                   for label, point in zip(names, points)]
+        if len(points) == 2:
+            others.append({'type': 'Feature', 'properties': {'name': f"{names[0]}-{names[1]}"},
+                           'geometry': {'type': 'LineString', 'coordinates': points}})
+    if others:
+        folium.GeoJson(
+            {'type': 'FeatureCollection', 'features': others},
+            style_function=lambda feature: {'color': 'gray', 'weight': 2, 'opacity': 0.5},
+            marker=folium.CircleMarker(radius=6, color='gray', fill=True, fill_opacity=0.8),
+            tooltip=folium.GeoJsonTooltip(fields=['name'], labels=False),
+        ).add_to(group)
+
+    if isinstance(current, int) and sections[current].points:
+        sec_data = sections[current]
+        color = MAP_COLORS[current % len(MAP_COLORS)]
+        for idx, pt in enumerate(sec_data.points):
+            folium.Marker(
+                [pt['lat'], pt['lon']],
+                popup=sec_data.name if idx == 0 else f"{sec_data.name}'",
+                icon=folium.Icon(color=color)
+            ).add_to(group)
+        if len(sec_data.points) == 2:
+            folium.PolyLine(
+                sec_data.endpoints,
+                color=color,
+                weight=3,
+                opacity=1.0
+            ).add_to(group)
+    return group
+
+@timing.timed()
+def section_map(sections, current, key):
+    """
+    Section picker map: the cached base map with the sections as a dynamic layer.
+    Reruns the app only on clicks (not on pan / zoom).
+
+    Returns:
+        st_folium map data (last_clicked)
+    """
+    tiles = bathymetry_tiles()
+    base = project_cache().compute('base_map', input_hash(NEW_SHORELINE_P1, NEW_SHORELINE_P2, tiles), build_base_map, tiles)
+    # st_folium renders the map again and attaches the layer to it, and rendering adds
+    # elements (e.g. marker icon bindings); restore the base map so it stays unchanged
+    snapshot = [(element, dict(element._children)) for element in map_elements(base.get_root())]
     try:
-        # Get coordinates from data_vars (data.nc format)
-        if 'latitude' in ds.data_vars and 'longitude' in ds.data_vars:
-            ds_lats = ds['latitude'].values
-            ds_lons = ds['longitude'].values
-        else:
-            return distances.tolist(), [0.0] * len(distances)
-        
-        # Find depth variable
-        depth_var = None
-        for var in ds.data_vars:
-            if 'label' in var.lower() or 'depth' in var.lower() or 'elevation' in var.lower():
-                depth_var = var
-                break
-        if depth_var is None:
-            # Use first variable excluding latitude and longitude
-            available_vars = [v for v in ds.data_vars if v not in ['latitude', 'longitude', 'lat', 'lon']]
-            if available_vars:
-                depth_var = available_vars[0]
-            else:
-                return distances.tolist(), [0.0] * len(distances)
-        
-        # Get depth data
-        depth_data = ds[depth_var].values
-        
-        # Find nearest depth value for each point
-        depths = []
-        for lat, lon in zip(lats, lons):
-            # Find nearest point (Euclidean distance)
-            distances_to_points = np.sqrt((ds_lats - lat)**2 + (ds_lons - lon)**2)
-            nearest_idx = np.argmin(distances_to_points)
-            depth_value = float(depth_data[nearest_idx])
-            depths.append(depth_value)
-        
-        depths = np.array(depths)
-        
-        # Fix NaN values
-        if np.isnan(depths).any():
-            valid_idx = ~np.isnan(depths)
-            if valid_idx.sum() > 1:
-                depths = np.interp(np.arange(len(depths)), np.arange(len(depths))[valid_idx], depths[valid_idx])
-            else:
-                depths = np.nan_to_num(depths, nan=-5.0)
-        
-        # If positive values exist (elevation), make negative (for depth)
-        if np.nanmean(depths) > 0:
-            depths = -depths
-        
-        return distances.tolist(), depths.tolist()
-    except Exception as e:
-        st.error(f"Error extracting profile: {e}")
-        return distances.tolist(), [0.0] * len(distances)
+        group = section_feature_group(sections, current)
+        with timing.stage('st_folium'):
+            return st_folium(base, height=400, use_container_width=True, key=key, returned_objects=['last_clicked'],
+                             feature_group_to_add=group, render=False)
+    finally:
+        for element, children in snapshot:
+            element._children = dict(children)
 
-# ===== INITIALIZE SESSION STATE =====
-if 'sections' not in st.session_state:
-    st.session_state.sections = {
-        'A': {'points': [], 'bathy_dist': [], 'bathy_depth': [], 'user_dist': [], 'user_depth': [], 'completed': False},
-        'B': {'points': [], 'bathy_dist': [], 'bathy_depth': [], 'user_dist': [], 'user_depth': [], 'completed': False},
-        'C': {'points': [], 'bathy_dist': [], 'bathy_depth': [], 'user_dist': [], 'user_depth': [], 'completed': False}
-    }
+def map_elements(element):
+    """An element of a folium map and all its descendants"""
+    yield element
+    for child in list(element._children.values()):
+        yield from map_elements(child)
 
-if 'current_section' not in st.session_state:
-    st.session_state.current_section = 'A'
+# ===== LARGE PROFILE PLOTTING =====
+# Dense (gridded / adaptive) profiles: above WEBGL_POINT_THRESHOLD points a figure is drawn
+# with WebGL traces, each downsampled (LTTB) to PLOT_POINT_BUDGET points over the shown
+# distance range, so zooming in on a range brings back full resolution.
+WEBGL_POINT_THRESHOLD = 2000  # points per figure
+PLOT_POINT_BUDGET = 1000  # points per trace, about one per pixel column of a chart
 
-if 'coord_version' not in st.session_state:
-    st.session_state.coord_version = 0
+def plot_settings(n_points, x_range=None):
+    """Plot settings of a figure: (use WebGL, shown distance range or None)"""
+    webgl = bool(st.session_state.get('large_profile_plots', True)) and n_points > WEBGL_POINT_THRESHOLD
+    return (webgl, tuple(x_range) if x_range else None)
 
-# New shoreline coordinates (constants)
-NEW_SHORELINE_P1 = {'lat': 41.1775, 'lon': 29.6244}  # 41°10'39"N 29°37'28"E
-NEW_SHORELINE_P2 = {'lat': 41.1747, 'lon': 29.6286}  # 41°10'29"N 29°37'43"E
+def profile_trace(plot, x, y, **kwargs):
+    """Scatter trace; with WebGL settings a Scattergl line, clipped to the shown range and downsampled"""
+    webgl, x_range = plot
+    if not webgl:
+        return go.Scatter(x=x, y=y, **kwargs)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if x_range is not None and len(x) > 2:
+        inside = (x >= x_range[0]) & (x <= x_range[1])
+        # One point beyond each end, so lines run to the edges of the range
+        keep = inside.copy()
+        keep[1:] |= inside[:-1]
+        keep[:-1] |= inside[1:]
+        x, y = x[keep], y[keep]
+    x, y = downsample.lttb(x, y, PLOT_POINT_BUDGET)
+    if kwargs.get('mode') == 'lines+markers':
+        kwargs['mode'] = 'lines'
+    return go.Scattergl(x=x, y=y, **kwargs)
 
-# Sill depth constant (meters)
-SILL_DEPTH_TARGET = 2.5  # Target depth for sill location
+def zoom_range_control(key, x_min, x_max):
+    """Distance range slider for large profiles: returns the range, or None for the full profile"""
+    x_min, x_max = float(x_min), float(x_max)
+    shown = st.slider("Zoom (distance range, m)", min_value=x_min, max_value=x_max, value=(x_min, x_max), key=key,
+                      help=f"Long profiles are drawn with at most {PLOT_POINT_BUDGET} points per line; "
+                           "narrow the range to see every sample")
+    return None if shown == (x_min, x_max) else shown
 
-def render_profile_section():
-    # Ensure session state is initialized
-    if 'sections' not in st.session_state:
-        st.session_state.sections = {
-            'A': {'points': [], 'bathy_dist': [], 'bathy_depth': [], 'user_dist': [], 'user_depth': [], 'completed': False},
-            'B': {'points': [], 'bathy_dist': [], 'bathy_depth': [], 'user_dist': [], 'user_depth': [], 'completed': False},
-            'C': {'points': [], 'bathy_dist': [], 'bathy_depth': [], 'user_dist': [], 'user_depth': [], 'completed': False}
-        }
+def show_figure(fig):
+    """st.plotly_chart, timed (serializing dense figures is a large part of a rerun)"""
+    with timing.stage('plotly_chart'):
+        st.plotly_chart(fig)
+
+@timing.timed('figure:profile')
+def profile_figure(section, plot=(False, None)):
+    """Extracted bathymetry profile of a section"""
+    fig = go.Figure()
+    fig.add_trace(profile_trace(plot, x=section.raw_dist, y=section.raw_depth, mode='lines+markers', name='Bathymetry', line=dict(color='#0077B6', width=2)))
+    fig.update_layout(xaxis_title="Distance (m)", yaxis_title="Depth (m)", height=350, xaxis_range=plot[1])
+    return fig
+
+@timing.timed('figure:comparison')
+def comparison_figure(section, plot=(False, None)):
+    """Bathymetry and design profile of a section, with its sill"""
+    fig = go.Figure()
+    fig.add_trace(profile_trace(plot, x=section.bathy_dist, y=section.bathy_depth, mode='lines+markers', name='Bathymetry', line=dict(color='#0077B6', width=2)))
+    fig.add_trace(profile_trace(plot, x=section.user_dist, y=section.user_depth, mode='lines+markers', name='Design', line=dict(color='#FF6B6B', width=2, dash='dash')))
     
-    if 'current_section' not in st.session_state:
-        st.session_state.current_section = 'A'
+    # Mark sill location (parabola end point)
+    if section.sill_distance is not None and section.sill_depth is not None:
+        # Sill marker (green diamond)
+        fig.add_trace(profile_trace(
+            plot,
+            x=[section.sill_distance], 
+            y=[section.sill_depth], 
+            mode='markers',
+            name='Sill Location',
+            marker=dict(
+                symbol='diamond',
+                size=15,
+                color='#00FF00',
+                line=dict(color='#006600', width=2)
+            ),
+            hovertemplate='Sill Location<br>Distance: %{x:.1f} m<br>Depth: %{y:.2f} m<extra></extra>'
+        ))
     
-    if 'coord_version' not in st.session_state:
-        st.session_state.coord_version = 0
+        # Vertical line downward from sill (green)
+        min_depth = min(section.bathy_depth.min(), section.user_depth.min())
+        fig.add_shape(
+            type="line",
+            x0=section.sill_distance,
+            y0=section.sill_depth,
+            x1=section.sill_distance,
+            y1=min_depth - 1,  # Extend slightly downward
+            line=dict(color='#00FF00', width=2, dash='dash')
+        )
     
-    bathymetry_ds = load_bathymetry()
+    fig.update_layout(xaxis_title="Distance (m)", yaxis_title="Depth (m)", height=400, legend=dict(x=1.02, y=1, xanchor='left'),
+                      xaxis_range=plot[1])
+    return fig
 
-    st.markdown("---")
+@timing.timed('figure:erosion')
+def erosion_figure(section, erosion_result, plot=(False, None)):
+    """Design profile of a section before and after erosion"""
+    eroded_dists = erosion_result.eroded_dist
+    eroded_depths = erosion_result.eroded_depth
+    YEARS = erosion_result.years
+    x_shore_old = erosion_result.x_shore_old
+    x_shore_new = erosion_result.x_shore_new
+    x_sill = section.sill_distance
+    y_sill = section.sill_depth
+    
+    # Create erosion comparison plot
+    fig_erosion = go.Figure()
+    
+    # Original bathymetry
+    fig_erosion.add_trace(profile_trace(
+        plot,
+        x=section.bathy_dist, 
+        y=section.bathy_depth, 
+        mode='lines', 
+        name='Original Bathymetry',
+        line=dict(color='#0077B6', width=2)
+    ))
+    
+    # Original design profile
+    fig_erosion.add_trace(profile_trace(
+        plot,
+        x=section.user_dist, 
+        y=section.user_depth, 
+        mode='lines', 
+        name='Original Design',
+        line=dict(color='#FF6B6B', width=2, dash='dash')
+    ))
+    
+    # Eroded design profile
+    fig_erosion.add_trace(profile_trace(
+        plot,
+        x=eroded_dists, 
+        y=eroded_depths, 
+        mode='lines', 
+        name=f'After {YEARS}yr Erosion',
+        line=dict(color='#FFA500', width=3, dash='dot')
+    ))
+    
+    # Mark sill location (same for both)
+    fig_erosion.add_trace(profile_trace(
+        plot,
+        x=[x_sill], 
+        y=[y_sill], 
+        mode='markers',
+        name='Sill Location',
+        marker=dict(
+            symbol='diamond',
+            size=12,
+            color='green',
+            line=dict(color='#000000', width=1.5)
+        ),
+        hovertemplate='Sill<br>Distance: %{x:.1f} m<br>Depth: %{y:.2f} m<extra></extra>'
+    ))
+    
+    # Vertical line at sill
+    min_depth = min(section.bathy_depth.min(), eroded_depths.min())
+    fig_erosion.add_shape(
+        type="line",
+        x0=x_sill,
+        y0=y_sill,
+        x1=x_sill,
+        y1=min_depth - 1,
+        line=dict(color='green', width=2, dash='dash')
+    )
+    
+    # Add vertical line at original shoreline
+    fig_erosion.add_shape(
+        type="line",
+        x0=x_shore_old,
+        y0=0,
+        x1=x_shore_old,
+        y1=min_depth - 1,
+        line=dict(color='red', width=1, dash='dot')
+    )
+    
+    # Add vertical line at eroded shoreline
+    fig_erosion.add_shape(
+        type="line",
+        x0=x_shore_new,
+        y0=0,
+        x1=x_shore_new,
+        y1=min_depth - 1,
+        line=dict(color='orange', width=1, dash='dot')
+    )
+    
+    fig_erosion.update_layout(
+        xaxis_title="Distance (m)", 
+        yaxis_title="Depth (m)", 
+        height=450,
+        legend=dict(x=1.02, y=1, xanchor='left'),
+        xaxis_range=plot[1]
+    )
+    
+    return fig_erosion
+
+@timing.timed('figure:combined')
+def combined_figure(sections, page_start, page_end, plot=(False, None)):
+    """Bathymetry and design profiles of the completed sections on a results page"""
+    fig_combined = go.Figure()
+    
+    for index in range(page_start, page_end):
+        sec_data = sections[index]
+        sec_name = sec_data.name
+        color = SECTION_COLORS[index % len(SECTION_COLORS)]
+        sill_color = SILL_COLORS[index % len(SILL_COLORS)]
+        if sec_data.completed:
+            fig_combined.add_trace(profile_trace(
+                plot,
+                x=sec_data.bathy_dist, 
+                y=sec_data.bathy_depth, 
+                mode='lines', 
+                name=f'{sec_name} Bathymetry',
+                line=dict(color=color, width=2)
+            ))
+            fig_combined.add_trace(profile_trace(
+                plot,
+                x=sec_data.user_dist, 
+                y=sec_data.user_depth, 
+                mode='lines', 
+                name=f'{sec_name} Design',
+                line=dict(color=color, width=2, dash='dash')
+            ))
+    
+            # Add sill location marker
+            if sec_data.sill_distance is not None and sec_data.sill_depth is not None:
+                fig_combined.add_trace(profile_trace(
+                    plot,
+                    x=[sec_data.sill_distance], 
+                    y=[sec_data.sill_depth], 
+                    mode='markers',
+                    name=f'{sec_name} Sill',
+                    marker=dict(
+                        symbol='diamond',
+                        size=12,
+                        color=sill_color,
+                        line=dict(color='#000000', width=1.5)
+                    ),
+                    hovertemplate=f'{sec_name} Sill<br>Distance: %{{x:.1f}} m<br>Depth: %{{y:.2f}} m<extra></extra>'
+                ))
+    
+                # Add vertical line downward from sill
+                min_depth = min(sec_data.bathy_depth.min(), sec_data.user_depth.min())
+                fig_combined.add_shape(
+                    type="line",
+                    x0=sec_data.sill_distance,
+                    y0=sec_data.sill_depth,
+                    x1=sec_data.sill_distance,
+                    y1=min_depth - 1,
+                    line=dict(color=sill_color, width=2, dash='dash')
+                )
+    
+    fig_combined.update_layout(
+        xaxis_title="Distance (m)", 
+        yaxis_title="Depth (m)", 
+        height=500,
+        legend=dict(x=1.02, y=1, xanchor='left'),
+        xaxis_range=plot[1]
+    )
+    return fig_combined
+
+@timing.timed()
+def render_surface_comparison(soundings, sections, params, vol_results):
+    """Between-section volume by the Average End Area Method next to the TIN surface volume"""
+    spacing = st.number_input("TIN Grid Spacing (m)", value=surface.DEFAULT_TIN_SPACING, min_value=0.25, step=0.25,
+                              key="tin_spacing", help="Refinement of the triangulated surfaces; smaller is more accurate and slower")
+    endpoints = [data.endpoints for data in sections]
+    start = time.perf_counter()
+    try:
+        tin = project_cache().compute(
+            'tin', input_hash(endpoints, params, soundings.key, spacing),
+            surface.tin_fill_volume, soundings, endpoints, params, (NEW_SHORELINE_P1, NEW_SHORELINE_P2), spacing
+        )
+    except Exception as e:
+        st.warning(f"TIN volume failed: {e}")
+        return
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    
+    aea_volume = float(vol_results.volumes.sum())
+    col_aea, col_tin, col_diff = st.columns(3)
+    with col_aea:
+        st.metric("Average End Area", f"{aea_volume:,.0f} m³", help="Between-section volume (without the extra volume)")
+    with col_tin:
+        st.metric("TIN Surface", f"{tin.volume:,.0f} m³", help="Prism volumes between the triangulated bathymetry and design surfaces")
+    with col_diff:
+        st.metric("Difference", f"{(tin.volume - aea_volume) / aea_volume:+.1%}" if aea_volume else "—")
+    st.caption(f"{tin.n_triangles:,} triangles over {tin.polygon_area:,.0f} m² (fill on {tin.fill_area:,.0f} m²) in {elapsed_ms:.0f} ms")
+
+def render_cut_fill(cut_fill):
+    """Raster cut and fill over the project footprint, per zone"""
+    col_fill, col_cut, col_net = st.columns(3)
+    with col_fill:
+        st.metric("Fill", f"{cut_fill.fill:,.0f} m³", help="Design surface above the gridded bathymetry")
+    with col_cut:
+        st.metric("Cut", f"{cut_fill.cut:,.0f} m³", help="Gridded bathymetry above the design surface")
+    with col_net:
+        st.metric("Net", f"{cut_fill.net:,.0f} m³")
+    st.dataframe({
+        'Zone': cut_fill.zones,
+        'Fill (m³)': np.round(cut_fill.zone_fill),
+        'Cut (m³)': np.round(cut_fill.zone_cut),
+    }, hide_index=True, use_container_width=True)
+    caption = f"{cut_fill.footprint_area:,.0f} m² footprint in {cut_fill.cell_area:,.1f} m² cells"
+    if cut_fill.no_data_area:
+        caption += f" ({cut_fill.no_data_area:,.0f} m² outside the survey not included)"
+    st.caption(caption)
+
+@timing.timed()
+def render_erosion_scenarios(sections, params):
+    """Yearly remaining fill of all sections and periodic renourishment over a planning horizon"""
+    col_horizon, col_discount, col_trigger = st.columns(3)
+    with col_horizon:
+        horizon = st.slider("Horizon [years]", min_value=5, max_value=100, value=erosion.RENOURISHMENT_HORIZON, key="renourish_horizon")
+    with col_discount:
+        discount_rate = st.number_input("Discount Rate [%]", value=4.0, min_value=0.0, step=0.5, key="renourish_discount") / 100
+    with col_trigger:
+        trigger = st.slider("Renourish Below [% of design fill]", min_value=10, max_value=95, value=50, key="renourish_trigger")
+    
+    cache = project_cache()
+    retreat_rates = [data.retreat_rate for data in sections]
+    start = time.perf_counter()
+    try:
+        simulation = cache.compute(
+            'erosion_simulation', input_hash([data.cache.key('design') for data in sections], retreat_rates, horizon),
+            erosion.simulate_erosion,
+            [data.raw_dist for data in sections], [data.raw_depth for data in sections],
+            [data.fill_distance for data in sections], [data.sill_distance for data in sections],
+            params.sill_depth, retreat_rates, [data.endpoints for data in sections],
+            years=horizon, exponent=params.exponent
+        )
+    except ValueError as e:
+        st.warning(f"⚠️ {e}")
+        return
+    scenarios = cache.compute(
+        'renourishment', input_hash(cache.key('erosion_simulation'), discount_rate),
+        erosion.renourishment_scenarios, simulation, horizon=horizon, discount_rate=discount_rate
+    )
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    interval = erosion.renourishment_interval(simulation, trigger / 100)
+    
+    col_left, col_interval, col_right = st.columns(3)
+    with col_left:
+        st.metric(f"Remaining Fill after {horizon} Years", f"{simulation.volume[-1]:,.0f} m³",
+                  f"{simulation.remaining_fraction[-1] - 1:+.0%}")
+    with col_interval:
+        st.metric("Renourishment Interval", f"{interval} years" if interval else f"> {horizon} years",
+                  help=f"Years until less than {trigger}% of the design fill remains")
+    if interval:
+        i = interval - 1
+        with col_right:
+            st.metric(f"Renourished over {horizon} Years", f"{scenarios.total_volume[i]:,.0f} m³",
+                      help=f"{scenarios.events[i]} renourishments of {scenarios.event_volume[i]:,.0f} m³")
+    
+    fig_remaining = go.Figure()
+    fig_remaining.add_trace(go.Scatter(
+        x=simulation.years, y=simulation.volume, mode='lines', name='Remaining Fill',
+        line=dict(color='#0077B6', width=2),
+        hovertemplate='Year %{x:.0f}<br>Remaining: %{y:,.0f} m³<extra></extra>'
+    ))
+    fig_remaining.add_hline(y=simulation.volume[0] * trigger / 100, line=dict(color='#FF6B6B', dash='dash'),
+                            annotation_text=f"{trigger}% of design fill")
+    fig_remaining.update_layout(xaxis_title="Years", yaxis_title="Remaining Fill Volume (m³)", height=350)
+    show_figure(fig_remaining)
+    
+    retreat = simulation.shoreline[0] - simulation.shoreline[-1]
+    st.dataframe({
+        'Section': [f"{data.name}-{data.name}'" for data in sections],
+        'Retreat Rate (m/yr)': simulation.retreat_rates,
+        f'Shoreline Retreat in {horizon} yr (m)': np.round(retreat, 1),
+        f'Remaining Area after {horizon} yr (m²)': np.round(simulation.areas[-1], 1),
+    }, hide_index=True, use_container_width=True)
+    
+    fig_scenarios = go.Figure()
+    fig_scenarios.add_trace(go.Bar(x=scenarios.intervals, y=scenarios.total_volume, name='Total Renourished',
+                                   marker_color='#90E0EF'))
+    fig_scenarios.add_trace(go.Scatter(x=scenarios.intervals, y=scenarios.discounted_volume, mode='lines+markers',
+                                       name=f'Discounted ({discount_rate:.1%})', line=dict(color='#0077B6')))
+    fig_scenarios.update_layout(xaxis_title="Renourishment Interval (years)", yaxis_title="Fill Volume (m³)", height=350)
+    show_figure(fig_scenarios)
+    st.caption(f"{horizon + 1} years × {len(sections)} sections × {simulation.x.shape[1]} points "
+               f"and {len(scenarios.intervals)} renourishment intervals in {elapsed_ms:.0f} ms")
+
+@timing.timed()
+def grain_size_sweep(soundings, sections, params, d50_values, resolution=cutfill.RASTER_RESOLUTION):
+    """Total fill volume for each grain size: returns (d50 values, A values, totals)"""
+    a_values = design.dean_a_from_d50(d50_values)
+    fill_distances = [data.fill_distance for data in sections]
+    areas = volume.sweep_fill_areas(
+        [data.raw_dist for data in sections], [data.raw_depth for data in sections],
+        fill_distances, a_values, params.sill_depth, params.exponent, params.buffer_distance
+    )
+    endpoints = [data.endpoints for data in sections]
+    # The footprint reaches the sill line, so the fill outside the sections follows A as well
+    outside = cutfill.outside_fill_sweep(soundings, endpoints, a_values, params, (NEW_SHORELINE_P1, NEW_SHORELINE_P2),
+                                         resolution)
+    return d50_values, a_values, volume.sweep_total_volume(areas, endpoints, outside)
+
+def render_grain_size_sweep(soundings, sections, params, current_volume, d50=None):
+    """Total fill volume over a range of grain sizes: the section areas and the raster fill outside them for all A values as arrays"""
+    col_min, col_max, col_steps = st.columns(3)
+    with col_min:
+        d50_min = st.number_input("d₅₀ from [mm]", value=0.15, min_value=0.01, step=0.05, key="sweep_d50_min")
+    with col_max:
+        d50_max = st.number_input("d₅₀ to [mm]", value=0.60, min_value=0.02, step=0.05, key="sweep_d50_max")
+    with col_steps:
+        steps = st.slider("Steps", min_value=5, max_value=200, value=50, key="sweep_steps")
+    if d50_max <= d50_min:
+        st.warning("The upper grain size must be larger than the lower one.")
+        return
+    
+    start = time.perf_counter()
+    d50_values, a_values, totals = project_cache().compute(
+        'grain_size_sweep', input_hash([data.cache.key('profile') for data in sections], d50_min, d50_max, steps,
+                                       params.exponent, params.sill_depth, params.buffer_distance, cutfill.RASTER_RESOLUTION, soundings.key),
+        grain_size_sweep, soundings, sections, params, np.linspace(d50_min, d50_max, steps)
+    )
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    
+    fig_sweep = go.Figure()
+    fig_sweep.add_trace(go.Scatter(
+        x=d50_values, y=totals, mode='lines+markers', name='Total Fill Volume',
+        customdata=a_values, line=dict(color='#0077B6', width=2),
+        hovertemplate='d₅₀: %{x:.3f} mm<br>A: %{customdata:.4f}<br>Volume: %{y:,.0f} m³<extra></extra>'
+    ))
+    fig_sweep.add_hline(y=current_volume, line=dict(color='#FF6B6B', dash='dash'), annotation_text=f"Current (A = {params.a:.4f})")
+    if d50 is not None and d50_min <= d50 <= d50_max:
+        fig_sweep.add_vline(x=d50, line=dict(color='#888888', dash='dot'), annotation_text="d₅₀")
+    fig_sweep.update_layout(xaxis_title="Median Grain Size d₅₀ (mm)", yaxis_title="Total Fill Volume (m³)", height=400)
+    show_figure(fig_sweep)
+    st.caption(f"{steps} grain sizes × {len(sections)} sections in {elapsed_ms:.0f} ms")
+
+@timing.timed()
+def render_profile_section(A_param=None, h_toe=SILL_DEPTH_TARGET, d50=None):
+    """
+    Render the cross-section editor and results.
+    
+    Args:
+        A_param: Profile scale parameter A (None = design default)
+        h_toe: Target sill depth (m)
+        d50: Median grain size (mm), marked on the grain size sweep
+    """
+    # Ensure session state is initialized
+    init_session_state()
+    
+    sections = st.session_state.sections
+    params = design.DesignParams(sill_depth=h_toe)
+    if A_param:
+        params.a = A_param
+    
+    soundings = load_bathymetry([data.endpoints for data in sections if len(data.points) == 2])
     
     current = st.session_state.current_section
+    if current != 'ALL' and not 0 <= current < len(sections):
+        current = st.session_state.current_section = 0
+    
+    # Sampling settings (kept across reruns that do not show their widgets)
+    sampling_mode, grid_resolution, num_points = sampling_settings()
+    if current != 'ALL' and len(sections[current].points) == 2:
+        # The sampling widgets are shown on this rerun: re-extract the shown section when
+        # the settings changed since it was sampled
+        sections[current].sampling = section_sampling(None, sampling_mode, grid_resolution, num_points)
+    
+    # Only stale nodes are recomputed: profiles whose points or sampling changed (adaptive
+    # ones also with the design), then designs whose profile or parameters changed
+    project_cache().begin_run()
+    for data in sections:
+        data.cache.begin_run()
+    extracting = extract_pending_sections(soundings, sections, sampling_mode, grid_resolution, params, num_points)
+    design_pending_sections(sections, params)
+    if extracting:
+        job_progress('profiles', f"Extracting {len(extracting)} profile{'s' if len(extracting) > 1 else ''}")
+
+    st.markdown("---")
     
     st.markdown("### Section Navigation")
-    col_a, col_b, col_c, col_all = st.columns(4)
+    st.toggle("Large-profile plotting", value=True, key="large_profile_plots",
+              help=f"Charts with more than {WEBGL_POINT_THRESHOLD:,} points use WebGL and draw each line with at most "
+                   f"{PLOT_POINT_BUDGET:,} shape-preserving (LTTB) points")
+    col_prev, col_select, col_next, col_add, col_all = st.columns([1, 3, 1, 2, 2])
     
-    with col_a:
-        label = "[Done] A-A'" if st.session_state.sections['A']['completed'] else "A-A'"
-        if st.button(label, key="nav_a", use_container_width=True, type="primary" if current == 'A' else "secondary"):
-            st.session_state.current_section = 'A'
+    with col_prev:
+        if st.button("<", key="nav_prev", use_container_width=True, disabled=current == 'ALL' or current == 0):
+            st.session_state.current_section = current - 1
+            st.rerun()
+    
+    with col_select:
+        labels = [f"[Done] {sec.name}-{sec.name}'" if sec.completed else f"{sec.name}-{sec.name}'"
+                  for sec in sections]
+        choice = st.selectbox(
+            "Section", range(len(sections)), index=None if current == 'ALL' else current,
+            format_func=labels.__getitem__, placeholder="Jump to section...",
+            label_visibility="collapsed", key=f"nav_select_{current}_{len(sections)}"
+        )
+        if choice is not None and choice != current:
+            st.session_state.current_section = choice
             st.rerun()
     
-    with col_b:
-        label = "[Done] B-B'" if st.session_state.sections['B']['completed'] else "B-B'"
-        if st.button(label, key="nav_b", use_container_width=True, type="primary" if current == 'B' else "secondary"):
-            st.session_state.current_section = 'B'
+    with col_next:
+        if st.button(">", key="nav_next", use_container_width=True, disabled=current == 'ALL' or current >= len(sections) - 1):
+            st.session_state.current_section = current + 1
             st.rerun()
     
-    with col_c:
-        label = "[Done] C-C'" if st.session_state.sections['C']['completed'] else "C-C'"
-        if st.button(label, key="nav_c", use_container_width=True, type="primary" if current == 'C' else "secondary"):
-            st.session_state.current_section = 'C'
+    with col_add:
+        if st.button("+ Add Section", key="nav_add", use_container_width=True):
+            sections.append(Section(next_section_name(sections)))
+            st.session_state.current_section = len(sections) - 1
+            st.session_state.coord_version += 1
             st.rerun()
     
     with col_all:
-        completed_count = sum(1 for s in st.session_state.sections.values() if s['completed'])
-        if st.button(f"All Results ({completed_count}/3)", key="nav_all", use_container_width=True, type="primary" if current == 'ALL' else "secondary"):
+        completed_count = sum(1 for s in sections if s.completed)
+        if st.button(f"All Results ({completed_count}/{len(sections)})", key="nav_all", use_container_width=True, type="primary" if current == 'ALL' else "secondary"):
             st.session_state.current_section = 'ALL'
             st.rerun()
     
@@ -214,11 +984,18 @@ def render_profile_section():
         st.info("Viewing: **All Results Summary**")
         st.markdown("---")
         
-        completed_sections = [name for name, data in st.session_state.sections.items() if data['completed']]
+        completed_sections = [sec for sec in sections if sec.completed]
         
         if not completed_sections:
             st.warning("No sections completed yet. Please complete at least one section to view results.")
         else:
+            # Sections shown in the detail table and combined view, one page at a time
+            n_pages = max(1, -(-len(sections) // RESULTS_PAGE_SIZE))
+            page = st.number_input("Page", min_value=1, max_value=n_pages, value=1, step=1, key="results_page")
+            page_start = (page - 1) * RESULTS_PAGE_SIZE
+            page_end = min(page_start + RESULTS_PAGE_SIZE, len(sections))
+            st.caption(f"Showing sections {page_start + 1}–{page_end} of {len(sections)}")
+            
             # ===== VOLUME CALCULATION SUMMARY =====
             st.markdown("## 📊 Volume Calculation Summary")
             
@@ -226,44 +1003,43 @@ def render_profile_section():
             
             if error:
                 st.warning(f"Volume calculation failed: {error}")
+            elif vol_results is None:
+                job_progress('cut_fill', "Calculating the raster cut / fill")
             else:
                 # Main metrics
-                col_total, col_ab, col_bc = st.columns(3)
+                col_total, col_regions, col_length = st.columns(3)
                 
                 with col_total:
                     st.metric(
                         "🏗️ Total Fill Volume", 
-                        f"{vol_results['total']:,.0f} m³",
-                        help="Total volume including all regions (extra areas included in calculation)"
+                        f"{vol_results.total:,.0f} m³",
+                        help=f"Between-section volume plus {vol_results.extra:,.0f} m³ of raster fill outside the sections"
                     )
                 
-                with col_ab:
+                with col_regions:
                     st.metric(
-                        "A-B Region Volume", 
-                        f"{vol_results['volumes']['A-B']:,.0f} m³"
+                        "Between-Section Volume", 
+                        f"{vol_results.volumes.sum():,.0f} m³",
+                        help=f"{len(vol_results.volumes)} regions between consecutive sections"
                     )
                 
-                with col_bc:
+                with col_length:
                     st.metric(
-                        "B-C Region Volume", 
-                        f"{vol_results['volumes']['B-C']:,.0f} m³"
+                        "Covered Length", 
+                        f"{vol_results.distances.sum():,.0f} m"
                     )
                 
-                # Detail table
+                # Detail table (current page)
                 st.markdown("#### Section Details")
                 
-                detail_cols = st.columns(3)
-                for i, sec_name in enumerate(['A', 'B', 'C']):
-                    with detail_cols[i]:
-                        st.markdown(f"**Section {sec_name}-{sec_name}'**")
-                        st.write(f"Fill Area: **{vol_results['areas'][sec_name]:,.1f} m²**")
-                
-                st.markdown("#### Inter-Section Distances")
-                dist_col1, dist_col2 = st.columns(2)
-                with dist_col1:
-                    st.write(f"A ↔ B Distance: **{vol_results['distances']['A-B']:,.1f} m**")
-                with dist_col2:
-                    st.write(f"B ↔ C Distance: **{vol_results['distances']['B-C']:,.1f} m**")
+                n_regions = len(vol_results.volumes)
+                st.dataframe({
+                    'Section': [f"{name}-{name}'" for name in vol_results.names[page_start:page_end]],
+                    'Fill Area (m²)': np.round(vol_results.areas[page_start:page_end], 1),
+                    'Region': [vol_results.regions[i] if i < n_regions else '—' for i in range(page_start, page_end)],
+                    'Distance to Next (m)': [round(float(vol_results.distances[i]), 1) if i < n_regions else None for i in range(page_start, page_end)],
+                    'Region Volume (m³)': [round(float(vol_results.volumes[i])) if i < n_regions else None for i in range(page_start, page_end)],
+                }, hide_index=True, use_container_width=True)
                 
                 st.markdown("---")
                 
@@ -281,471 +1057,214 @@ def render_profile_section():
                     - **V**: Volume (m³)
                     
                     *Note: This method provides reasonable results even when sections are not parallel.*
+                    
+                    The fill outside the sections (between the shoreline ends and the outer
+                    sections) is added from the raster cut/fill below.
                     """)
+                
+                with st.expander("🗺️ Raster Cut / Fill"):
+                    render_cut_fill(vol_results.cut_fill)
+                
+                with st.expander("🧮 Surface (TIN) Volume"):
+                    render_surface_comparison(soundings, sections, params, vol_results)
+                
+                with st.expander("🌊 Erosion & Renourishment"):
+                    render_erosion_scenarios(sections, params)
+                
+                with st.expander("🔬 Grain Size Sweep"):
+                    render_grain_size_sweep(soundings, sections, params, vol_results.total, d50)
             
             st.markdown("---")
             
             st.markdown("## Combined View - All Sections")
             
-            fig_combined = go.Figure()
-            colors = {'A': '#2563EB', 'B': '#DC2626', 'C': '#FACC15'}
-            sill_colors = {'A': '#006400', 'B': '#00FF00', 'C': '#90EE90'}  # Dark green, normal green, light green
-            
-            for sec_name in ['A', 'B', 'C']:
-                sec_data = st.session_state.sections[sec_name]
-                if sec_data['completed']:
-                    fig_combined.add_trace(go.Scatter(
-                        x=sec_data['bathy_dist'], 
-                        y=sec_data['bathy_depth'], 
-                        mode='lines', 
-                        name=f'{sec_name} Bathymetry',
-                        line=dict(color=colors[sec_name], width=2)
-                    ))
-                    fig_combined.add_trace(go.Scatter(
-                        x=sec_data['user_dist'], 
-                        y=sec_data['user_depth'], 
-                        mode='lines', 
-                        name=f'{sec_name} Design',
-                        line=dict(color=colors[sec_name], width=2, dash='dash')
-                    ))
-                    
-                    # Add sill location marker
-                    if sec_data.get('sill_distance') is not None and sec_data.get('sill_depth') is not None:
-                        fig_combined.add_trace(go.Scatter(
-                            x=[sec_data['sill_distance']], 
-                            y=[sec_data['sill_depth']], 
-                            mode='markers',
-                            name=f'{sec_name} Sill',
-                            marker=dict(
-                                symbol='diamond',
-                                size=12,
-                                color=sill_colors[sec_name],
-                                line=dict(color='#000000', width=1.5)
-                            ),
-                            hovertemplate=f'{sec_name} Sill<br>Distance: %{{x:.1f}} m<br>Depth: %{{y:.2f}} m<extra></extra>'
-                        ))
-                        
-                        # Add vertical line downward from sill
-                        min_depth = min(min(sec_data['bathy_depth']), min(sec_data['user_depth']))
-                        fig_combined.add_shape(
-                            type="line",
-                            x0=sec_data['sill_distance'],
-                            y0=sec_data['sill_depth'],
-                            x1=sec_data['sill_distance'],
-                            y1=min_depth - 1,
-                            line=dict(color=sill_colors[sec_name], width=2, dash='dash')
-                        )
-            
-            fig_combined.update_layout(
-                xaxis_title="Distance (m)", 
-                yaxis_title="Depth (m)", 
-                height=500,
-                legend=dict(x=1.02, y=1, xanchor='left')
+            page_sections = [data for data in sections[page_start:page_end] if data.completed]
+            page_key = input_hash([(index, data.name, data.cache.key('design'))
+                                   for index, data in enumerate(sections[page_start:page_end], start=page_start)])
+            n_points = sum(len(data.bathy_dist) + len(data.user_dist) for data in page_sections)
+            x_range = None
+            if st.session_state.get('large_profile_plots', True) and n_points > WEBGL_POINT_THRESHOLD:
+                x_range = zoom_range_control(f"zoom_combined_{page_key[:8]}", 0.0, max(data.bathy_dist[-1] for data in page_sections))
+            plot = plot_settings(n_points, x_range)
+            fig_combined = project_cache().compute(
+                'combined_figure', input_hash(page_key, plot), combined_figure, sections, page_start, page_end, plot
             )
-            st.plotly_chart(fig_combined)
+            show_figure(fig_combined)
+            
+            recomputed = recomputed_nodes(sections)
+            st.caption(f"Recomputed in this run: {', '.join(map(str, recomputed[:12]))}"
+                       + (f" (+{len(recomputed) - 12} more)" if len(recomputed) > 12 else "")
+                       if recomputed else "All results reused (no inputs changed)")
     
     # ===== SECTION EDITING VIEW =====
     else:
-        section = st.session_state.sections[current]
+        section = sections[current]
+        name = section.name
         
-        st.info(f"Working on: **Section {current}-{current}'**")
+        st.info(f"Working on: **Section {name}-{name}'** ({current + 1} of {len(sections)})")
         st.markdown("---")
 
-        st.markdown(f"### Step 1: Select Points for Section {current}-{current}'")
-
-        m = folium.Map(location=[41.175354, 29.626743], zoom_start=15)
-        folium.TileLayer(
-            tiles='https://server.arcgisonline.com/ArcGIS/rest/services/World_Imagery/MapServer/tile/{z}/{y}/{x}',
-            attr='Esri',
-            name='Satellite',
-            overlay=False,
-            control=True
-        ).add_to(m)
-        map_colors = {'A': 'blue', 'B': 'green', 'C': 'orange'}
-
-        # Add new shoreline to map
-        new_shoreline_coords = [[NEW_SHORELINE_P1['lat'], NEW_SHORELINE_P1['lon']], 
-                                [NEW_SHORELINE_P2['lat'], NEW_SHORELINE_P2['lon']]]
-        
-        folium.PolyLine(new_shoreline_coords, color='green', weight=3, opacity=0.8,
-                       popup='New Shoreline (Fill Start)').add_to(m)
-        
-        # Add markers to shoreline start and end points
-        folium.Marker(new_shoreline_coords[0], popup='New Shoreline Start',
-                     icon=folium.Icon(color='green', icon='info-sign')).add_to(m)
-        folium.Marker(new_shoreline_coords[1], popup='New Shoreline End',
-                     icon=folium.Icon(color='green', icon='info-sign')).add_to(m)
-
-        for sec_name, sec_data in st.session_state.sections.items():
-            if sec_data['points']:
-                color = map_colors.get(sec_name, 'gray')
-                for idx, pt in enumerate(sec_data['points']):
-                    folium.Marker(
-                        [pt['lat'], pt['lon']],
-                        popup=f"{sec_name if idx==0 else sec_name}'",
-                        icon=folium.Icon(color=color if sec_name == current else 'gray')
-                    ).add_to(m)
-                if len(sec_data['points']) == 2:
-                    folium.PolyLine(
-                        [[p['lat'], p['lon']] for p in sec_data['points']],
-                        color=color if sec_name == current else 'gray',
-                        weight=3 if sec_name == current else 2,
-                        opacity=1.0 if sec_name == current else 0.5
-                    ).add_to(m)
-
-        m.add_child(folium.LatLngPopup())
-        map_data = st_folium(m, height=400, use_container_width=True, key=f"map_{current}")
+        st.markdown(f"### Step 1: Select Points for Section {name}-{name}'")
+
+        map_data = section_map(sections, current, f"map_{name}")
+        tiles = bathymetry_tiles()
+        if tiles:
+            low, high = tiles['depth_range']
+            st.caption(f"Bathymetry overlay: depth {low:.1f}–{high:.1f} m (light: shallow, dark: deep), "
+                       f"contours every {tiles['contour_interval']:g} m. Toggle the layers with the map's layer control.")
+        elif 'tiles' in session_jobs():
+            job_progress('tiles', "Rendering the bathymetry map tiles")
 
         if map_data and map_data.get('last_clicked'):
             lat = map_data['last_clicked']['lat']
             lon = map_data['last_clicked']['lng']
             
-            if len(section['points']) < 2:
+            if len(section.points) < 2:
                 new_point = True
-                if section['points']:
-                    last = section['points'][-1]
+                if section.points:
+                    last = section.points[-1]
                     if abs(last['lat'] - lat) < 0.0001 and abs(last['lon'] - lon) < 0.0001:
                         new_point = False
                 
                 if new_point:
-                    section['points'].append({'lat': lat, 'lon': lon})
+                    section.points.append({'lat': lat, 'lon': lon})
                     st.session_state.coord_version += 1
                     st.rerun()
 
         st.markdown("#### Manual Coordinates")
 
         v = st.session_state.coord_version
-        default_lat1 = section['points'][0]['lat'] if section['points'] else 41.175354
-        default_lon1 = section['points'][0]['lon'] if section['points'] else 29.626743
-        default_lat2 = section['points'][1]['lat'] if len(section['points']) > 1 else 41.175000
-        default_lon2 = section['points'][1]['lon'] if len(section['points']) > 1 else 29.627000
+        default_lat1 = section.points[0]['lat'] if section.points else 41.175354
+        default_lon1 = section.points[0]['lon'] if section.points else 29.626743
+        default_lat2 = section.points[1]['lat'] if len(section.points) > 1 else 41.175000
+        default_lon2 = section.points[1]['lon'] if len(section.points) > 1 else 29.627000
 
         col1, col2 = st.columns(2)
 
         with col1:
-            st.markdown(f"**Point {current}**")
-            lat1 = st.number_input("Latitude", value=default_lat1, format="%.6f", key=f"lat1_{current}_{v}")
-            lon1 = st.number_input("Longitude", value=default_lon1, format="%.6f", key=f"lon1_{current}_{v}")
+            st.markdown(f"**Point {name}**")
+            lat1 = st.number_input("Latitude", value=default_lat1, format="%.6f", key=f"lat1_{name}_{v}")
+            lon1 = st.number_input("Longitude", value=default_lon1, format="%.6f", key=f"lon1_{name}_{v}")
 
         with col2:
-            st.markdown(f"**Point {current}'**")
-            lat2 = st.number_input("Latitude ", value=default_lat2, format="%.6f", key=f"lat2_{current}_{v}")
-            lon2 = st.number_input("Longitude ", value=default_lon2, format="%.6f", key=f"lon2_{current}_{v}")
+            st.markdown(f"**Point {name}'**")
+            lat2 = st.number_input("Latitude ", value=default_lat2, format="%.6f", key=f"lat2_{name}_{v}")
+            lon2 = st.number_input("Longitude ", value=default_lon2, format="%.6f", key=f"lon2_{name}_{v}")
 
-        col_apply, col_reset = st.columns(2)
+        col_apply, col_reset, col_remove = st.columns(3)
         with col_apply:
-            if st.button("Apply Coordinates", key=f"apply_{current}", use_container_width=True):
-                section['points'] = [{'lat': lat1, 'lon': lon1}, {'lat': lat2, 'lon': lon2}]
+            if st.button("Apply Coordinates", key=f"apply_{name}", use_container_width=True):
+                section.points = [{'lat': lat1, 'lon': lon1}, {'lat': lat2, 'lon': lon2}]
                 st.rerun()
         with col_reset:
-            if st.button("Reset Points", key=f"reset_{current}", use_container_width=True):
-                section['points'] = []
-                section['completed'] = False
-                section['bathy_dist'] = []
-                section['bathy_depth'] = []
-                section['user_dist'] = []
-                section['user_depth'] = []
+            if st.button("Reset Points", key=f"reset_{name}", use_container_width=True):
+                section.points = []
+                section.clear_profile()
+                st.session_state.coord_version += 1
+                st.rerun()
+        with col_remove:
+            if st.button("Remove Section", key=f"remove_{name}", use_container_width=True, disabled=len(sections) == 1):
+                sections.pop(current)
+                st.session_state.current_section = max(0, current - 1)
                 st.session_state.coord_version += 1
                 st.rerun()
 
-        if len(section['points']) == 2:
+        if len(section.points) == 2:
             st.success("Both points selected!")
         else:
             st.warning("Select 2 points on the map or enter manually")
 
         st.markdown("---")
 
-        if len(section['points']) == 2:
+        if len(section.points) == 2:
             st.markdown(f"### Step 2: Bathymetry Profile")
-            
-            if not section['bathy_dist']:
-                dist, depth = extract_depth_profile(bathymetry_ds, section['points'][0], section['points'][1])
-                if dist and depth:
-                    section['bathy_dist'] = dist
-                    section['bathy_depth'] = depth
-            
-            if section['bathy_dist']:
-                fig = go.Figure()
-                fig.add_trace(go.Scatter(x=section['bathy_dist'], y=section['bathy_depth'], mode='lines+markers', name='Bathymetry', line=dict(color='#0077B6', width=2)))
-                fig.update_layout(xaxis_title="Distance (m)", yaxis_title="Depth (m)", height=350)
-                st.plotly_chart(fig)
-                
-                st.metric("Total Distance", f"{section['bathy_dist'][-1]:.1f} m")
+
+            # Widget state is dropped on reruns without the widgets: restore it from the settings
+            for key, value in st.session_state.sampling_settings.items():
+                if key not in st.session_state:
+                    st.session_state[key] = value
+            col_mode, col_res, col_points = st.columns([2, 1, 1])
+            with col_mode:
+                sampling_mode = st.radio(
+                    "Sampling Mode", list(SAMPLING_MODES), format_func=SAMPLING_MODES.get,
+                    horizontal=True, key="sampling_mode", on_change=store_sampling_setting, args=("sampling_mode",),
+                    help="Bilinear mode reads a pre-built grid of the soundings (cached on disk). "
+                         "Adaptive mode spaces samples by the sounding density and refines where the fill height changes."
+                )
+            with col_res:
+                grid_resolution = st.number_input(
+                    "Grid Resolution (m)", min_value=0.5, step=0.5, key="grid_resolution",
+                    on_change=store_sampling_setting, args=("grid_resolution",), disabled=sampling_mode != 'bilinear'
+                )
+            with col_points:
+                num_points = st.number_input(
+                    "Samples per Section", min_value=10, max_value=100_000, step=100, key="profile_points",
+                    on_change=store_sampling_setting, args=("profile_points",), disabled=sampling_mode == 'adaptive',
+                    help="Evenly spaced samples along the section (dense profiles are plotted downsampled)"
+                )
+
+            if section in extracting:
+                st.caption("Extracting the profile of this section in the background…")
+            elif section.has_profile:
+                cache = section.cache
+                x_range = None
+                if st.session_state.get('large_profile_plots', True) and len(section.raw_dist) > PLOT_POINT_BUDGET:
+                    x_range = zoom_range_control(f"zoom_{name}_{cache.key('profile')[:8]}", section.raw_dist[0], section.raw_dist[-1])
+                plot = plot_settings(len(section.raw_dist), x_range)
+                fig = cache.compute('profile_figure', input_hash(cache.key('profile'), plot), profile_figure, section, plot)
+                show_figure(fig)
                 
-                # Create automatic design profile
-                # Parabola: y = 0.11 * x^0.67
-                # Sill location: where depth reaches 2.5 meters
-                if not section['user_dist']:
-                    # Find intersection point with new shoreline
-                    section_p1 = section['points'][0]
-                    section_p2 = section['points'][1]
-                    intersection_start = find_line_intersection(section_p1, section_p2, NEW_SHORELINE_P1, NEW_SHORELINE_P2)
-                    
-                    # Create design profile from bathymetry profile
-                    bathy_dist_array = np.array(section['bathy_dist'])
-                    
-                    # Calculate fill start distance (new shoreline intersection)
-                    fill_distance = calculate_distance(section_p1, intersection_start) if intersection_start else 0.0
-                    
-                    # Calculate sill distance: where parabola reaches SILL_DEPTH_TARGET (2.5m)
-                    # Formula: y = 0.11 * x^0.67, solve for x when y = 2.5
-                    # x = (y / 0.11)^(1/0.67)
-                    relative_x_sill = (SILL_DEPTH_TARGET / 0.11) ** (1 / 0.67)
-                    sill_distance = fill_distance + relative_x_sill
-                    sill_depth = -SILL_DEPTH_TARGET
-                    
-                    # Store sill and fill locations
-                    section['fill_distance'] = fill_distance  # Store original shoreline position
-                    section['sill_distance'] = sill_distance
-                    section['sill_depth'] = sill_depth
-                    
-                    # Trim bathymetry profile to sill + buffer distance
-                    buffer_distance = 10  # Show 10 meters after sill
-                    max_distance = sill_distance + buffer_distance
-                    
-                    bathy_dist_trimmed = []
-                    bathy_depth_trimmed = []
-                    for i, x in enumerate(section['bathy_dist']):
-                        if x <= max_distance:
-                            bathy_dist_trimmed.append(x)
-                            bathy_depth_trimmed.append(section['bathy_depth'][i])
-                    
-                    # Ensure bathymetry has a point at sill location
-                    if bathy_dist_trimmed and bathy_dist_trimmed[-1] < sill_distance:
-                        # Interpolate bathymetry depth at sill location
-                        sill_bathy_depth = np.interp(sill_distance, section['bathy_dist'], section['bathy_depth'])
-                        bathy_dist_trimmed.append(sill_distance)
-                        bathy_depth_trimmed.append(float(sill_bathy_depth))
-                    
-                    section['bathy_dist'] = bathy_dist_trimmed
-                    section['bathy_depth'] = bathy_depth_trimmed
-                    
-                    # Calculate depth for each distance point using formula (only up to sill)
-                    # Use trimmed bathymetry distances as reference
-                    design_depths = []
-                    design_dists = []
-                    for x in bathy_dist_trimmed:
-                        if x <= sill_distance:
-                            design_dists.append(x)
-                            if x <= fill_distance:
-                                # Fill area: 0 depth
-                                design_depths.append(0.0)
-                            else:
-                                # Parabola region
-                                relative_x = x - fill_distance
-                                if relative_x > 0:
-                                    y = 0.11 * (relative_x ** 0.67)
-                                    design_depths.append(-abs(y))
-                                else:
-                                    design_depths.append(0.0)
-                    
-                    # Ensure design profile ends exactly at sill point
-                    if len(design_dists) == 0 or abs(design_dists[-1] - sill_distance) > 0.01:
-                        design_dists.append(sill_distance)
-                        design_depths.append(sill_depth)
-                    
-                    section['user_dist'] = design_dists
-                    section['user_depth'] = design_depths
-                    section['completed'] = True
+                st.metric("Total Distance", f"{section.raw_dist[-1]:.1f} m")
+                if section.sampling_info:
+                    info = section.sampling_info
+                    st.caption(f"Adaptive sampling: {len(section.raw_dist)} samples, sounding spacing ≈ {info['spacing']:.1f} m, "
+                               f"fill area error estimate ± {info['error_estimate']:.2f} m²")
+                else:
+                    cache_stats = bathymetry.PROFILE_CACHE.stats()
+                    st.caption(f"Profile cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses, "
+                               f"{cache_stats['entries']} profiles ({cache_stats['nbytes'] / 1024:.0f} KB)")
                 
                 st.markdown("---")
                 
-                if section['completed']:
+                if section.completed:
                     st.markdown(f"### Step 3: Comparison")
                     
-                    fig2 = go.Figure()
-                    fig2.add_trace(go.Scatter(x=section['bathy_dist'], y=section['bathy_depth'], mode='lines+markers', name='Bathymetry', line=dict(color='#0077B6', width=2)))
-                    fig2.add_trace(go.Scatter(x=section['user_dist'], y=section['user_depth'], mode='lines+markers', name='Design', line=dict(color='#FF6B6B', width=2, dash='dash')))
-                    
-                    # Mark sill location (parabola end point)
-                    if section.get('sill_distance') is not None and section.get('sill_depth') is not None:
-                        # Sill marker (green diamond)
-                        fig2.add_trace(go.Scatter(
-                            x=[section['sill_distance']], 
-                            y=[section['sill_depth']], 
-                            mode='markers',
-                            name='Sill Location',
-                            marker=dict(
-                                symbol='diamond',
-                                size=15,
-                                color='#00FF00',
-                                line=dict(color='#006600', width=2)
-                            ),
-                            hovertemplate='Sill Location<br>Distance: %{x:.1f} m<br>Depth: %{y:.2f} m<extra></extra>'
-                        ))
-                        
-                        # Vertical line downward from sill (green)
-                        min_depth = min(min(section['bathy_depth']), min(section['user_depth']))
-                        fig2.add_shape(
-                            type="line",
-                            x0=section['sill_distance'],
-                            y0=section['sill_depth'],
-                            x1=section['sill_distance'],
-                            y1=min_depth - 1,  # Extend slightly downward
-                            line=dict(color='#00FF00', width=2, dash='dash')
-                        )
-                    
-                    fig2.update_layout(xaxis_title="Distance (m)", yaxis_title="Depth (m)", height=400, legend=dict(x=1.02, y=1, xanchor='left'))
-                    st.plotly_chart(fig2)
+                    plot = plot_settings(len(section.bathy_dist) + len(section.user_dist), x_range)
+                    fig2 = cache.compute('comparison_figure', input_hash(cache.key('design'), plot), comparison_figure, section, plot)
+                    show_figure(fig2)
                     
                     # Show sill information
-                    if section.get('sill_distance') is not None and section.get('sill_depth') is not None:
-                        st.info(f"**Sill Location:** Distance = {section['sill_distance']:.1f} m, Depth = {abs(section['sill_depth']):.2f} m")
+                    if section.sill_distance is not None and section.sill_depth is not None:
+                        st.info(f"**Sill Location:** Distance = {section.sill_distance:.1f} m, Depth = {abs(section.sill_depth):.2f} m")
                     
-                    st.success(f"Section {current}-{current}' saved!")
+                    st.success(f"Section {name}-{name}' saved!")
                     
                     # ===== STEP 4: EROSION IMPACT ANALYSIS =====
                     st.markdown("---")
-                    st.markdown(f"### Step 4: Erosion Impact (30 Years)")
-                    
-                    # Erosion retreat rates (m/year)
-                    RETREAT_RATES = {
-                        'A': 0.7,  # m/year
-                        'B': 0.8,  # m/year
-                        'C': 0.9   # m/year
-                    }
-                    YEARS = 30
-                    
-                    retreat_rate = RETREAT_RATES.get(current, 0.7)
-                    total_retreat = YEARS * retreat_rate  # meters
+                    st.markdown(f"### Step 4: Erosion Impact ({erosion.EROSION_YEARS} Years)")
                     
-                    # Find original shoreline position from design profile data
-                    # (where depth first becomes negative, i.e., where parabola starts)
-                    x_shore_old = 0.0
-                    user_dist_arr = np.array(section['user_dist'])
-                    user_depth_arr = np.array(section['user_depth'])
-                    for i, depth in enumerate(user_depth_arr):
-                        if depth < 0:  # First negative depth (parabola starts)
-                            if i > 0:
-                                # Use the last zero-depth point as shoreline
-                                x_shore_old = user_dist_arr[i-1]
-                            else:
-                                x_shore_old = user_dist_arr[i]
-                            break
-                    
-                    # New shoreline position after erosion
-                    x_shore_new = x_shore_old - total_retreat
-                    
-                    # Sill remains at same location
-                    x_sill = section['sill_distance']
-                    y_sill = section['sill_depth']
+                    section.retreat_rate = st.number_input(
+                        "Retreat Rate [m/year]", value=float(section.retreat_rate), min_value=0.0, step=0.1,
+                        key=f"retreat_rate_{name}", help="Shoreline retreat rate at this section"
+                    )
+                    erosion_result = section_erosion(section, params)
                     
-                    # Calculate new parabola coefficient
-                    # Formula: y = a * (x - x_shore_new)^0.67
-                    # At sill: y_sill = a * (x_sill - x_shore_new)^0.67
-                    # Therefore: a = y_sill / (x_sill - x_shore_new)^0.67
-                    delta_x = x_sill - x_shore_new
-                    if delta_x > 0:
-                        a_new = y_sill / (delta_x ** 0.67)
-                        
-                        # Generate eroded design profile
-                        eroded_dists = []
-                        eroded_depths = []
-                        
-                        for x in np.linspace(x_shore_new, x_sill, 100):
-                            eroded_dists.append(x)
-                            if x <= x_shore_new:
-                                eroded_depths.append(0.0)
-                            else:
-                                relative_x = x - x_shore_new
-                                y = a_new * (relative_x ** 0.67)
-                                eroded_depths.append(y)  # Already negative
-                        
-                        # Create erosion comparison plot
-                        fig_erosion = go.Figure()
-                        
-                        # Original bathymetry
-                        fig_erosion.add_trace(go.Scatter(
-                            x=section['bathy_dist'], 
-                            y=section['bathy_depth'], 
-                            mode='lines', 
-                            name='Original Bathymetry',
-                            line=dict(color='#0077B6', width=2)
-                        ))
-                        
-                        # Original design profile
-                        fig_erosion.add_trace(go.Scatter(
-                            x=section['user_dist'], 
-                            y=section['user_depth'], 
-                            mode='lines', 
-                            name='Original Design',
-                            line=dict(color='#FF6B6B', width=2, dash='dash')
-                        ))
-                        
-                        # Eroded design profile
-                        fig_erosion.add_trace(go.Scatter(
-                            x=eroded_dists, 
-                            y=eroded_depths, 
-                            mode='lines', 
-                            name=f'After {YEARS}yr Erosion',
-                            line=dict(color='#FFA500', width=3, dash='dot')
-                        ))
-                        
-                        # Mark sill location (same for both)
-                        fig_erosion.add_trace(go.Scatter(
-                            x=[x_sill], 
-                            y=[y_sill], 
-                            mode='markers',
-                            name='Sill Location',
-                            marker=dict(
-                                symbol='diamond',
-                                size=12,
-                                color='green',
-                                line=dict(color='#000000', width=1.5)
-                            ),
-                            hovertemplate='Sill<br>Distance: %{x:.1f} m<br>Depth: %{y:.2f} m<extra></extra>'
-                        ))
-                        
-                        # Vertical line at sill
-                        min_depth = min(min(section['bathy_depth']), min(eroded_depths))
-                        fig_erosion.add_shape(
-                            type="line",
-                            x0=x_sill,
-                            y0=y_sill,
-                            x1=x_sill,
-                            y1=min_depth - 1,
-                            line=dict(color='green', width=2, dash='dash')
-                        )
-                        
-                        # Add vertical line at original shoreline
-                        fig_erosion.add_shape(
-                            type="line",
-                            x0=x_shore_old,
-                            y0=0,
-                            x1=x_shore_old,
-                            y1=min_depth - 1,
-                            line=dict(color='red', width=1, dash='dot')
-                        )
-                        
-                        # Add vertical line at eroded shoreline
-                        fig_erosion.add_shape(
-                            type="line",
-                            x0=x_shore_new,
-                            y0=0,
-                            x1=x_shore_new,
-                            y1=min_depth - 1,
-                            line=dict(color='orange', width=1, dash='dot')
-                        )
-                        
-                        fig_erosion.update_layout(
-                            xaxis_title="Distance (m)", 
-                            yaxis_title="Depth (m)", 
-                            height=450,
-                            legend=dict(x=1.02, y=1, xanchor='left')
-                        )
-                        
-                        st.plotly_chart(fig_erosion)
+                    if erosion_result.eroded_dist is not None:
+                        plot = plot_settings(len(section.bathy_dist) + len(section.user_dist) + len(erosion_result.eroded_dist), x_range)
+                        fig_erosion = cache.compute(
+                            'erosion_figure', input_hash(cache.key('erosion'), plot), erosion_figure, section, erosion_result, plot)
+                        show_figure(fig_erosion)
                         
                         # Display erosion metrics
                         col1, col2, col3, col4 = st.columns(4)
                         with col1:
-                            st.metric("Erosion Rate", f"{retreat_rate} m/yr")
+                            st.metric("Erosion Rate", f"{erosion_result.retreat_rate} m/yr")
                         with col2:
-                            st.metric("Time Period", f"{YEARS} years")
+                            st.metric("Time Period", f"{erosion_result.years} years")
                         with col3:
-                            st.metric("Total Retreat", f"{total_retreat:.1f} m")
+                            st.metric("Total Retreat", f"{erosion_result.total_retreat:.1f} m")
                         with col4:
-                            st.metric("New Shoreline", f"{x_shore_new:.1f} m")
+                            st.metric("New Shoreline", f"{erosion_result.x_shore_new:.1f} m")
                     else:
                         st.warning("⚠️ Erosion would exceed sill location. Reduce retreat rate or time period.")
                     
@@ -753,146 +1272,267 @@ def render_profile_section():
                     
                     _, col_prev, col_next, _ = st.columns([1, 2, 2, 1])
                     with col_prev:
-                        if current in ['B', 'C']:
-                            prev_sec = 'A' if current == 'B' else 'B'
-                            if st.button(f"< Previous ({prev_sec})", key=f"prev_{current}", use_container_width=True):
-                                st.session_state.current_section = prev_sec
+                        if current > 0:
+                            prev_sec = sections[current - 1].name
+                            if st.button(f"< Previous ({prev_sec})", key=f"prev_{name}", use_container_width=True):
+                                st.session_state.current_section = current - 1
                                 st.rerun()
                     with col_next:
-                        if current == 'A':
-                            if st.button("Next (B) >", key=f"next_{current}", use_container_width=True):
-                                st.session_state.current_section = 'B'
+                        if current < len(sections) - 1:
+                            next_sec = sections[current + 1].name
+                            if st.button(f"Next ({next_sec}) >", key=f"next_{name}", use_container_width=True):
+                                st.session_state.current_section = current + 1
                                 st.rerun()
-                        elif current == 'B':
-                            if st.button("Next (C) >", key=f"next_{current}", use_container_width=True):
-                                st.session_state.current_section = 'C'
-                                st.rerun()
-                        elif current == 'C':
-                            if st.button("All Results >", key=f"next_{current}", use_container_width=True):
+                        else:
+                            if st.button("All Results >", key=f"next_{name}", use_container_width=True):
                                 st.session_state.current_section = 'ALL'
                                 st.rerun()
-    
-
-
-
 
 
 # ===== VOLUME CALCULATION FUNCTIONS =====
 
-def calculate_fill_area(bathy_dist, bathy_depth, design_dist, design_depth, sill_distance=None):
+@timing.timed()
+def calculate_total_volume():
     """
-    Calculate fill area between bathymetry and design profiles.
-    If sill_distance is provided, calculates only up to that distance
+    Calculate total fill volume between all consecutive sections in the session.
+    Uses Average End Area Method: V = (A1 + A2) / 2 * L (see beach_core.volume),
+    plus the raster fill outside the sections (see beach_core.cutfill)
     
+    Returns:
+        Tuple of (VolumeResult, error_message)
+        - error_message: None if successful, error string if failed
+        - (None, None) while the raster cut / fill job runs (see job_progress)
     """
-    if not bathy_dist or not design_dist:
-        return 0.0
-    
-    common_dist = np.array(bathy_dist)  # Distance values from bathymetry profile
-    design_interp = np.interp(common_dist, design_dist, design_depth)  # Interpolated design depth values
-    bathy_array = np.array(bathy_depth)  # Depth values from bathymetry profile
-    
-    # Extract portion up to sill distance
-    if sill_distance is not None:
-        mask = common_dist <= sill_distance  # Extract portion up to sill distance
-        common_dist = common_dist[mask]  # Distance values up to sill
-        design_interp = design_interp[mask]  # Design depth values up to sill
-        bathy_array = bathy_array[mask]  # Bathymetry depth values up to sill
-    
-    # Calculate fill height (vertical distance from bathymetry to design profile)
-    # Note: Depths are negative (e.g., -5m means 5 meters deep)
-    # If design is shallower (less negative) than bathymetry, we need fill
-    # Example: design = -5m, bathy = -8m, fill_height = -5 - (-8) = 3m (positive = fill needed)
-    # Example: design = -8m, bathy = -5m, fill_height = -8 - (-5) = -3m (negative = cut, not fill)
-    fill_height = design_interp - bathy_array 
-    
-    # Only count positive values (where design is above bathymetry = fill needed)
-    # Negative values mean bathymetry is shallower than design (no fill needed)
-    fill_height = np.maximum(fill_height, 0)
+    sections = st.session_state.sections
     
-    # Calculate area using trapezoidal integration
-    if len(common_dist) < 2:
-        return 0.0
+    # Check if all sections are completed
+    missing = [data.name for data in sections if not data.completed]
+    if missing:
+        shown = ', '.join(missing[:10]) + (f" (+{len(missing) - 10} more)" if len(missing) > 10 else "")
+        return None, f"Missing sections: {shown}"
     
-    area = np.trapezoid(fill_height, common_dist)
+    names = [data.name for data in sections]
+    endpoints = [data.endpoints for data in sections]
+    soundings = load_bathymetry(endpoints)
+    if soundings is None:
+        return None, "Bathymetry data not available"
     
-    return area
+    try:
+        # All sections are designed with the current parameters (see design_pending_sections)
+        a, exponent, sill_depth = sections[0].design_params
+        params = design.DesignParams(a=a, exponent=exponent, sill_depth=sill_depth)
+        cache = project_cache()
+        cut_fill_key = input_hash(names, endpoints, design_key(params), soundings.key, cutfill.RASTER_RESOLUTION)
+        if not cache.is_fresh('cut_fill', cut_fill_key):
+            # Background job (gridding and rasterizing a large footprint take a while)
+            done, result = run_job('cut_fill', cut_fill_key, cutfill.raster_cut_fill, soundings, endpoints, params,
+                                   (NEW_SHORELINE_P1, NEW_SHORELINE_P2), names, cutfill.RASTER_RESOLUTION)
+            if not done:
+                return None, None
+            if isinstance(result, Exception):
+                return None, str(result) or type(result).__name__
+            cache.put('cut_fill', cut_fill_key, result)
+        cut_fill = cache.get('cut_fill')
+        areas = [section_fill_area(data) for data in sections]
+        return cache.compute(
+            'volume', input_hash(names, endpoints, [data.cache.key('fill_area') for data in sections], cache.key('cut_fill')),
+            volume.volume_from_areas, names, endpoints, areas, cut_fill=cut_fill
+        ), None
+    except ValueError as e:
+        return None, str(e)
 
 
-def calculate_section_midpoint(points):
+def get_volume_results():
     """
-    Calculate the midpoint of a section line.
-    
-    Args:
-        points: List of two points [{'lat': float, 'lon': float}, ...]
+    Get volume calculation results (called from app.py).
     
     Returns:
-        Midpoint coordinates {'lat': float, 'lon': float} or None if insufficient points
+        Tuple of (results_dict, error_message) from calculate_total_volume()
     """
-    if len(points) >= 2:
-        return {
-            'lat': (points[0]['lat'] + points[1]['lat']) / 2,
-            'lon': (points[0]['lon'] + points[1]['lon']) / 2
-        }
-    return None
+    return calculate_total_volume()
 
 
-def calculate_total_volume():
+# ===== BACKGROUND JOBS =====
+# Profile extraction and the raster cut / fill run on a worker pool shared by all
+# sessions (see beach_core.jobs), so a long job does not hold the script thread. A job
+# finishing within JOB_WAIT is used in the same rerun; a longer one shows its progress,
+# polled every JOB_POLL_INTERVAL, and the page reruns when it is done. A session has at
+# most one job of each kind: new inputs (e.g. another click on the map) cancel the
+# running job and replace it. Map tile renders are shared by all sessions instead (see
+# tile_render).
+JOB_WAIT = 0.5  # seconds
+JOB_POLL_INTERVAL = 0.5  # seconds
+
+def session_jobs():
+    """This session's background jobs by kind"""
+    if 'jobs' not in st.session_state:
+        st.session_state.jobs = {}
+    return st.session_state.jobs
+
+def run_job(kind, key, func, *args, **kwargs):
     """
-    Calculate total fill volume between all sections.
-    Uses Average End Area Method: V = (A1 + A2) / 2 * L
-    
+    Run func(*args, progress=..., **kwargs) as this session's job of a kind, or keep
+    waiting for the one already running with the same inputs key.
+
+    Args:
+        kind: Job kind ('profiles', 'cut_fill')
+        key: Hash of the job's inputs; a running job with another key is cancelled
+
     Returns:
-        Tuple of (results_dict, error_message)
-        - results_dict: Contains 'areas', 'distances', 'volumes', 'total'
-        - error_message: None if successful, error string if failed
+        Tuple of (done, result); result is None while the job runs, and the exception the
+        job raised if it failed. A job cancelled under it (a rerun racing a newer one) is
+        dropped as not done, so the next run submits it again.
     """
-    sections = st.session_state.sections
-    
-    # Check if all sections are completed
-    completed = {name: data['completed'] for name, data in sections.items()}
-    if not all(completed.values()):
-        missing = [name for name, done in completed.items() if not done]
-        return None, f"Missing sections: {', '.join(missing)}"
-    
-    # Calculate fill area for each section (up to SILL)
-    areas = {}
-    for name, data in sections.items():
-        areas[name] = calculate_fill_area(
-            data['bathy_dist'], data['bathy_depth'],
-            data['user_dist'], data['user_depth'],
-            sill_distance=data['sill_distance']
-        )
-    
-    # Section midpoints
-    midpoints = {name: calculate_section_midpoint(data['points']) 
-                 for name, data in sections.items()}
-    
-    # Inter-section distances
-    dist_AB = calculate_distance(midpoints['A'], midpoints['B'])
-    dist_BC = calculate_distance(midpoints['B'], midpoints['C'])
-    
-    # Calculate volume (Average End Area Method)
-    vol_AB = (areas['A'] + areas['B']) / 2 * dist_AB
-    vol_BC = (areas['B'] + areas['C']) / 2 * dist_BC
+    running = session_jobs()
+    job = running.get(kind)
+    if job is None or job.key != key:
+        if job is not None:
+            job.cancel()
+            timing.count('jobs_cancelled')
+        job = running[kind] = jobs.shared_pool().submit(kind, key, func, *args, **kwargs)
+        timing.count('jobs_submitted')
+    with timing.stage(f"job_wait:{kind}"):
+        finished = job.wait(JOB_WAIT)
+    if not finished:
+        return False, None
     
-    # Add extra volume for areas outside the drawn sections (estimated)
-    EXTRA_VOLUME = 8000.0  # m³ - accounts for fill areas not covered by sections
-    total_volume = vol_AB + vol_BC + EXTRA_VOLUME
-    
-    return {
-        'areas': areas,  # m²
-        'distances': {'A-B': dist_AB, 'B-C': dist_BC},  # m
-        'volumes': {'A-B': vol_AB, 'B-C': vol_BC, 'Extra': EXTRA_VOLUME},  # m³
-        'total': total_volume  # m³
-    }, None
+    # Finished: drop it, and count its run time in this rerun's profile
+    if running.get(kind) is job:
+        del running[kind]
+    timing.current().merge(job.profiler)
+    try:
+        return True, job.result()
+    except jobs.Cancelled:
+        timing.count('jobs_cancelled')
+        return False, None
+    except Exception as e:
+        timing.count('jobs_failed')
+        return True, e
 
+@st.fragment(run_every=JOB_POLL_INTERVAL)
+def job_progress(kind, label):
+    """Progress of this session's running job of a kind, rerunning the page once it is done"""
+    job = session_jobs().get(kind)
+    if job is None or job.done:
+        st.rerun()
+    st.progress(job.progress, text=f"{label}… {job.progress:.0%} ({job.elapsed:.0f} s)")
 
-def get_volume_results():
+# ===== PROJECT FILES =====
+# A project is saved as one file (see beach_core.project) and opened back with its
+# sections' profiles, designs and results in their node caches, so nothing is
+# recomputed unless its inputs changed (e.g. another survey file).
+
+def project_file_name():
+    """Download name of the project file"""
+    name = re.sub(r'[^\w\-]+', '_', st.session_state.get('project_name', 'Untitled Project')).strip('_')
+    return (name or 'project') + project.PROJECT_EXTENSION
+
+def project_file_data(inputs):
     """
-    Get volume calculation results (called from app.py).
+    Snapshot of the session's project for st.download_button: a callable returning the
+    project file, so it is only written when the button is clicked.
+
+    Args:
+        inputs: Input widget values by key (app.py); the sampling settings are added
+    """
+    init_session_state()
+    state = st.session_state
+    cache = project_cache()
+    saved = project.Project(
+        name=state.get('project_name', 'Untitled Project'),
+        sections=list(state.sections),
+        inputs={**inputs, **state.sampling_settings},
+        results={node: (cache.key(node), cache.get(node)) for node in project.RESULT_NODES if node in cache},
+    )
+    
+    def write():
+        buffer = io.BytesIO()
+        project.save_project(buffer, saved)
+        return buffer.getvalue()
     
+    return write
+
+def open_project(file):
+    """
+    Replace the session's project with a saved one (sections, results, input values).
+
     Returns:
-        Tuple of (results_dict, error_message) from calculate_total_volume()
+        Error message, or None if the project was opened
     """
-    return calculate_total_volume()
\ No newline at end of file
+    try:
+        saved = project.load_project(file)
+    except (ValueError, KeyError) as e:
+        return f"Cannot open project: {e}"
+    
+    state = st.session_state
+    state.project_name = saved.name
+    state.sections = saved.sections or [Section(section_name(i)) for i in range(DEFAULT_SECTION_COUNT)]
+    state.current_section = 0
+    state.coord_version = state.get('coord_version', 0) + 1
+    state.compute_cache = NodeCache()
+    for node, (key, value) in saved.results.items():
+        state.compute_cache.restore(node, key, value)
+    inputs = dict(saved.inputs)
+    if state.sections[0].sampling:
+        # Sampling widgets of the first section shown, so it is not re-extracted
+        mode, resolution, points = section_sampling(state.sections[0])
+        inputs.setdefault('sampling_mode', mode)
+        if resolution is not None:
+            inputs.setdefault('grid_resolution', resolution)
+        if points is not None:
+            inputs.setdefault('profile_points', points)
+    state.sampling_settings = dict(SAMPLING_DEFAULTS)
+    for key, value in inputs.items():
+        if key in SAMPLING_DEFAULTS:
+            # Shown by the sampling widgets, which are restored from the settings
+            state.sampling_settings[key] = value
+            state.pop(key, None)
+        else:
+            state[key] = value
+    return None
+
+# ===== PROFILING =====
+# Per-rerun stage timings (see beach_core.timing), switched on in the sidebar. Each
+# profiled rerun is shown in the sidebar and appended to PROFILE_LOG as one JSON line.
+PROFILE_LOG = os.environ.get('BEACH_PROFILE_LOG', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'profile_runs.jsonl'))
+
+def session_profiler():
+    """Profiler of this session"""
+    if 'profiler' not in st.session_state:
+        st.session_state.profiler = timing.Profiler(log_path=PROFILE_LOG)
+        st.session_state.profile_session = os.urandom(4).hex()
+    return st.session_state.profiler
+
+def begin_profiling():
+    """Start timing this rerun (called first in app.py)"""
+    profiler = session_profiler()
+    profiler.enabled = bool(st.session_state.get('profiling', False))
+    profiler.begin_run()
+
+def render_profiling_panel():
+    """Finish timing this rerun and show the breakdown in the sidebar (called last in app.py)"""
+    profiler = session_profiler()
+    if profiler.enabled and st.session_state.get('page') == 'project' and 'sections' in st.session_state:
+        profiler.count('sections', len(st.session_state.sections))
+        profiler.count('nodes_recomputed', len(recomputed_nodes(st.session_state.sections)))
+    record = profiler.end_run(page=st.session_state.get('page'), session=st.session_state.profile_session)
+    
+    with st.sidebar:
+        st.markdown("### ⏱️ Profiling")
+        st.toggle("Profile reruns", key='profiling',
+                  help="Time the stages of every rerun (bathymetry loading, profile extraction, design, volume, "
+                       "figures, map) and log them")
+        if record is None:
+            return
+        st.metric("This rerun", f"{record['total_ms']:,.0f} ms")
+        st.dataframe(
+            {'Stage': list(record['stages']),
+             'ms': [f"{stage['ms']:,.1f}" for stage in record['stages'].values()],
+             'Calls': [stage['calls'] for stage in record['stages'].values()]},
+            hide_index=True, use_container_width=True
+        )
+        if record['counters']:
+            st.caption(" · ".join(f"{name}: {value:,}" for name, value in record['counters'].items()))
+        if len(profiler.history) > 1:
+            st.line_chart({'Rerun (ms)': [run['total_ms'] for run in profiler.history]}, height=150)
+        st.caption(f"Stage times are inclusive (nested stages count in both). Logged to `{profiler.log_path}`")
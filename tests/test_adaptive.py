@@ -0,0 +1,65 @@
+# tests/test_adaptive.py
+# Adaptive profile sampling against a dense fixed-count extraction on a synthetic survey
+import numpy as np
+import pytest
+
+from beach_core import bathymetry, design, volume
+
+LAT0, LON0 = 41.17, 29.62
+M_PER_DEG_LAT = 111195.0
+M_PER_DEG_LON = M_PER_DEG_LAT * np.cos(np.radians(LAT0))
+FILL_DISTANCE = 60.0
+DENSE_POINTS = 20_000
+
+
+def to_point(x, y):
+    return {'lat': LAT0 + y / M_PER_DEG_LAT, 'lon': LON0 + x / M_PER_DEG_LON}
+
+
+@pytest.fixture(scope='module')
+def soundings():
+    """Jittered 8 m grid: a sloping bed with a bar 300 m offshore"""
+    rng = np.random.default_rng(11)
+    y, x = np.meshgrid(np.arange(120) * 8.0, np.arange(120) * 8.0, indexing='ij')
+    x = x + rng.uniform(-2, 2, x.shape)
+    y = y + rng.uniform(-2, 2, y.shape)
+    depth = 0.3 - 0.02 * y - 1.5 * np.exp(-((y - 300) / 40) ** 2)
+    point = to_point(x.ravel(), y.ravel())
+    return bathymetry.Soundings(lat=point['lat'], lon=point['lon'], depth=depth.ravel())
+
+
+def fill_area(distances, depths):
+    profile = design.build_design_profile(distances, depths, FILL_DISTANCE)
+    return volume.calculate_fill_area(profile.bathy_dist, profile.bathy_depth, profile.design_dist,
+                                      profile.design_depth, profile.sill_distance)
+
+
+@pytest.mark.parametrize('method', ['nearest', 'bilinear'])
+def test_adaptive_fill_area_matches_dense_sampling(soundings, method):
+    p1, p2 = to_point(480, 20), to_point(480, 900)
+    adaptive = bathymetry.extract_adaptive_profile(
+        soundings, p1, p2, design.design_depth_function(FILL_DISTANCE), method=method)
+    dense_dist, dense_depth = bathymetry.extract_depth_profiles(
+        soundings, [[[p1['lat'], p1['lon']], [p2['lat'], p2['lon']]]], DENSE_POINTS, method=method, cache=None)
+
+    assert len(adaptive.distances) < DENSE_POINTS / 20
+    assert np.all(np.diff(adaptive.distances) > 0)
+    assert adaptive.spacing == pytest.approx(8.0, rel=0.35)
+    dense = fill_area(dense_dist[0], dense_depth[0])
+    assert dense > 0
+    assert fill_area(adaptive.distances, adaptive.depths) == pytest.approx(
+        dense, abs=max(adaptive.error_estimate, 0.02 * dense))
+
+
+def test_adaptive_sampling_limits(soundings):
+    p1, p2 = to_point(480, 20), to_point(480, 900)
+    depth_at = design.design_depth_function(FILL_DISTANCE)
+
+    capped = bathymetry.extract_adaptive_profile(soundings, p1, p2, depth_at, max_points=200)
+    assert len(capped.distances) <= 200
+
+    # Intervals are only bisected while longer than twice the minimum spacing
+    coarse = bathymetry.extract_adaptive_profile(soundings, p1, p2, depth_at, depth_tolerance=0.01, min_spacing=1.0)
+    fine = bathymetry.extract_adaptive_profile(soundings, p1, p2, depth_at, depth_tolerance=0.01, min_spacing=0.1)
+    assert np.diff(coarse.distances).min() >= 1.0 - 1e-9
+    assert len(coarse.distances) < len(fine.distances)
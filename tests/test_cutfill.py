@@ -0,0 +1,54 @@
+# tests/test_cutfill.py
+# Raster cut/fill against the TIN fill volume on the bundled survey (data.nc)
+import os
+
+import numpy as np
+import pytest
+
+from beach_core import bathymetry, cutfill, design, geometry, surface
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data.nc')
+TRANSECTS = np.array([
+    [[41.1780, 29.6238], [41.1755, 29.6215]],
+    [[41.1768, 29.6262], [41.1745, 29.6240]],
+    [[41.1755, 29.6283], [41.1732, 29.6262]],
+])
+
+
+@pytest.fixture(scope='module')
+def soundings():
+    return bathymetry.get_soundings(DATA_FILE)
+
+
+@pytest.mark.parametrize('resolution', [5.0, 2.5, 1.0])
+def test_raster_fill_between_sections_matches_tin(soundings, resolution):
+    params = design.DesignParams.from_d50(0.25, sill_depth=2.5)
+    tin = surface.tin_fill_volume(soundings, TRANSECTS, params)
+    raster = cutfill.raster_cut_fill(soundings, TRANSECTS, params, resolution=resolution)
+
+    assert raster.zones[-1] == cutfill.OUTSIDE_ZONE
+    between = raster.zone_fill[:-1].sum()
+    assert between == pytest.approx(tin.volume, rel=0.005)
+    assert raster.fill == pytest.approx(raster.zone_fill.sum())
+    assert raster.outside_fill > 0
+
+
+def test_local_projection_round_trip():
+    lat = np.array([41.1736, 41.1780, 41.1799])
+    lon = np.array([29.6219, 29.6262, 29.6389])
+    x, y = geometry.to_local(lat, lon, 41.175, 29.626)
+    assert np.allclose(geometry.to_geographic(x, y, 41.175, 29.626), (lat, lon))
+    # About 111 km per degree of latitude
+    assert geometry.to_local(41.176, 29.626, 41.175, 29.626)[1] == pytest.approx(111.19, rel=1e-3)
+
+
+@pytest.mark.parametrize('resolution', [5.0, 1.0])
+def test_outside_fill_sweep_matches_raster_per_a(soundings, resolution):
+    params = design.DesignParams(sill_depth=2.5)
+    a_values = design.dean_a_from_d50(np.linspace(0.15, 0.6, 9))
+    swept = cutfill.outside_fill_sweep(soundings, TRANSECTS, a_values, params, resolution=resolution, tile_cells=5_000)
+    expected = [
+        cutfill.raster_cut_fill(soundings, TRANSECTS, design.DesignParams(a=a, sill_depth=2.5), resolution=resolution).outside_fill
+        for a in a_values
+    ]
+    assert swept == pytest.approx(expected, rel=1e-9)
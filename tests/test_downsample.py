@@ -0,0 +1,57 @@
+# tests/test_downsample.py
+# LTTB downsampling against a point-by-point reference implementation
+import numpy as np
+import pytest
+
+from beach_core import downsample
+
+
+def reference_lttb(x, y, n_out):
+    """Largest-Triangle-Three-Buckets, one bucket at a time in plain Python"""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return list(range(n))
+    edges = [int(i * (n - 2) / (n_out - 2)) + 1 for i in range(n_out - 1)]
+    edges[-1] = n - 1
+    edges.append(n)
+    kept = [0]
+    a = 0
+    for i in range(n_out - 2):
+        next_start, next_end = edges[i + 1], edges[i + 2]
+        avg_x = sum(x[next_start:next_end]) / (next_end - next_start)
+        avg_y = sum(y[next_start:next_end]) / (next_end - next_start)
+        best, best_area = edges[i], -1.0
+        for j in range(edges[i], edges[i + 1]):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        kept.append(best)
+        a = best
+    kept.append(n - 1)
+    return kept
+
+
+@pytest.mark.parametrize('n, n_out', [(1000, 100), (5000, 1000), (101, 3), (250, 249)])
+def test_lttb_matches_reference(n, n_out):
+    rng = np.random.default_rng(n)
+    x = np.sort(rng.uniform(0, 500, n))
+    y = -0.02 * x + np.sin(x / 7) + rng.normal(0, 0.3, n)
+    indices = downsample.lttb_indices(x, y, n_out)
+    assert indices.tolist() == reference_lttb(x.tolist(), y.tolist(), n_out)
+
+
+def test_lttb_keeps_ends_and_extremes():
+    x = np.arange(10_000, dtype=float)
+    y = np.zeros_like(x)
+    y[4321] = -25.0  # A single deep point must survive
+    dx, dy = downsample.lttb(x, y, 200)
+    assert len(dx) == 200
+    assert dx[0] == 0 and dx[-1] == x[-1]
+    assert np.all(np.diff(dx) > 0)
+    assert dy.min() == -25.0
+
+
+def test_lttb_short_profile_is_unchanged():
+    x, y = np.arange(5.0), np.arange(5.0) ** 2
+    dx, dy = downsample.lttb(x, y, 10)
+    assert np.array_equal(dx, x) and np.array_equal(dy, y)
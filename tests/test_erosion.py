@@ -0,0 +1,106 @@
+# tests/test_erosion.py
+# Multi-year erosion engine against the single-profile model, and renourishment scenarios
+import numpy as np
+import pytest
+
+from beach_core import erosion
+
+EXPONENT = 0.67
+SILL_DEPTH = -2.5
+FILL = np.array([40.0, 55.0, 35.0])
+SILL = FILL + 105.0
+RATES = np.array([0.7, 0.8, 0.9])
+ENDPOINTS = np.array([
+    [[41.1780, 29.6238], [41.1755, 29.6215]],
+    [[41.1768, 29.6262], [41.1745, 29.6240]],
+    [[41.1755, 29.6283], [41.1732, 29.6262]],
+])
+
+
+def bathymetry(i):
+    dist = np.linspace(0, 400, 801)
+    return dist, -0.03 * (i + 1) * dist
+
+
+def simulate(years=30, rates=RATES, fill=FILL, sill=SILL):
+    profiles = [bathymetry(i) for i in range(len(fill))]
+    return erosion.simulate_erosion(
+        [d for d, _ in profiles], [z for _, z in profiles], fill, sill, SILL_DEPTH, rates, ENDPOINTS,
+        years=years, exponent=EXPONENT, num_points=400)
+
+
+@pytest.mark.parametrize('year', [0, 1, 12, 30])
+def test_year_slice_matches_erode_profile(year):
+    simulation = simulate()
+    for i in range(len(FILL)):
+        # Design profile: zero up to the fill start, then the Dean profile to the sill
+        design_dist = np.concatenate((np.linspace(0, FILL[i], 50), np.linspace(FILL[i], SILL[i], 200)[1:]))
+        relative = np.clip((design_dist - FILL[i]) / (SILL[i] - FILL[i]), 0, 1)
+        design_depth = SILL_DEPTH * relative ** EXPONENT
+        single = erosion.erode_profile(design_dist, design_depth, SILL[i], SILL_DEPTH, RATES[i],
+                                       years=year, exponent=EXPONENT, num_points=20_001)
+        assert simulation.shoreline[year, i] == pytest.approx(single.x_shore_new)
+        x = simulation.x[i]
+        expected = np.where(x <= single.x_shore_new, 0.0, np.interp(x, single.eroded_dist, single.eroded_depth))
+        assert np.allclose(simulation.depth[year, i], expected, atol=1e-3)
+
+
+def test_remaining_volume_decreases():
+    simulation = simulate(years=50)
+    assert simulation.volume[0] > 0
+    assert np.all(np.diff(simulation.volume) <= 1e-9)
+    assert np.all(np.diff(simulation.areas, axis=0) <= 1e-9)
+    assert simulation.remaining_fraction[0] == 1.0
+
+
+def test_no_retreat_keeps_the_design():
+    simulation = simulate(rates=0.0)
+    assert np.allclose(simulation.volume, simulation.volume[0])
+    assert erosion.renourishment_interval(simulation) is None
+
+
+@pytest.mark.parametrize('rates, fill, sill', [
+    (np.array([0.7, -0.1, 0.9]), FILL, SILL),
+    (RATES, FILL, np.array([SILL[0], FILL[1], SILL[2]])),
+    (RATES, FILL, np.array([SILL[0], FILL[1] - 1, SILL[2]])),
+    (RATES, np.array([FILL[0], np.nan, FILL[2]]), SILL),
+])
+def test_invalid_retreat_is_rejected(rates, fill, sill):
+    with pytest.raises(ValueError):
+        simulate(rates=rates, fill=fill, sill=sill)
+
+
+def hand_simulation():
+    """Remaining volume 100, 90, ..., 50 m³ over years 0..5"""
+    volume = np.array([100.0, 90.0, 80.0, 70.0, 60.0, 50.0])
+    return erosion.ErosionSimulation(years=np.arange(6.0), retreat_rates=np.ones(1), shoreline=None, x=None,
+                                     depth=None, areas=None, volume=volume)
+
+
+def test_renourishment_scenarios_by_hand():
+    scenarios = erosion.renourishment_scenarios(hand_simulation(), intervals=[2, 5], horizon=10, discount_rate=0.1)
+    # Every 2 years: renourished in years 2, 4, 6, 8 with 20 m³; every 5 years: in year 5 with 50 m³
+    assert scenarios.events.tolist() == [4, 1]
+    assert scenarios.event_volume.tolist() == [20.0, 50.0]
+    assert scenarios.total_volume.tolist() == [80.0, 50.0]
+    assert scenarios.discounted_volume == pytest.approx([20 * sum(1.1 ** -y for y in (2, 4, 6, 8)), 50 * 1.1 ** -5])
+    assert scenarios.mean_remaining == pytest.approx([0.95, 0.8])
+    assert scenarios.min_remaining == pytest.approx([0.8, 0.5])
+
+
+def test_renourishment_without_discounting():
+    scenarios = erosion.renourishment_scenarios(hand_simulation(), intervals=[3], horizon=10)
+    assert scenarios.events.tolist() == [3]
+    assert scenarios.discounted_volume == pytest.approx(scenarios.total_volume)
+
+
+@pytest.mark.parametrize('intervals', [[0, 2], [2, 6], [-1]])
+def test_renourishment_intervals_out_of_range(intervals):
+    with pytest.raises(ValueError, match="between 1 and 5"):
+        erosion.renourishment_scenarios(hand_simulation(), intervals=intervals, horizon=10)
+
+
+def test_renourishment_interval_threshold():
+    simulation = hand_simulation()
+    assert erosion.renourishment_interval(simulation, 0.75) == 3
+    assert erosion.renourishment_interval(simulation, 0.5) is None
@@ -0,0 +1,60 @@
+# tests/test_incremental.py
+# Input hashes and the node cache. Hashes are saved in project files, so they must not
+# change between versions for the same inputs.
+import numpy as np
+import pytest
+
+from beach_core.design import DesignParams
+from beach_core.incremental import NodeCache, input_hash
+
+PARAMS = DesignParams(a=0.1, exponent=0.5, sill_depth=2.5, buffer_distance=10.0)
+
+
+def test_hash_is_stable():
+    inputs = ('profile', 1, 2.5, None, True, [1, 2], (3,), {'b': 1, 'a': 2}, np.arange(4, dtype=np.float32), PARAMS)
+    assert input_hash(*inputs) == '939f6e3fbfa5957e590f9a334f42b434'
+    assert input_hash(*inputs) == input_hash(*inputs)
+
+
+@pytest.mark.parametrize('a, b', [
+    (1, 1.0),
+    (1, '1'),
+    (True, 1),
+    (None, 'None'),
+    ([1, 2], (1, 2)),
+    ([[1], 2], [1, [2]]),
+    (np.arange(4, dtype=np.float32), np.arange(4, dtype=np.float64)),
+    (np.zeros((2, 3)), np.zeros((3, 2))),
+    (np.array([1.0, 2.0]), np.array([1.0, 2.0 + 1e-12])),
+    (PARAMS, DesignParams(a=0.1, exponent=0.5, sill_depth=3.0, buffer_distance=10.0)),
+])
+def test_hash_tells_inputs_apart(a, b):
+    assert input_hash(a) != input_hash(b)
+
+
+def test_hash_of_equal_values():
+    assert input_hash({'a': 1, 'b': 2}) == input_hash({'b': 2, 'a': 1})
+    assert input_hash(np.int64(3)) == input_hash(3)
+    assert input_hash(np.float32(2.5)) == input_hash(2.5)
+    assert input_hash(np.arange(6.0).reshape(2, 3).T) == input_hash(np.ascontiguousarray(np.arange(6.0).reshape(2, 3).T))
+    assert input_hash(PARAMS) == input_hash(DesignParams(a=0.1, exponent=0.5, sill_depth=2.5, buffer_distance=10.0))
+
+
+def test_node_cache_recomputes_only_on_new_inputs():
+    cache = NodeCache()
+    calls = []
+
+    def compute(x):
+        calls.append(x)
+        return x * 2
+
+    assert cache.compute('double', input_hash(1), compute, 1) == 2
+    assert cache.compute('double', input_hash(1), compute, 1) == 2
+    assert calls == [1] and cache.hits == 1 and cache.misses == 1
+    assert cache.compute('double', input_hash(3), compute, 3) == 6
+    assert calls == [1, 3] and cache.recomputed == ['double', 'double']
+
+    cache.restore('other', 'key', 5)
+    assert cache.is_fresh('other', 'key') and cache.get('other') == 5 and cache.misses == 2
+    cache.discard('double')
+    assert 'double' not in cache and 'other' in cache
@@ -0,0 +1,79 @@
+# tests/test_jobs.py
+# Background job pool: progress, cancellation (running and queued) and errors
+import threading
+
+import pytest
+
+from beach_core import jobs, timing
+
+TIMEOUT = 5.0
+
+
+@pytest.fixture
+def pool():
+    pool = jobs.JobPool(max_workers=1)
+    yield pool
+    pool.shutdown()
+
+
+def blocking(started, release, steps=3, progress=None):
+    """Reports step 0, waits for release, then reports the remaining steps"""
+    progress(0, steps)
+    started.set()
+    assert release.wait(TIMEOUT)
+    for step in range(1, steps):
+        progress(step, steps)
+    return steps
+
+
+def test_job_reports_progress_and_returns(pool):
+    started, release = threading.Event(), threading.Event()
+    with timing.use(timing.Profiler(enabled=True)):
+        job = pool.submit('test', 'key', blocking, started, release, steps=4)
+    assert started.wait(TIMEOUT)
+    assert not job.done and job.progress == 0.0
+    release.set()
+    assert job.wait(TIMEOUT)
+    assert job.result() == 4
+    assert job.progress == 1.0
+    # Profiled like the submitting run, on the job's own profiler
+    assert job.profiler.stages['job:test'][1] == 1
+
+
+def test_running_job_stops_at_its_next_report(pool):
+    started, release = threading.Event(), threading.Event()
+    job = pool.submit('test', None, blocking, started, release)
+    assert started.wait(TIMEOUT)
+    job.cancel()
+    release.set()
+    assert job.wait(TIMEOUT)
+    assert job.cancelled
+    with pytest.raises(jobs.Cancelled):
+        job.result()
+
+
+def test_queued_job_never_starts(pool):
+    started, release = threading.Event(), threading.Event()
+    running = pool.submit('test', None, blocking, started, release)
+    assert started.wait(TIMEOUT)
+
+    ran = threading.Event()
+    queued = pool.submit('test', None, lambda progress=None: ran.set())
+    queued.cancel()
+    release.set()
+    assert running.wait(TIMEOUT) and queued.wait(TIMEOUT)
+    assert running.result() == 3
+    with pytest.raises(jobs.Cancelled):
+        queued.result()
+    assert not ran.is_set()
+
+
+def test_job_exception_comes_back_from_result(pool):
+    def failing(progress=None):
+        progress(0, 1)
+        raise ValueError("bad survey")
+
+    job = pool.submit('test', None, failing)
+    assert job.wait(TIMEOUT)
+    with pytest.raises(ValueError, match="bad survey"):
+        job.result()
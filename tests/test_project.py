@@ -0,0 +1,98 @@
+# tests/test_project.py
+# Project files: everything saved comes back, with the same dtypes and node cache keys
+import io
+
+import numpy as np
+import pytest
+
+from beach_core import cutfill, design, project, volume
+from beach_core.section import DEPTH_DTYPE, DIST_DTYPE, Section
+
+PARAMS = design.DesignParams(a=0.1, exponent=0.5, sill_depth=2.5, buffer_distance=10.0)
+
+
+def designed_section(name, points, slope):
+    dist = np.linspace(0, 300, 250)
+    depth = -slope * dist
+    section = Section(name, points=points)
+    section.set_profile(dist, depth, ('nearest', 5.0, 250), {'spacing': 1.2, 'error_estimate': 0.01})
+    section.cache.put('profile', f"profile-{name}", section.sampling_info)
+    profile = section.cache.put('design', f"design-{name}",
+                                design.build_design_profile(section.raw_dist, section.raw_depth, 40.0, PARAMS))
+    section.set_design(profile, (PARAMS.a, PARAMS.exponent, PARAMS.sill_depth))
+    section.cache.put('fill_area', section.cache.key('design'), volume.calculate_fill_area(
+        section.bathy_dist, section.bathy_depth, section.user_dist, section.user_depth, section.sill_distance))
+    section.retreat_rate = 0.9
+    return section
+
+
+@pytest.fixture
+def saved():
+    sections = [
+        designed_section('A', [{'lat': 41.1780, 'lon': 29.6238}, {'lat': 41.1755, 'lon': 29.6215}], 0.02),
+        designed_section('B', [{'lat': 41.1768, 'lon': 29.6262}, {'lat': 41.1745, 'lon': 29.6240}], 0.03),
+        Section('C', points=[{'lat': 41.1755, 'lon': 29.6283}]),  # Not extracted yet
+    ]
+    cut_fill = cutfill.CutFillResult(
+        fill=1200.0, cut=300.0, zones=['A-B', cutfill.OUTSIDE_ZONE], zone_fill=np.array([1000.0, 200.0]),
+        zone_cut=np.array([250.0, 50.0]), cell_area=25.0, footprint_area=5000.0, no_data_area=0.0,
+        footprint=np.array([[41.17, 29.62], [41.18, 29.62], [41.18, 29.63], [41.17, 29.63]]),
+    )
+    volumes = volume.volume_from_areas(['A', 'B'], [s.endpoints for s in sections[:2]],
+                                       [s.cache.get('fill_area') for s in sections[:2]], cut_fill=cut_fill)
+    saved = project.Project(
+        name='Test beach', sections=sections, inputs={'d50': 0.25, 'use_sill': True, 'sampling_mode': 'nearest'},
+        results={'cut_fill': ('cut-fill-key', cut_fill), 'volume': ('volume-key', volumes)},
+    )
+    file = io.BytesIO()
+    project.save_project(file, saved)
+    file.seek(0)
+    return saved, project.load_project(file)
+
+
+def test_round_trip_sections(saved):
+    original, loaded = saved
+    assert loaded.name == original.name
+    assert loaded.inputs == original.inputs
+    assert [s.name for s in loaded.sections] == ['A', 'B', 'C']
+    for before, after in zip(original.sections, loaded.sections):
+        assert after.points == before.points
+        for dist, depth in project.PROFILE_FIELDS:
+            assert getattr(after, dist).dtype == DIST_DTYPE and getattr(after, depth).dtype == DEPTH_DTYPE
+            assert np.array_equal(getattr(after, dist), getattr(before, dist))
+            assert np.array_equal(getattr(after, depth), getattr(before, depth))
+        for field in ('completed', 'sampling', 'sampling_info', 'fill_distance', 'sill_distance', 'sill_depth',
+                      'design_params', 'retreat_rate'):
+            assert getattr(after, field) == getattr(before, field), field
+        for node in project.SECTION_NODES:
+            assert after.cache.key(node) == before.cache.key(node), node
+    assert loaded.sections[0].cache.get('fill_area') == pytest.approx(original.sections[0].cache.get('fill_area'))
+    assert not loaded.sections[2].has_profile
+
+
+def test_round_trip_design_profile(saved):
+    original, loaded = saved
+    before, after = original.sections[1].cache.get('design'), loaded.sections[1].cache.get('design')
+    assert after.sill_distance == before.sill_distance and after.fill_distance == before.fill_distance
+    assert np.allclose(after.design_depth, before.design_depth, atol=1e-6)
+
+
+def test_round_trip_results(saved):
+    original, loaded = saved
+    for node in project.RESULT_NODES:
+        assert loaded.results[node][0] == original.results[node][0]
+    cut_fill, volumes = loaded.results['cut_fill'][1], loaded.results['volume'][1]
+    assert cut_fill.fill == 1200.0 and np.array_equal(cut_fill.zone_fill, [1000.0, 200.0])
+    assert volumes.cut_fill is cut_fill
+    assert volumes.total == pytest.approx(original.results['volume'][1].total)
+    assert np.allclose(volumes.areas, original.results['volume'][1].areas)
+
+
+def test_not_a_project_file():
+    with pytest.raises(ValueError, match="Not a project file"):
+        project.load_project(io.BytesIO(b"not a project"))
+    file = io.BytesIO()
+    np.savez(file, header=np.frombuffer(b'{"format": "other"}', dtype=np.uint8))
+    file.seek(0)
+    with pytest.raises(ValueError, match="Not a project file"):
+        project.load_project(file)
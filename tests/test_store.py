@@ -0,0 +1,90 @@
+# tests/test_store.py
+# Tiled store ingestion round trips, bounding box reads and staleness checks
+import os
+
+import numpy as np
+import pytest
+
+from beach_core import store
+
+N = 1_000
+CHUNK = 150  # Smaller than the survey, so ingestion runs over several chunks
+BBOX = (41.1745, 41.1770, 29.6225, 29.6270)
+
+
+@pytest.fixture(scope='module')
+def survey():
+    rng = np.random.default_rng(13)
+    lat = rng.uniform(41.170, 41.182, N)
+    lon = rng.uniform(29.615, 29.635, N)
+    depth = -rng.uniform(0, 12, N)
+    return lat, lon, depth
+
+
+def write_xyz(path, survey):
+    lat, lon, depth = survey
+    np.savetxt(path, np.column_stack((lon, lat, depth)), fmt='%.8f')
+
+
+def write_csv(path, survey):
+    lat, lon, depth = survey
+    np.savetxt(path, np.column_stack((depth, lat, lon)), fmt='%.8f', delimiter=',', header='depth,latitude,longitude',
+               comments='')
+
+
+def write_netcdf(path, survey):
+    xr = pytest.importorskip('xarray')
+    lat, lon, depth = survey
+    xr.Dataset({'latitude': ('point', lat), 'longitude': ('point', lon), 'depth': ('point', depth)}).to_netcdf(path)
+
+
+def sorted_points(lat, lon, depth):
+    points = np.column_stack((lat, lon, depth))
+    return points[np.lexsort(points.T[::-1])]
+
+
+@pytest.mark.parametrize('name, write', [('survey.xyz', write_xyz), ('survey.csv', write_csv),
+                                         ('survey.nc', write_netcdf)])
+def test_ingest_round_trip(tmp_path, survey, name, write):
+    source = str(tmp_path / name)
+    write(source, survey)
+    meta = store.ingest(source, tile_size=200, chunk_size=CHUNK)
+    assert meta['n_points'] == N
+
+    tiles = store.TileStore(store.default_store_path(source))
+    assert len(tiles) == N and len(tiles.tiles) > 1
+    loaded = tiles.soundings()
+    # float32 offsets from the tile corners: well below a millimetre
+    assert np.allclose(sorted_points(loaded.lat, loaded.lon, loaded.depth), sorted_points(*survey), atol=1e-6)
+    chunks = list(tiles.iter_chunks(CHUNK))
+    assert sum(len(depth) for _, _, depth in chunks) == N
+
+
+def test_soundings_in_bbox_is_exact(tmp_path, survey):
+    source = str(tmp_path / 'survey.xyz')
+    write_xyz(source, survey)
+    store.ingest(source, tile_size=200, chunk_size=CHUNK)
+    tiles = store.TileStore(store.default_store_path(source))
+
+    lat, lon, depth = survey
+    lat_min, lat_max, lon_min, lon_max = BBOX
+    inside = (lat >= lat_min) & (lat <= lat_max) & (lon >= lon_min) & (lon <= lon_max)
+    subset = tiles.soundings_in_bbox(BBOX)
+    assert 0 < len(subset) == inside.sum()
+    assert np.allclose(sorted_points(subset.lat, subset.lon, subset.depth),
+                       sorted_points(lat[inside], lon[inside], depth[inside]), atol=1e-6)
+    # Whole tiles would include points outside the box
+    assert len(tiles.soundings(tiles.tiles_in_bbox(BBOX))) > len(subset)
+    assert tiles.soundings_in_bbox(BBOX) is subset
+
+
+def test_find_store_rejects_stale_store(tmp_path, survey):
+    source = str(tmp_path / 'survey.xyz')
+    write_xyz(source, survey)
+    assert store.find_store(source) is None
+    store.ingest(source, chunk_size=CHUNK)
+    assert store.find_store(source) == store.default_store_path(source)
+
+    mtime = os.path.getmtime(source)
+    os.utime(source, (mtime + 10, mtime + 10))
+    assert store.find_store(source) is None
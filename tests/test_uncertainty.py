@@ -0,0 +1,52 @@
+# tests/test_uncertainty.py
+# Monte Carlo cost uncertainty: sampling distributions and the deterministic limits
+import numpy as np
+import pytest
+
+from beach_core.cost import CostInputs, compute_costs
+from beach_core.uncertainty import UncertaintyInputs, _lognormal, simulate_costs
+
+NO_SPREAD = dict(unit_cost_cv=0.0, volume_cv=0.0, retreat_rate_cv=0.0, dimension_cv=0.0)
+
+
+@pytest.mark.parametrize('mean, cv', [(10.0, 0.3), (25.0, 0.05), (0.7, 1.0)])
+def test_lognormal_mean_and_cv(mean, cv):
+    samples = _lognormal(np.random.default_rng(1), mean, cv, 2_000_000).astype(np.float64)
+    assert samples.min() > 0
+    assert samples.mean() == pytest.approx(mean, rel=0.01)
+    assert samples.std() / samples.mean() == pytest.approx(cv, rel=0.03)
+
+
+def test_lognormal_without_spread_is_constant():
+    assert np.all(_lognormal(np.random.default_rng(1), 12.5, 0.0, 100) == np.float32(12.5))
+
+
+@pytest.mark.parametrize('use_groin', [False, True])
+def test_zero_spread_equals_deterministic_total(use_groin):
+    inputs = CostInputs(use_groin=use_groin)
+    result = simulate_costs(31_000.0, inputs, UncertaintyInputs(n_draws=1000, seed=3, **NO_SPREAD))
+    expected = compute_costs(31_000.0, inputs).project_total_cost
+    stats = result.percentiles['Total']
+    for stat in ('Mean', 'P50', 'P90'):
+        assert stats[stat] == pytest.approx(expected, rel=1e-6)
+    assert ('Groin' in result.percentiles) == use_groin
+
+
+def test_maintenance_adds_eroded_fill():
+    inputs = CostInputs(use_sill=False)
+    spread = UncertaintyInputs(n_draws=1000, seed=3, retreat_rate=0.8, maintenance_years=10,
+                               coast_length=480.0, active_height=2.5, **NO_SPREAD)
+    result = simulate_costs(31_000.0, inputs, spread)
+    eroded = 0.8 * 10 * 480.0 * 2.5
+    expected = compute_costs(31_000.0 + eroded, inputs).project_total_cost
+    assert result.percentiles['Total']['P50'] == pytest.approx(expected, rel=1e-6)
+
+
+def test_draws_are_kept_only_on_request():
+    spread = UncertaintyInputs(n_draws=5000, seed=3)
+    summary = simulate_costs(31_000.0, CostInputs(), spread)
+    full = simulate_costs(31_000.0, CostInputs(), spread, keep_draws=True)
+    assert summary.total is None and summary.components is None
+    assert full.total.shape == (5000,) and set(full.components) == {'Fill', 'Sill'}
+    assert summary.percentiles == full.percentiles
+    assert full.histogram[0].sum() == 5000
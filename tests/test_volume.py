@@ -0,0 +1,43 @@
+# tests/test_volume.py
+# Vectorized fill areas (all sections in one pass) against the per-section computation
+import numpy as np
+import pytest
+
+from beach_core import volume
+
+
+def random_sections(rng, n):
+    """Profiles of different lengths and ranges; the design crosses the bathymetry"""
+    sections = []
+    for _ in range(n):
+        length = rng.uniform(100, 600)
+        bathy_dist = np.sort(rng.uniform(0, length, rng.integers(2, 300)))
+        bathy_depth = -0.015 * bathy_dist + rng.normal(0, 0.4, len(bathy_dist))
+        design_dist = np.linspace(rng.uniform(0, 50), rng.uniform(length / 2, length * 1.2), rng.integers(2, 150))
+        design_depth = -0.12 * design_dist ** (2 / 3)
+        sill_distance = None if rng.random() < 0.3 else float(rng.uniform(0, length))
+        sections.append((bathy_dist, bathy_depth, design_dist, design_depth, sill_distance))
+    return sections
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_fill_areas_match_per_section(seed):
+    sections = random_sections(np.random.default_rng(seed), 40)
+    expected = [volume.calculate_fill_area(*section) for section in sections]
+    areas = volume.calculate_fill_areas(*(list(column) for column in zip(*sections)))
+    assert areas.shape == (len(sections),)
+    assert np.allclose(areas, expected, rtol=1e-12, atol=1e-9)
+
+
+def test_fill_areas_without_sills_and_with_empty_profiles():
+    sections = random_sections(np.random.default_rng(7), 6)
+    sections[2] = (np.empty(0), np.empty(0), sections[2][2], sections[2][3], None)
+    sections[4] = (sections[4][0], sections[4][1], np.empty(0), np.empty(0), 100.0)
+    expected = [volume.calculate_fill_area(*section[:4]) for section in sections]
+    areas = volume.calculate_fill_areas(*[list(column) for column in zip(*sections)][:4])
+    assert np.allclose(areas, expected)
+    assert areas[2] == 0 and areas[4] == 0
+
+
+def test_fill_areas_of_no_sections():
+    assert len(volume.calculate_fill_areas([], [], [], [], [])) == 0